@@ -1,19 +1,26 @@
-"""Project package exposing GUI utilities."""
-
-from .template_service import TemplateService
-from .template_preview import TemplatePreview
-from .gui import ProjectGeneratorGUI, ProjectGeneratorApp
-from .dependency_management import DependencyManager, VirtualEnvironmentManager
-from .template_base import (
-    TemplateBase,
-    SmartHomeTemplate,
-    AutomationTemplate,
-    GameDevTemplate,
-)
-from .taupunkt_template import (
-    TaupunktTemplate,
-    TaupunktAdvancedTemplate,
-)
+"""Project package exposing GUI utilities.
+
+The public classes are imported on first access, so that ``import src``
+(and with it every ``lokal`` invocation, including shell completion) does
+not load Tkinter, the preview widgets or the template registry.
+"""
+
+from importlib import import_module
+
+_EXPORTS = {
+    "TemplateService": ".template_service",
+    "TemplatePreview": ".template_preview",
+    "ProjectGeneratorGUI": ".gui",
+    "ProjectGeneratorApp": ".gui",
+    "DependencyManager": ".dependency_management",
+    "VirtualEnvironmentManager": ".dependency_management",
+    "TemplateBase": ".template_base",
+    "SmartHomeTemplate": ".template_base",
+    "AutomationTemplate": ".template_base",
+    "GameDevTemplate": ".template_base",
+    "TaupunktTemplate": ".taupunkt_template",
+    "TaupunktAdvancedTemplate": ".taupunkt_template",
+}
 
 __all__ = [
     "TemplateService",
@@ -29,3 +36,15 @@ __all__ = [
     "TaupunktTemplate",
     "TaupunktAdvancedTemplate",
 ]
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
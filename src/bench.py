@@ -0,0 +1,173 @@
+"""Synthetic benchmark suite for ``lokal bench``.
+
+Creates a synthetic template in a temporary directory and times the
+``list``, ``preview``, ``import-template`` and ``generate`` code paths of
+``TemplateService`` with warmup and repeated runs.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.template_service import TemplateService
+
+OPERATIONS = ("list", "preview", "import-template", "generate")
+DISTRIBUTIONS = ("fixed", "uniform", "log-uniform")
+FANOUT = 8
+
+
+def file_sizes(
+    count: int, min_size: int, max_size: int, distribution: str, seed: int = 0
+) -> List[int]:
+    """Return ``count`` deterministic file sizes drawn from ``distribution``."""
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown size distribution '{distribution}'")
+    if min_size > max_size:
+        raise ValueError("min_size must not exceed max_size")
+    rng = random.Random(seed)
+    if distribution == "fixed":
+        return [max_size] * count
+    if distribution == "uniform":
+        return [rng.randint(min_size, max_size) for _ in range(count)]
+    low, high = math.log(max(min_size, 1)), math.log(max(max_size, 1))
+    return [
+        min(max_size, max(min_size, int(math.exp(rng.uniform(low, high))))) for _ in range(count)
+    ]
+
+
+def make_synthetic_template(root: Path, sizes: Iterable[int], depth: int) -> Tuple[int, int]:
+    """Write one file per size below ``root``, spread over ``depth`` levels.
+
+    Returns ``(files, bytes)`` written.
+    """
+    root.mkdir(parents=True, exist_ok=True)
+    payload = random.Random(1).randbytes(1 << 16)
+    files = total = 0
+    for i, size in enumerate(sizes):
+        folder = root
+        for level in range(depth):
+            folder = folder / f"d{level}_{(i // FANOUT**level) % FANOUT}"
+        folder.mkdir(parents=True, exist_ok=True)
+        with open(folder / f"file_{i:07d}.dat", "wb") as fh:
+            remaining = size
+            while remaining > 0:
+                chunk = payload[: min(remaining, len(payload))]
+                fh.write(chunk)
+                remaining -= len(chunk)
+        files += 1
+        total += size
+    return files, total
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Return the nearest-rank percentile of ``samples``."""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def time_operation(
+    run: Callable[[], Any],
+    warmup: int,
+    repeat: int,
+    reset: Optional[Callable[[], None]] = None,
+) -> List[float]:
+    """Return the wall-clock seconds of ``repeat`` timed runs after warmup.
+
+    ``reset`` runs untimed before every run, e.g. to remove the output of
+    the previous one.
+    """
+    samples = []
+    for i in range(warmup + repeat):
+        if reset is not None:
+            reset()
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        if i >= warmup:
+            samples.append(elapsed)
+    return samples
+
+
+def run_benchmarks(
+    files: int = 1000,
+    depth: int = 2,
+    min_size: int = 1024,
+    max_size: int = 64 * 1024,
+    distribution: str = "log-uniform",
+    warmup: int = 1,
+    repeat: int = 5,
+    workers: int = 4,
+    operations: Iterable[str] = OPERATIONS,
+    work_dir: Optional[Path] = None,
+) -> List[Dict[str, Any]]:
+    """Benchmark the selected operations and return one record each."""
+    operations = [op for op in OPERATIONS if op in set(operations)]
+    with ExitStack() as stack:
+        base = (
+            Path(work_dir) if work_dir else Path(stack.enter_context(tempfile.TemporaryDirectory()))
+        )
+        templates_dir = base / "templates"
+        source = templates_dir / "synthetic"
+        sizes = file_sizes(files, min_size, max_size, distribution)
+        n_files, n_bytes = make_synthetic_template(source, sizes, depth)
+        service = TemplateService(templates_dir)
+        executor = (
+            stack.enter_context(ThreadPoolExecutor(max_workers=workers)) if workers > 1 else None
+        )
+
+        import_dir = base / "imported"
+        output = base / "output"
+
+        def clear(path: Path) -> Callable[[], None]:
+            return lambda: shutil.rmtree(path, ignore_errors=True)
+
+        cases: Dict[str, Tuple[Callable[[], Any], Optional[Callable[[], None]]]] = {
+            # the same calls ``lokal list`` makes in-process
+            "list": (
+                lambda: [service.count_entries(name)[0] for name in service.list_templates()],
+                None,
+            ),
+            "preview": (lambda: sum(1 for _ in service.walk_template("synthetic")), None),
+            "import-template": (
+                lambda: TemplateService(import_dir).import_template(source),
+                clear(import_dir),
+            ),
+            "generate": (
+                lambda: sum(1 for _ in service.generate_project("synthetic", output, executor)),
+                clear(output),
+            ),
+        }
+
+        results = []
+        for op in operations:
+            run, reset = cases[op]
+            samples = time_operation(run, warmup, repeat, reset)
+            median = statistics.median(samples)
+            moves_bytes = op in ("import-template", "generate")
+            results.append(
+                {
+                    "operation": op,
+                    "runs": len(samples),
+                    "files": n_files,
+                    "bytes": n_bytes,
+                    "median_ms": round(median * 1000, 3),
+                    "p95_ms": round(percentile(samples, 95) * 1000, 3),
+                    "files_per_s": round(n_files / median, 1) if median else None,
+                    "mb_per_s": (
+                        round(n_bytes / median / 1e6, 2) if moves_bytes and median else None
+                    ),
+                }
+            )
+        shutil.rmtree(import_dir, ignore_errors=True)
+        shutil.rmtree(output, ignore_errors=True)
+        return results
@@ -1,22 +1,208 @@
-"""Professional CLI interface using click."""
+"""Professional CLI interface using click.
 
+Shell completion imports this module on every keypress, so only the
+standard library and click are imported at module level; the template
+service, daemon and throttling modules are imported by the commands
+that use them.
+"""
+
+from __future__ import annotations
+
+import json
+import os
 import sys
+from contextlib import ExitStack
+from itertools import islice
 from pathlib import Path
-import shutil
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
 import click
-from src.template_service import TemplateService
+from click.shell_completion import CompletionItem, get_completion_class
+from src import tracing
+
+if TYPE_CHECKING:
+    from src.instrumentation import GenerationHook
+    from src.template_service import TemplateService
+    from src.throttle import IOThrottle
+
+# entries a plain ``lokal preview`` shows; ``--max-entries 0`` lists everything
+PREVIEW_MAX_ENTRIES = 200
+
+
+def _complete_template(ctx: click.Context, param: click.Parameter, incomplete: str):
+    """Complete template names from the cached index (no directory scan)."""
+    from src.template_index import TemplateIndex
+
+    templates_dir = ctx.params.get("templates_dir") or "templates"
+    index = TemplateIndex(Path(templates_dir))
+    return [CompletionItem(name) for name in index.complete(incomplete)]
+
+
+def _format_option(func):
+    return click.option(
+        "--format",
+        "output_format",
+        type=click.Choice(["text", "json", "ndjson"]),
+        default="text",
+        show_default=True,
+        help="Output format; json/ndjson stream one record per entry",
+    )(func)
+
+
+class _RecordWriter:
+    """Stream records to stdout as a JSON array or as NDJSON lines.
+
+    Records are written as soon as they are produced, so memory use does
+    not depend on how many records a command emits.
+    """
+
+    def __init__(self, output_format: str):
+        self.output_format = output_format
+        self._count = 0
+
+    def __enter__(self) -> "_RecordWriter":
+        if self.output_format == "json":
+            click.echo("[", nl=False)
+        return self
+
+    def write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False)
+        if self.output_format == "json":
+            click.echo(("," if self._count else "") + "\n  " + line, nl=False)
+        else:
+            click.echo(line)
+        self._count += 1
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self.output_format == "json":
+            click.echo("\n]" if self._count else "]")
+
+
+class _SizeParam(click.ParamType):
+    """Byte size with an optional K/M/G suffix (powers of 1024)."""
+
+    name = "size"
+
+    def convert(self, value, param, ctx):
+        from src.throttle import parse_size
+
+        if isinstance(value, int):
+            return value
+        try:
+            return parse_size(value)
+        except ValueError:
+            self.fail(f"'{value}' is not a size such as 512, 64K or 10M", param, ctx)
+
+
+def _throttle_options(func):
+    """Add --max-bandwidth, --max-iops and --io-priority to a copying command."""
+    func = click.option(
+        "--io-priority",
+        type=click.Choice(["idle", "best-effort"]),
+        default=None,
+        help="Linux I/O scheduling class for the copy (ignored elsewhere)",
+    )(func)
+    func = click.option(
+        "--max-iops",
+        type=click.IntRange(1),
+        default=None,
+        help="Limit file operations per second",
+    )(func)
+    return click.option(
+        "--max-bandwidth",
+        type=_SizeParam(),
+        default=None,
+        help="Limit copy throughput per second, e.g. 20M",
+    )(func)
+
+
+def _hooks() -> Tuple[GenerationHook, ...]:
+    ctx = click.get_current_context(silent=True)
+    obj = ctx.find_object(dict) if ctx is not None else None
+    return tuple(obj.get("hooks", ())) if obj else ()
+
+
+def _service(templates_dir: str) -> TemplateService:
+    """Create a TemplateService carrying the hooks installed by global options."""
+    from src.template_service import TemplateService
+
+    return TemplateService(Path(templates_dir), hooks=_hooks())
+
+
+def _has_template(templates_dir: str, template: str) -> bool:
+    """Check a template name against the cached name index (no registry import)."""
+    from src.template_index import TemplateIndex
+
+    if (Path(templates_dir) / template).is_dir():
+        return True
+    return template.lower() in TemplateIndex(Path(templates_dir)).names()
+
+
+def _forward(op: str, params: Dict[str, Any], **kwargs: Any):
+    """Forward to a running daemon unless profiling or metrics need the work in-process."""
+    from src import daemon
+
+    if tracing.get_tracer() is not None or _hooks():
+        return False, None
+    return daemon.forward(op, params, **kwargs)
 
 
 @click.group()
 @click.version_option(version="1.0.0")
-def cli():
+@click.option(
+    "--profile",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Write a Chrome trace (chrome://tracing, Perfetto) of the command to this file",
+)
+@click.option(
+    "--pstats",
+    is_flag=True,
+    help="With --profile, also dump cProfile statistics to <profile>.pstats",
+)
+@click.option(
+    "--metrics-file",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Write OpenMetrics counters and latency histograms of the command to this file",
+)
+@click.pass_context
+def cli(ctx: click.Context, profile: Optional[str], pstats: bool, metrics_file: Optional[str]):
     """🚀 lokal_Project_Generator - Professional Project Template System.
 
     Generate new projects from templates, manage template libraries,
     and automate project setup with ease.
     """
-    pass
+    ctx.ensure_object(dict)
+    if metrics_file:
+        from src.instrumentation import MetricsCollector
+
+        collector = MetricsCollector()
+        ctx.obj["hooks"] = [collector]
+        ctx.obj["write_metrics"] = lambda: collector.write_textfile(Path(metrics_file))
+        ctx.call_on_close(ctx.obj["write_metrics"])
+    if not profile:
+        return
+    tracer = tracing.Tracer()
+    previous = tracing.set_tracer(tracer)
+    spans = ExitStack()
+    spans.enter_context(tracer.span(ctx.invoked_subcommand or "cli", cat="command"))
+    profiler = None
+    if pstats:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    def finish() -> None:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(f"{profile}.pstats")
+        spans.close()
+        tracing.set_tracer(previous)
+        tracer.write(Path(profile))
+        click.echo(click.style(f"🔬 Trace written to {profile}", fg="cyan"), err=True)
+
+    ctx.call_on_close(finish)
 
 
 @cli.command()
@@ -24,6 +210,7 @@ def cli():
     "--template",
     "-t",
     required=True,
+    shell_complete=_complete_template,
     help="Template name to use for generation",
 )
 @click.option(
@@ -39,18 +226,59 @@ def cli():
     default="templates",
     help="Path to templates directory (default: ./templates)",
 )
-def generate(template: str, output: str, templates_dir: str):
+@click.option(
+    "--with-env",
+    is_flag=True,
+    help="Also create <output>/.venv while the files are copied",
+)
+@click.option(
+    "--deps",
+    "dep_sets",
+    multiple=True,
+    help="Dependency set for --with-env (repeatable; default: the template's dependencies)",
+)
+@click.option(
+    "--python",
+    "python_version",
+    default=None,
+    help="Python version for --with-env, e.g. 3.11 (default: the running one)",
+)
+@click.option(
+    "--wheelhouse",
+    type=click.Path(file_okay=False, exists=True),
+    default=None,
+    help="Install --with-env packages offline from this folder of wheels",
+)
+@_throttle_options
+@_format_option
+def generate(
+    template: str,
+    output: str,
+    templates_dir: str,
+    with_env: bool,
+    dep_sets: Tuple[str, ...],
+    python_version: Optional[str],
+    wheelhouse: Optional[str],
+    max_bandwidth: Optional[int],
+    max_iops: Optional[int],
+    io_priority: Optional[str],
+    output_format: str,
+):
     """Generate a new project from a template.
 
     Example:
         lokal generate --template smart_home --output ~/my_project
+        lokal generate -t smart_home -o ~/my_project --format ndjson
+        lokal generate -t taupunkt -o ~/my_project --with-env --deps dev
     """
     try:
+        from src.throttle import IOThrottle
+
         output_path = Path(output)
-        template_path = Path(templates_dir) / template
+        throttle = IOThrottle.from_options(max_bandwidth, max_iops, io_priority)
 
         # Validation
-        if not template_path.exists():
+        if not _has_template(templates_dir, template):
             click.echo(
                 click.style(
                     f"❌ Template '{template}' not found in {templates_dir}",
@@ -70,6 +298,31 @@ def generate(template: str, output: str, templates_dir: str):
             )
             sys.exit(1)
 
+        if with_env:
+            service = _service(templates_dir)
+            events = _generate_with_env(
+                service, template, output_path, dep_sets, python_version, wheelhouse, throttle
+            )
+            if output_format != "text":
+                with _RecordWriter(output_format) as writer:
+                    for event in events:
+                        writer.write(event)
+                return
+            _show_combined_progress(events, service.count_entries(template)[0], template)
+            click.echo(
+                click.style(
+                    f"✅ Project and environment created at: {output_path.absolute()}",
+                    fg="green",
+                    bold=True,
+                )
+            )
+            return
+
+        if output_format != "text":
+            with _RecordWriter(output_format) as writer:
+                _run_generate(template, templates_dir, output_path, throttle, writer.write)
+            return
+
         # Create project
         bar: Optional[Any] = None
         with click.progressbar(
@@ -77,8 +330,7 @@ def generate(template: str, output: str, templates_dir: str):
             label=f"📦 Generating project from '{template}'",
             show_pos=True,
         ) as bar:
-            # Copy template
-            shutil.copytree(template_path, output_path)
+            _run_generate(template, templates_dir, output_path, throttle)
             if bar is not None:
                 bar.update(100)
 
@@ -98,6 +350,92 @@ def generate(template: str, output: str, templates_dir: str):
         sys.exit(1)
 
 
+def _generate_with_env(
+    service: TemplateService,
+    template: str,
+    output_path: Path,
+    dep_sets: Tuple[str, ...],
+    python_version: Optional[str],
+    wheelhouse: Optional[str],
+    throttle: Optional[IOThrottle],
+):
+    """Return the combined generate + environment event stream (always in-process)."""
+    from src.dependency_management import DependencyManager, VirtualEnvironmentManager
+    from src.project_setup import generate_with_env, template_dependencies
+
+    if dep_sets:
+        sets_file = os.environ.get("LOKAL_DEPENDENCY_SETS")
+        packages = DependencyManager(Path(sets_file) if sets_file else None).resolve(dep_sets)
+    else:
+        packages = template_dependencies(service, template)
+    if wheelhouse:
+        from src.wheelhouse import Wheelhouse
+
+        manager = VirtualEnvironmentManager(
+            installer=Wheelhouse(Path(wheelhouse)).install, with_pip=False
+        )
+    else:
+        manager = VirtualEnvironmentManager()
+    version = python_version or f"{sys.version_info[0]}.{sys.version_info[1]}"
+    return generate_with_env(
+        service, template, output_path, manager, version, packages, throttle=throttle
+    )
+
+
+def _show_combined_progress(events, total_files: int, template: str) -> None:
+    """Render file and environment progress as one bar (files and env count half each)."""
+    files = env = shown = 0
+    with click.progressbar(
+        length=100, label=f"📦 Generating '{template}' with environment", show_pos=True
+    ) as bar:
+        for event in events:
+            if event["event"] == "file":
+                files += 1
+            elif event["event"] == "env":
+                env = event["percent"]
+            percent = (100 * files // max(total_files, 1) + env) // 2
+            if event["event"] == "done":
+                percent = 100
+            if percent > shown:
+                bar.update(percent - shown)
+                shown = percent
+
+
+def _run_generate(
+    template: str,
+    templates_dir: str,
+    output_path: Path,
+    throttle: Optional[IOThrottle] = None,
+    on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """Generate via the daemon if one runs, else in-process; return the summary.
+
+    The daemon is always asked to stream its file events, so a long copy
+    keeps the connection busy instead of running into the idle timeout.
+    """
+    handled, summary = _forward(
+        "generate",
+        {
+            "templates_dir": str(Path(templates_dir).resolve()),
+            "template": template,
+            "output": str(output_path.resolve()),
+            "stream": True,
+            "throttle": throttle.options() if throttle is not None else None,
+        },
+        on_event=on_event,
+    )
+    if handled:
+        if on_event is not None:
+            on_event(summary)
+        return summary
+    service = _service(templates_dir)
+    for event in service.generate_project(template, output_path, throttle=throttle):
+        if on_event is not None:
+            on_event(event)
+        summary = event
+    return summary
+
+
 @cli.command()
 @click.option(
     "--templates-dir",
@@ -105,16 +443,33 @@ def generate(template: str, output: str, templates_dir: str):
     default="templates",
     help="Path to templates directory (default: ./templates)",
 )
-def list(templates_dir: str):
+@_format_option
+def list(templates_dir: str, output_format: str):
     """List all available templates.
 
     Example:
         lokal list
+        lokal list --format ndjson
     """
     try:
-        service = TemplateService(Path(templates_dir))
-        templates = service.list_templates()
+        handled, templates = _forward("list", {"templates_dir": str(Path(templates_dir).resolve())})
+        if not handled:
+            service = _service(templates_dir)
+            templates = (
+                {
+                    "name": name,
+                    "files": service.count_entries(name)[0],
+                }
+                for name in service.list_templates()
+            )
 
+        if output_format != "text":
+            with _RecordWriter(output_format) as writer:
+                for record in templates:
+                    writer.write(record)
+            return
+
+        templates = [*templates]
         if not templates:
             click.echo(
                 click.style(
@@ -132,10 +487,10 @@ def list(templates_dir: str):
             )
         )
 
-        for i, template_name in enumerate(templates, 1):
-            template_path = Path(templates_dir) / template_name
-            files_count = sum(1 for _ in template_path.rglob("*") if _.is_file())
-            click.echo(f"  {i}. {click.style(template_name, fg='green')} " f"({files_count} files)")
+        for i, record in enumerate(templates, 1):
+            click.echo(
+                f"  {i}. {click.style(record['name'], fg='green')} " f"({record['files']} files)"
+            )
 
         click.echo()
 
@@ -161,15 +516,32 @@ def list(templates_dir: str):
     default="templates",
     help="Path to templates directory (default: ./templates)",
 )
-def import_template(source: str, templates_dir: str):
+@click.option(
+    "--update",
+    is_flag=True,
+    help="Sync an already imported template, copying only changed files",
+)
+@_throttle_options
+def import_template(
+    source: str,
+    templates_dir: str,
+    update: bool,
+    max_bandwidth: Optional[int],
+    max_iops: Optional[int],
+    io_priority: Optional[str],
+):
     """Import a new template from a local directory.
 
     Example:
         lokal import-template --source ~/my_template
+        lokal import-template --source ~/my_template --update
     """
     try:
-        service = TemplateService(Path(templates_dir))
+        from src.throttle import IOThrottle
+
+        service = _service(templates_dir)
         source_path = Path(source)
+        throttle = IOThrottle.from_options(max_bandwidth, max_iops, io_priority)
 
         if not source_path.is_dir():
             click.echo(
@@ -181,13 +553,25 @@ def import_template(source: str, templates_dir: str):
             )
             sys.exit(1)
 
+        if update:
+            summary = service.sync_template(source_path, throttle=throttle)
+            click.echo(
+                click.style(
+                    f"✅ Template '{source_path.name}' updated: {summary['copied']} copied, "
+                    f"{summary['deleted']} removed, {summary['unchanged']} unchanged",
+                    fg="green",
+                    bold=True,
+                )
+            )
+            return
+
         bar: Optional[Any] = None
         with click.progressbar(
             length=100,
             label=f"📥 Importing template '{source_path.name}'",
             show_pos=True,
         ) as bar:
-            result = service.import_template(source_path)
+            result = service.import_template(source_path, throttle=throttle)
             if bar is not None:
                 bar.update(100)
 
@@ -224,19 +608,49 @@ def import_template(source: str, templates_dir: str):
     "--template",
     "-t",
     required=True,
+    shell_complete=_complete_template,
     help="Template name to preview",
 )
-def preview(template: str, templates_dir: str):
+@click.option(
+    "--depth",
+    type=click.IntRange(1),
+    default=None,
+    help="Only list this many folder levels (default: unlimited)",
+)
+@click.option(
+    "--max-entries",
+    type=click.IntRange(0),
+    default=PREVIEW_MAX_ENTRIES,
+    help=f"Stop after this many entries; 0 lists everything (default: {PREVIEW_MAX_ENTRIES})",
+)
+@click.option(
+    "--path",
+    "subpath",
+    default=None,
+    help="Preview only this sub-folder of the template",
+)
+@_format_option
+def preview(
+    template: str,
+    templates_dir: str,
+    depth: Optional[int],
+    max_entries: int,
+    subpath: Optional[str],
+    output_format: str,
+):
     """Preview template structure and contents.
 
+    The limits are applied while walking, so huge templates return
+    immediately with a summary of what was left out.
+
     Example:
         lokal preview --template smart_home
+        lokal preview --template smart_home --depth 2 --path src
+        lokal preview --template smart_home --max-entries 1000
+        lokal preview --template smart_home --format ndjson --max-entries 0
     """
     try:
-        service = TemplateService(Path(templates_dir))
-        template_path = Path(templates_dir) / template
-
-        if not template_path.exists():
+        if not _has_template(templates_dir, template):
             click.echo(
                 click.style(
                     f"❌ Template '{template}' not found",
@@ -246,27 +660,50 @@ def preview(template: str, templates_dir: str):
             )
             sys.exit(1)
 
-        structure = service.get_template_structure(template)
+        params = {
+            "templates_dir": str(Path(templates_dir).resolve()),
+            "template": template,
+            "stream": True,
+            "depth": depth,
+            # 0 means unlimited, here and in the daemon
+            "max_entries": max_entries,
+            "path": subpath,
+        }
+
+        if output_format != "text":
+            with _RecordWriter(output_format) as writer:
+                summary = _run_preview(templates_dir, params, writer.write)
+                if summary["more"]:
+                    writer.write(_more_record(summary["more"]))
+            return
 
+        root_label = f"{template}/{subpath.strip('/')}" if subpath else template
+        base_depth = len(Path(subpath).parts) if subpath else 0
         click.echo(
             click.style(
-                f"\n📋 Template Structure: {template}\n",
+                f"\n📋 Template Structure: {root_label}\n",
                 fg="cyan",
                 bold=True,
             )
         )
-
-        def print_tree(d: dict, indent: int = 0):
-            """Recursively print directory tree."""
-            for key, value in d.items():
-                prefix = "  " * indent + "├─ "
-                if isinstance(value, dict):
-                    click.echo(click.style(f"{prefix}📁 {key}/", fg="blue"))
-                    print_tree(value, indent + 1)
-                else:
-                    click.echo(f"{prefix}📄 {key}")
-
-        print_tree(structure)
+        click.echo(click.style(f"├─ 📁 {root_label}/", fg="blue"))
+
+        def print_entry(record: Dict[str, Any]) -> None:
+            prefix = "  " * (record["depth"] - base_depth + 1) + "├─ "
+            name = record["path"].rsplit("/", 1)[-1]
+            if record["type"] == "dir":
+                cut = click.style(" … (--depth)", dim=True) if record.get("truncated") else ""
+                click.echo(click.style(f"{prefix}📁 {name}/", fg="blue") + cut)
+            elif record.get("kind") == "binary":
+                click.echo(f"{prefix}📄 {name} " + click.style("(binary)", dim=True))
+            else:
+                click.echo(f"{prefix}📄 {name}")
+
+        summary = _run_preview(templates_dir, params, print_entry)
+        if summary["more"]:
+            more = _more_record(summary["more"])
+            text = "more entries" if more["exact"] else "or more entries not shown"
+            click.echo(click.style(f"  (+{more['count']:,} {text})", fg="yellow"))
         click.echo()
 
     except Exception as e:
@@ -277,5 +714,190 @@ def preview(template: str, templates_dir: str):
         sys.exit(1)
 
 
+def _more_record(count: int) -> Dict[str, Any]:
+    """Describe the entries a stopped preview left out; ``exact`` is False at the count limit."""
+    from src.template_service import REMAINING_LIMIT
+
+    return {"type": "more", "count": count, "exact": count < REMAINING_LIMIT}
+
+
+def _run_preview(
+    templates_dir: str,
+    params: Dict[str, Any],
+    on_record: Callable[[Dict[str, Any]], None],
+) -> Dict[str, Any]:
+    """Walk via the daemon if one runs, else in-process; return the summary."""
+    from src.template_service import REMAINING_LIMIT, entry_record
+
+    handled, summary = _forward("preview", params, on_event=on_record)
+    if handled:
+        return summary
+    service = _service(templates_dir)
+    walk = service.walk_template(params["template"], params["depth"], params["path"])
+    entries = 0
+    with service.file_info(params["template"]) as file_info:
+        for rel, is_dir in islice(walk, params["max_entries"] or None):
+            info = None if is_dir else file_info.get(rel)
+            on_record(entry_record(rel, is_dir, info, walk.last_cut))
+            entries += 1
+    return {"entries": entries, "more": walk.remaining(REMAINING_LIMIT)}
+
+
+@cli.command()
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(),
+    default=None,
+    help="Unix socket to listen on (default: $LOKAL_SOCKET or a per-user runtime path)",
+)
+@click.option(
+    "--templates-dir",
+    type=click.Path(),
+    default="templates",
+    help="Templates directory to preload (default: ./templates)",
+)
+@click.option("--workers", type=click.IntRange(1), default=4, help="Copy worker threads")
+@click.option("--stop", is_flag=True, help="Stop the running daemon instead of starting one")
+def serve(socket_path: Optional[str], templates_dir: str, workers: int, stop: bool):
+    """Run a warm daemon that answers list/preview/generate requests.
+
+    While it is running, the other commands forward their work to it.
+
+    Example:
+        lokal serve --templates-dir ~/templates
+    """
+    from src import daemon
+
+    path = Path(socket_path) if socket_path else daemon.default_socket_path()
+    try:
+        if stop:
+            daemon.request("shutdown", path=path, timeout=5.0)
+            click.echo(click.style(f"✅ Daemon on {path} stopped", fg="green"))
+            return
+
+        obj = click.get_current_context().find_object(dict) or {}
+        server = daemon.TemplateDaemon(
+            workers=workers, hooks=_hooks(), after_request=obj.get("write_metrics")
+        )
+        server.warm(templates_dir)
+        click.echo(click.style(f"🔌 Listening on {path}", fg="cyan", bold=True))
+        server.serve_forever(path)
+
+    except daemon.DaemonUnavailable:
+        click.echo(click.style(f"❌ No daemon is listening on {path}", fg="red"), err=True)
+        sys.exit(1)
+    except Exception as e:
+        click.echo(
+            click.style(f"❌ Error: {str(e)}", fg="red"),
+            err=True,
+        )
+        sys.exit(1)
+
+
+@cli.command()
+@click.option("--files", type=click.IntRange(1), default=1000, show_default=True)
+@click.option("--depth", type=click.IntRange(0), default=2, show_default=True)
+@click.option("--min-size", type=_SizeParam(), default="1K", show_default=True)
+@click.option("--max-size", type=_SizeParam(), default="64K", show_default=True)
+@click.option(
+    "--distribution",
+    type=click.Choice(["fixed", "uniform", "log-uniform"]),
+    default="log-uniform",
+    show_default=True,
+    help="How file sizes are spread between --min-size and --max-size",
+)
+@click.option("--warmup", type=click.IntRange(0), default=1, show_default=True)
+@click.option("--repeat", type=click.IntRange(1), default=5, show_default=True)
+@click.option("--workers", type=click.IntRange(1), default=4, show_default=True)
+@click.option(
+    "--operation",
+    "operations",
+    multiple=True,
+    type=click.Choice(["list", "preview", "import-template", "generate"]),
+    help="Operation to benchmark (repeatable; default: all)",
+)
+@_format_option
+def bench(
+    files: int,
+    depth: int,
+    min_size: int,
+    max_size: int,
+    distribution: str,
+    warmup: int,
+    repeat: int,
+    workers: int,
+    operations: tuple,
+    output_format: str,
+):
+    """Benchmark list, preview, import-template and generate.
+
+    A synthetic template is created in a temporary directory and each
+    operation is timed after warmup runs.
+
+    Example:
+        lokal bench --files 10000 --max-size 1M --format json
+    """
+    from src.bench import OPERATIONS, run_benchmarks
+
+    try:
+        results = run_benchmarks(
+            files=files,
+            depth=depth,
+            min_size=min_size,
+            max_size=max_size,
+            distribution=distribution,
+            warmup=warmup,
+            repeat=repeat,
+            workers=workers,
+            operations=operations or OPERATIONS,
+        )
+    except Exception as e:
+        click.echo(
+            click.style(f"❌ Error: {str(e)}", fg="red"),
+            err=True,
+        )
+        sys.exit(1)
+
+    if output_format != "text":
+        with _RecordWriter(output_format) as writer:
+            for record in results:
+                writer.write(record)
+        return
+
+    first = results[0]
+    click.echo(
+        click.style(
+            f"\n⏱️  Benchmark: {first['files']} files, "
+            f"{first['bytes'] / 1e6:.1f} MB, {first['runs']} runs\n",
+            fg="cyan",
+            bold=True,
+        )
+    )
+    click.echo(f"  {'operation':<16}{'median ms':>12}{'p95 ms':>12}{'files/s':>12}{'MB/s':>10}")
+    for record in results:
+        mb_per_s = "-" if record["mb_per_s"] is None else f"{record['mb_per_s']:.2f}"
+        click.echo(
+            f"  {record['operation']:<16}{record['median_ms']:>12.2f}{record['p95_ms']:>12.2f}"
+            f"{record['files_per_s']:>12,.0f}{mb_per_s:>10}"
+        )
+    click.echo()
+
+
+@cli.command()
+@click.argument("shell", type=click.Choice(["bash", "zsh", "fish"]))
+def completion(shell: str):
+    """Print the shell completion script for SHELL.
+
+    Example:
+        eval "$(lokal completion bash)"
+    """
+    completion_class = get_completion_class(shell)
+    if completion_class is None:  # pragma: no cover - click ships all three
+        click.echo(click.style(f"❌ Unsupported shell '{shell}'", fg="red"), err=True)
+        sys.exit(1)
+    click.echo(completion_class(cli, {}, "lokal", "_LOKAL_COMPLETE").source())
+
+
 if __name__ == "__main__":
     cli()
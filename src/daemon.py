@@ -0,0 +1,310 @@
+"""Warm ``lokal serve`` daemon and its Unix-socket client.
+
+The daemon keeps one ``TemplateService`` per templates directory, the
+template registry and a copy worker pool alive between CLI invocations.
+
+Protocol: the client sends a single JSON line ``{"op": ..., "params": {...}}``.
+The server acknowledges it with ``{"accepted": true}``, then answers with
+zero or more ``{"event": {...}}`` lines followed by exactly one terminal
+line, either ``{"ok": true, "result": ...}`` or
+``{"ok": false, "error": "...", "type": "ExceptionName"}``.
+
+The client half of this module imports only the standard library, so the
+CLI can try the daemon before it loads the template service itself.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from src.instrumentation import GenerationHook
+    from src.template_service import TemplateService
+
+SOCKET_ENV = "LOKAL_SOCKET"
+NO_DAEMON_ENV = "LOKAL_NO_DAEMON"
+# seconds to connect and get the request accepted; after that the caller
+# falls back to doing the work itself
+ACCEPT_TIMEOUT = 2.0
+# seconds without any message once a request was accepted
+IDLE_TIMEOUT = 120.0
+
+
+class DaemonUnavailable(Exception):
+    """Raised by the client when no daemon answers on the socket."""
+
+
+class DaemonError(Exception):
+    """Raised by the client when the daemon reports a failed request."""
+
+    def __init__(self, message: str, error_type: str = "Exception"):
+        super().__init__(message)
+        self.error_type = error_type
+
+
+def default_socket_path() -> Path:
+    """Return the socket path, honouring ``$LOKAL_SOCKET``."""
+    configured = os.environ.get(SOCKET_ENV)
+    if configured:
+        return Path(configured)
+    base = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return Path(base) / f"lokal-{uid}.sock"
+
+
+class TemplateDaemon:
+    """Dispatch JSON requests against warm template services."""
+
+    def __init__(
+        self,
+        workers: int = 4,
+        hooks: Iterable[GenerationHook] = (),
+        after_request: Optional[Callable[[], None]] = None,
+    ):
+        """Create the daemon and its copy worker pool.
+
+        ``hooks`` are installed on every service; ``after_request`` runs
+        after each answered request, e.g. to rewrite a metrics textfile.
+        """
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="lokal-copy")
+        self.hooks = tuple(hooks)
+        self.after_request = after_request
+        self._services: Dict[str, TemplateService] = {}
+        # (templates_dir, name) -> (folder mtimes, file count)
+        self._counts: Dict[Tuple[str, str], Tuple[Dict[str, int], int]] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[socketserver.BaseServer] = None
+
+    def warm(self, templates_dir: str) -> None:
+        """Preload the service, registry and file counts for a directory."""
+        service = self.service(templates_dir)
+        service.registry.list_available()
+        self.list_templates(templates_dir)
+
+    def service(self, templates_dir: str) -> TemplateService:
+        from src.template_service import TemplateService
+
+        key = str(Path(templates_dir).resolve())
+        with self._lock:
+            if key not in self._services:
+                self._services[key] = TemplateService(Path(key), hooks=self.hooks)
+            return self._services[key]
+
+    # --- operations --------------------------------------------------
+    def list_templates(self, templates_dir: str) -> List[Dict[str, Any]]:
+        """Return ``name``/``files`` records, recounting only changed templates.
+
+        Imported templates are counted from their metadata sidecar. Others
+        are cached together with the mtime of every folder seen while
+        counting, and recounted as soon as any of those folders changed.
+        """
+        service = self.service(templates_dir)
+        return [
+            {"name": name, "files": self._count_files(service, name)}
+            for name in service.list_templates()
+        ]
+
+    def _count_files(self, service: TemplateService, name: str) -> int:
+        from src.template_manifest import tree_unchanged
+        from src.template_service import TemplateWalk
+
+        metadata = service.template_metadata(name, files=False)
+        if metadata is not None:
+            return metadata["file_count"]
+        root = service.templates_dir / name
+        key = (str(service.templates_dir), name)
+        cached = self._counts.get(key)
+        if cached is not None and tree_unchanged(root, cached[0]):
+            return cached[1]
+        mtimes: Dict[str, int] = {}
+        files = sum(1 for _, is_dir in TemplateWalk(root, mtimes=mtimes) if not is_dir)
+        self._counts[key] = (mtimes, files)
+        return files
+
+    def handle(self, op: str, params: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Run one request, yielding ``event`` messages and a final ``result``."""
+        from src.template_service import REMAINING_LIMIT, entry_record
+        from src.throttle import IOThrottle
+
+        if op == "ping":
+            yield {"result": {"pid": os.getpid()}}
+        elif op == "list":
+            yield {"result": self.list_templates(params["templates_dir"])}
+        elif op == "preview":
+            service = self.service(params["templates_dir"])
+            if not params.get("stream"):
+                yield {"result": service.get_template_structure(params["template"])}
+                return
+            walk = service.walk_template(
+                params["template"], params.get("depth"), params.get("path")
+            )
+            entries = 0
+            with service.file_info(params["template"]) as file_info:
+                for rel, is_dir in islice(walk, params.get("max_entries") or None):
+                    entries += 1
+                    info = None if is_dir else file_info.get(rel)
+                    yield {"event": entry_record(rel, is_dir, info, walk.last_cut)}
+            yield {"result": {"entries": entries, "more": walk.remaining(REMAINING_LIMIT)}}
+        elif op == "generate":
+            service = self.service(params["templates_dir"])
+            summary: Dict[str, Any] = {}
+            throttle = IOThrottle.from_options(**(params.get("throttle") or {}))
+            for event in service.generate_project(
+                params["template"], params["output"], executor=self.executor, throttle=throttle
+            ):
+                if event["event"] == "done":
+                    summary = event
+                elif params.get("stream"):
+                    yield {"event": event}
+            yield {"result": summary}
+        elif op == "shutdown":
+            yield {"result": {"pid": os.getpid()}}
+            if self._server is not None:
+                threading.Thread(target=self._server.shutdown, daemon=True).start()
+        else:
+            raise ValueError(f"Unknown operation '{op}'")
+
+    # --- server ------------------------------------------------------
+    def serve_forever(self, path: Path) -> None:
+        """Listen on ``path`` until a ``shutdown`` request arrives."""
+        path = Path(path)
+        if path.exists():
+            if is_running(path):
+                raise FileExistsError(f"A daemon is already listening on {path}")
+            path.unlink()
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                daemon._respond(self.rfile, self.wfile)
+
+        with _ThreadingUnixServer(str(path), Handler) as server:
+            self._server = server
+            try:
+                server.serve_forever()
+            finally:
+                self._server = None
+                self.executor.shutdown(wait=True)
+                if path.exists():
+                    path.unlink()
+
+    def _respond(self, rfile, wfile) -> None:
+        def send(message: Dict[str, Any]) -> None:
+            wfile.write(json.dumps(message).encode("utf-8") + b"\n")
+            wfile.flush()
+
+        try:
+            request = json.loads(rfile.readline().decode("utf-8"))
+            send({"accepted": True})
+            for message in self.handle(request.get("op", ""), request.get("params", {})):
+                if "result" in message:
+                    send({"ok": True, "result": message["result"]})
+                else:
+                    send(message)
+        except Exception as exc:  # pylint: disable=broad-except
+            send({"ok": False, "error": str(exc), "type": type(exc).__name__})
+        finally:
+            if self.after_request is not None:
+                self.after_request()
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+
+    class _ThreadingUnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+else:  # pragma: no cover - platforms without AF_UNIX
+    _ThreadingUnixServer = None  # type: ignore
+
+
+# --- client ----------------------------------------------------------
+def request(
+    op: str,
+    params: Optional[Dict[str, Any]] = None,
+    path: Optional[Path] = None,
+    on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+    timeout: float = ACCEPT_TIMEOUT,
+    idle_timeout: float = IDLE_TIMEOUT,
+) -> Any:
+    """Send one request to the daemon and return its result.
+
+    Raises ``DaemonUnavailable`` if nothing listens on the socket or the
+    request is not accepted within ``timeout`` seconds; the daemon has
+    then not started the work and the caller can do it itself. Once
+    accepted, ``DaemonError`` is raised if the daemon reports a failure or
+    stays silent for ``idle_timeout`` seconds.
+    """
+    path = Path(path) if path is not None else default_socket_path()
+    if not hasattr(socket, "AF_UNIX") or not path.exists():
+        raise DaemonUnavailable(str(path))
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(timeout)
+        try:
+            sock.connect(str(path))
+            payload = {"op": op, "params": params or {}}
+            sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+            reader = sock.makefile("rb")
+            accepted = reader.readline()
+        except OSError as exc:
+            raise DaemonUnavailable(str(path)) from exc
+        if not accepted or not json.loads(accepted.decode("utf-8")).get("accepted"):
+            raise DaemonUnavailable(f"{path}: request was not accepted")
+        sock.settimeout(idle_timeout)
+        with reader:
+            for line in _lines(reader, path, idle_timeout):
+                message = json.loads(line.decode("utf-8"))
+                if "event" in message:
+                    if on_event is not None:
+                        on_event(message["event"])
+                    continue
+                if message.get("ok"):
+                    return message.get("result")
+                raise DaemonError(message.get("error", ""), message.get("type", "Exception"))
+    finally:
+        sock.close()
+    raise DaemonError(f"{path}: connection closed without a reply", "ConnectionError")
+
+
+def _lines(reader, path: Path, idle_timeout: float) -> Iterator[bytes]:
+    while True:
+        try:
+            line = reader.readline()
+        except socket.timeout as exc:
+            raise DaemonError(f"{path}: no reply for {idle_timeout:g}s", "TimeoutError") from exc
+        if not line:
+            return
+        yield line
+
+
+def is_running(path: Optional[Path] = None) -> bool:
+    """Return True if a daemon answers ``ping`` on the socket."""
+    try:
+        request("ping", path=path, timeout=1.0)
+    except (DaemonUnavailable, DaemonError, OSError, ValueError):
+        return False
+    return True
+
+
+def forward(op: str, params: Dict[str, Any], **kwargs: Any) -> Tuple[bool, Any]:
+    """Try ``op`` on a running daemon; return ``(handled, result)``.
+
+    ``handled`` is False when forwarding is disabled via
+    ``$LOKAL_NO_DAEMON`` or no daemon is listening, so the caller should
+    do the work in-process.
+    """
+    if os.environ.get(NO_DAEMON_ENV):
+        return False, None
+    try:
+        return True, request(op, params, **kwargs)
+    except DaemonUnavailable:
+        return False, None
@@ -1,47 +1,355 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
 from pathlib import Path
-from typing import Iterable, List
-import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+# Linux ioctl that shares a file's extents copy-on-write (btrfs, XFS, ...)
+FICLONE = 0x40049409
+BASE_MARKER = "lokal-base.json"
+_SCRIPTS_DIR = "Scripts" if os.name == "nt" else "bin"
+
+Installer = Callable[[Path, Sequence[str]], None]
+
+LOCK_VERSION = 1
+# shipped with the package; used unless another set file is given
+DEFAULT_SETS_FILE = Path(__file__).with_name("dependency_sets.json")
+_REQUIREMENT_RE = re.compile(r"^\s*(?P<name>[A-Za-z0-9][A-Za-z0-9._-]*)\s*(?P<spec>[^;]*)$")
+_CLAUSE_RE = re.compile(r"^(==|!=|>=|<=|>|<|~=)[A-Za-z0-9.*+!_-]+$")
+
+
+def default_cache_dir() -> Path:
+    """Return ``$LOKAL_CACHE_DIR``, else ``$XDG_CACHE_HOME/lokal`` or ``~/.cache/lokal``."""
+    if os.environ.get("LOKAL_CACHE_DIR"):
+        return Path(os.environ["LOKAL_CACHE_DIR"])
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "lokal"
+
+
+def venv_python(venv: Path) -> Path:
+    """Return the interpreter path inside a virtual environment."""
+    return venv / _SCRIPTS_DIR / ("python.exe" if os.name == "nt" else "python")
+
+
+def pip_installer(venv: Path, packages: Sequence[str]) -> None:
+    """Install ``packages`` into ``venv`` with its own pip."""
+    subprocess.run(
+        [str(venv_python(venv)), "-m", "pip", "install", "--disable-pip-version-check", *packages],
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+
+
+def clone_file(src: Path, dst: Path) -> str:
+    """Share ``src`` as ``dst``: reflink if possible, else hardlink, else copy.
+
+    Returns the method used. Hardlinked files are shared with the source,
+    so they must be replaced rather than edited in place, which is what
+    pip does on upgrades.
+    """
+    if fcntl is not None:
+        try:
+            with open(src, "rb") as reader, open(dst, "wb") as writer:
+                fcntl.ioctl(writer.fileno(), FICLONE, reader.fileno())
+            shutil.copystat(src, dst)
+            return "reflink"
+        except OSError:
+            dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+        return "hardlink"
+    except OSError:
+        shutil.copy2(src, dst)
+        return "copy"
 
 
 class VirtualEnvironmentManager:
-    """Manage creation of Python virtual environments."""
+    """Create Python virtual environments by cloning cached base environments.
+
+    The first request for a (python, packages) combination builds a base
+    venv under ``cache_dir/venvs`` and installs the packages into it. Every
+    environment after that is a clone of the base: files are reflinked or
+    hardlinked and only the scripts that embed the venv path are rewritten,
+    so neither ``venv`` nor the installer runs again.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        installer: Installer = pip_installer,
+        with_pip: bool = True,
+    ):
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+        self.installer = installer
+        self.with_pip = with_pip
+        self._interpreters: Optional[Dict[str, str]] = None
+
+    def interpreters(self) -> Dict[str, str]:
+        """Return ``{"3.11": executable, ...}`` for the installed interpreters.
+
+        Discovered once per manager; see ``src.interpreters`` for the cache.
+        """
+        if self._interpreters is None:
+            from src.interpreters import CACHE_FILE, discover
+
+            found = discover(cache_path=self.cache_dir / CACHE_FILE)
+            self._interpreters = {i.short_version: i.path for i in found}
+        return self._interpreters
 
     def available_versions(self) -> List[str]:
-        """Return available Python versions."""
-        return ["3.10", "3.11"]
+        """Return available Python versions, oldest first."""
+        return sorted(self.interpreters(), key=lambda v: tuple(map(int, v.split("."))))
 
     def default_python_version(self) -> str:
-        return self.available_versions()[0]
+        current = f"{sys.version_info[0]}.{sys.version_info[1]}"
+        versions = self.available_versions()
+        return current if current in versions else versions[-1]
+
+    def find_interpreter(self, python_version: str) -> str:
+        """Return the executable for ``python_version`` (e.g. ``"3.11"``)."""
+        if python_version == f"{sys.version_info[0]}.{sys.version_info[1]}":
+            return sys.executable
+        found = self.interpreters().get(python_version) or shutil.which(f"python{python_version}")
+        if found is None:
+            raise RuntimeError(f"Python {python_version} not found")
+        return found
+
+    def base_path(self, interpreter: str, packages: Sequence[str]) -> Path:
+        """Return the cache folder of the base venv for this combination."""
+        key = json.dumps([os.path.realpath(interpreter), sorted(packages), self.with_pip])
+        return self.cache_dir / "venvs" / hashlib.sha256(key.encode()).hexdigest()[:16]
 
     def create_environment(
         self, path: Path, python_version: str, dependencies: Iterable[str]
-    ) -> Iterable[int]:
-        """Simulate creating a venv and installing dependencies.
+    ) -> Iterator[int]:
+        """Create a venv at ``path`` with ``dependencies`` installed.
 
-        Yields progress percentage values from 0 to 100.
+        Yields progress percentage values from 0 to 100. The partial
+        environment is removed if creation fails or the generator is
+        closed early.
         """
-        steps = 5
-        for i in range(steps):
-            time.sleep(0.1)
-            yield int((i + 1) / steps * 100)
+        path = Path(path)
+        packages = sorted(set(dependencies))
+        if path.exists():
+            raise FileExistsError(f"'{path}' already exists")
+        interpreter = self.find_interpreter(python_version)
+        base = self.base_path(interpreter, packages)
+        clone_start = 0
+        if not (base / BASE_MARKER).is_file():
+            yield from self._build_base(base, interpreter, packages)
+            clone_start = 60
+        yield clone_start
+        try:
+            yield from self._clone(base, path, clone_start)
+        except BaseException:
+            shutil.rmtree(path, ignore_errors=True)
+            raise
+
+    def _build_base(self, base: Path, interpreter: str, packages: Sequence[str]) -> Iterator[int]:
+        """Build the base venv next to its final place and move it in atomically."""
+        base.parent.mkdir(parents=True, exist_ok=True)
+        # unique per build, so threads of one process never share a staging folder
+        building = Path(tempfile.mkdtemp(prefix=f"{base.name}.building-", dir=base.parent))
+        try:
+            command = [interpreter, "-m", "venv", str(building)]
+            if not self.with_pip:
+                command.insert(3, "--without-pip")
+            subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+            yield 30
+            if packages:
+                self.installer(building, packages)
+            (building / BASE_MARKER).write_text(
+                json.dumps({"origin": str(building), "python": interpreter, "packages": packages}),
+                encoding="utf-8",
+            )
+            try:
+                os.rename(building, base)
+            except OSError:
+                # another process finished the same base first
+                if not (base / BASE_MARKER).is_file():
+                    raise
+        finally:
+            shutil.rmtree(building, ignore_errors=True)
+
+    def _clone(self, base: Path, dest: Path, start: int) -> Iterator[int]:
+        origin = json.loads((base / BASE_MARKER).read_text(encoding="utf-8"))["origin"]
+        files: List[str] = []
+        dest.mkdir(parents=True)
+        for folder, dirnames, filenames in os.walk(base):
+            rel_folder = os.path.relpath(folder, base)
+            target = dest / rel_folder
+            for name in dirnames:
+                source = Path(folder) / name
+                if source.is_symlink():
+                    os.symlink(os.readlink(source), target / name)
+                else:
+                    (target / name).mkdir()
+            files.extend(os.path.normpath(os.path.join(rel_folder, name)) for name in filenames)
+        files.remove(BASE_MARKER)
+
+        old, new = origin.encode(), str(dest.resolve()).encode()
+        step = max(1, len(files) // 20)
+        for i, rel in enumerate(files, 1):
+            source, target = base / rel, dest / rel
+            if source.is_symlink():
+                os.symlink(os.readlink(source), target)
+            elif _carries_origin(rel, source):
+                data = source.read_bytes()
+                target.write_bytes(data.replace(old, new))
+                shutil.copymode(source, target)
+            else:
+                clone_file(source, target)
+            if i % step == 0:
+                yield start + (100 - start) * i // len(files)
+        yield 100
+
+
+def _carries_origin(rel: str, source: Path) -> bool:
+    """Whether a file of the cached base holds its absolute path as text.
+
+    That is ``pyvenv.cfg``, the activate scripts and ``#!`` scripts in the
+    scripts folder; binaries there are cloned unchanged.
+    """
+    if rel == "pyvenv.cfg":
+        return True
+    folder, name = os.path.split(rel)
+    if folder != _SCRIPTS_DIR:
+        return False
+    if name.lower().startswith("activate"):
+        return True
+    with open(source, "rb") as handle:
+        return handle.read(2) == b"#!"
 
 
 class DependencyManager:
-    """Manage dependency sets for projects."""
+    """Resolve dependency sets declared in a JSON set file.
+
+    The file maps set names to the requirements they add and the sets
+    they include::
+
+        {"sets": {"core": {"packages": ["requests>=2"]},
+                  "dev": {"include": ["core"], "packages": ["pytest==7.4.0"]}}}
+
+    Each set is expanded once (memoized) with cycle detection, duplicates
+    are merged by project name and the result is sorted. With a lockfile,
+    a selection resolved before against the same set file is read back
+    without walking the sets again.
+
+    Without ``sets_file`` the sets shipped in ``DEFAULT_SETS_FILE`` are
+    used. The lockfile defaults to ``<sets file>.lock`` next to the set
+    file, or ``dependency_sets.lock`` in the cache dir for the shipped one.
+    """
+
+    def __init__(self, sets_file: Optional[Path] = None, lockfile: Optional[Path] = None):
+        self.sets_file = Path(sets_file) if sets_file is not None else DEFAULT_SETS_FILE
+        if lockfile is None:
+            if self.sets_file == DEFAULT_SETS_FILE:
+                lockfile = default_cache_dir() / "dependency_sets.lock"
+            else:
+                lockfile = self.sets_file.with_suffix(".lock")
+        self.lockfile = Path(lockfile)
+        raw = self.sets_file.read_bytes()
+        data = json.loads(raw)
+        self.digest = hashlib.sha256(raw).hexdigest()
+        self.sets: Dict[str, dict] = data.get("sets", {})
+        self._expanded: Dict[str, Dict[str, List[str]]] = {}
 
     def available_sets(self) -> List[str]:
-        return ["core", "gui", "dev"]
+        return list(self.sets)
 
     def resolve(self, selected: Iterable[str]) -> List[str]:
-        """Return packages for the given dependency sets."""
-        mapping = {
-            "core": ["requests"],
-            "gui": ["tkinterdnd2"],
-            "dev": ["pytest"],
-        }
-        result: List[str] = []
+        """Return the sorted, deduplicated requirements for the given sets."""
+        selected = sorted(set(selected))
+        locked = self._read_lock(selected)
+        if locked is not None:
+            return locked
+        merged: Dict[str, List[str]] = {}
         for name in selected:
-            result.extend(mapping.get(name, []))
+            _merge(merged, self._expand(name, ()))
+        result = [_format_requirement(merged[key]) for key in sorted(merged)]
+        self._write_lock(selected, result)
         return result
+
+    def _expand(self, name: str, stack: tuple) -> Dict[str, List[str]]:
+        """Return ``{normalized name: [display name, clauses...]}`` for one set."""
+        if name in self._expanded:
+            return self._expanded[name]
+        if name in stack:
+            cycle = " -> ".join(stack[stack.index(name) :] + (name,))
+            raise ValueError(f"Dependency set cycle: {cycle}")
+        if name not in self.sets:
+            raise ValueError(f"Unknown dependency set '{name}'")
+        spec = self.sets[name]
+        merged: Dict[str, List[str]] = {}
+        for included in spec.get("include", []):
+            _merge(merged, self._expand(included, stack + (name,)))
+        for requirement in spec.get("packages", []):
+            project, clauses = parse_requirement(requirement)
+            _merge(merged, {normalize_name(project): [project, *clauses]})
+        self._expanded[name] = merged
+        return merged
+
+    def _read_lock(self, selected: List[str]) -> Optional[List[str]]:
+        try:
+            data = json.loads(self.lockfile.read_text(encoding="utf-8"))
+            if data["version"] == LOCK_VERSION and data["digest"] == self.digest:
+                return data["selections"].get(",".join(selected))
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return None
+
+    def _write_lock(self, selected: List[str], packages: List[str]) -> None:
+        try:
+            data = json.loads(self.lockfile.read_text(encoding="utf-8"))
+            if data["version"] != LOCK_VERSION or data["digest"] != self.digest:
+                raise ValueError("stale lockfile")
+        except (OSError, ValueError, KeyError, TypeError):
+            data = {"version": LOCK_VERSION, "digest": self.digest, "selections": {}}
+        data["selections"][",".join(selected)] = packages
+        self.lockfile.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.lockfile.with_name(f"{self.lockfile.name}.tmp-{os.getpid()}")
+        tmp.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        os.replace(tmp, self.lockfile)
+
+
+def normalize_name(name: str) -> str:
+    """Return the PEP 503 normalized form of a project name."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def parse_requirement(requirement: str) -> Tuple[str, List[str]]:
+    """Split ``"pytest>=7,<9"`` into ``("pytest", [">=7", "<9"])``."""
+    match = _REQUIREMENT_RE.match(requirement)
+    if match is None:
+        raise ValueError(f"Invalid requirement '{requirement}'")
+    clauses = [c.replace(" ", "") for c in match["spec"].split(",") if c.strip()]
+    for clause in clauses:
+        if not _CLAUSE_RE.match(clause):
+            raise ValueError(f"Invalid version constraint '{clause}' in '{requirement}'")
+    return match["name"], clauses
+
+
+def _merge(into: Dict[str, List[str]], other: Dict[str, List[str]]) -> None:
+    for key, (project, *clauses) in other.items():
+        entry = into.setdefault(key, [project])
+        entry.extend(c for c in clauses if c not in entry[1:])
+        pins = {c for c in entry[1:] if c.startswith("==")}
+        if len(pins) > 1:
+            raise ValueError(f"Conflicting pins for '{project}': {', '.join(sorted(pins))}")
+
+
+def _format_requirement(entry: List[str]) -> str:
+    project, *clauses = entry
+    return project + ",".join(sorted(clauses))
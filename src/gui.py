@@ -1,12 +1,32 @@
+import os
+import queue
 import shutil
+import sys
 import threading
-import time
 import tkinter as tk
 from pathlib import Path
+from typing import List, Optional, Tuple
 from tkinter import filedialog, messagebox, ttk
 
+from . import tracing
+from .job_panel import JobPanel
+from .jobs import (
+    CANCELLED,
+    DONE,
+    FAILED,
+    FINAL_STATES,
+    POLL_INTERVAL_MS,
+    RUNNING,
+    GenerationJob,
+    ImportJob,
+    JobQueue,
+    VenvJob,
+    describe_progress,
+)
+from .template_index import TemplateIndex
 from .template_service import TemplateService
 from .template_preview import TemplatePreview
+from .throttle import IOThrottle
 
 try:
     from tkinterdnd2 import DND_FILES, TkinterDnD  # type: ignore
@@ -17,26 +37,57 @@ except ImportError:  # pragma: no cover - optional dependency
     DND_FILES = "DND_Files"
     _DND_AVAILABLE = False
 
+LOADING_TEXT = "Loading templates…"
+# seconds to wait for cancelled jobs to roll back when the window closes
+CLOSE_TIMEOUT = 5.0
 
-class ProjectGeneratorGUI(TkinterDnD):  # type: ignore
-    """Main GUI window for project generation."""
 
-    def __init__(self, templates_dir: str):
-        super().__init__()
-        self.title("Project Generator")
-        self.style = ttk.Style(self)
-        # use a modern theme if available
-        self.style.theme_use("clam")
+def _gui_parallelism() -> int:
+    """Return how many jobs may run at once (``LOKAL_GUI_JOBS``, default 2)."""
+    try:
+        return max(1, int(os.environ.get("LOKAL_GUI_JOBS", "2")))
+    except ValueError:
+        return 2
+
+
+def _venv_manager(factory):
+    """Install from ``$LOKAL_WHEELHOUSE`` without pip when it is set."""
+    wheels = os.environ.get("LOKAL_WHEELHOUSE")
+    if not wheels:
+        return factory()
+    from .wheelhouse import Wheelhouse
+
+    return factory(installer=Wheelhouse(Path(wheels)).install, with_pip=False)
 
+
+class _TemplateTab:
+    """Template selector, preview and generation controls shared by both windows.
+
+    Generation runs as a ``GenerationJob``; its progress queue is drained
+    every ``POLL_INTERVAL_MS`` so the Tk event queue only sees ~30 updates
+    per second regardless of the template size. The template list is
+    scanned in the background as well, starting from the cached index, so
+    the window appears before the templates directory has been read.
+    """
+
+    throttle: Optional[IOThrottle]
+    job_queue: JobQueue
+
+    def _build_template_tab(self, parent, templates_dir: str):
         self.template_service = TemplateService(Path(templates_dir))
+        self._job: Optional[GenerationJob] = None
+        self._polling_job = False
+        # (names, final) from background scans
+        self._scan_results: "queue.SimpleQueue[Tuple[List[str], bool]]" = queue.SimpleQueue()
+        self._scans_pending = 0
 
         # top row: template selector and import button
-        selector_frame = ttk.Frame(self)
+        selector_frame = ttk.Frame(parent)
         selector_frame.grid(row=0, column=0, sticky="ew", padx=5, pady=(5, 0))
 
         self.template_var = tk.StringVar()
         self.template_box = ttk.Combobox(
-            selector_frame, textvariable=self.template_var, state="readonly"
+            selector_frame, textvariable=self.template_var, state="disabled"
         )
         self.template_box.pack(side="left", fill="x", expand=True)
         self.template_box.bind("<<ComboboxSelected>>", self._on_select)
@@ -44,32 +95,82 @@ class ProjectGeneratorGUI(TkinterDnD):  # type: ignore
         import_btn = ttk.Button(selector_frame, text="Import", command=self._import_template)
         import_btn.pack(side="left", padx=5)
 
-        self.preview = TemplatePreview(self, self.template_service)
+        self.preview = TemplatePreview(parent, self.template_service)
         self.preview.grid(row=1, column=0, sticky="nsew", padx=5, pady=5)
 
-        self.progress = ttk.Progressbar(self, mode="determinate", maximum=100)
+        self.progress = ttk.Progressbar(parent, mode="determinate", maximum=100)
         self.progress.grid(row=2, column=0, sticky="ew", padx=5, pady=(0, 5))
 
-        generate_btn = ttk.Button(self, text="Generate", command=self.start_generation)
-        generate_btn.grid(row=3, column=0, sticky="ew", padx=5, pady=(0, 5))
+        self.status_var = tk.StringVar()
+        ttk.Label(parent, textvariable=self.status_var).grid(
+            row=3, column=0, sticky="w", padx=5, pady=(0, 5)
+        )
 
-        self.grid_rowconfigure(1, weight=1)
-        self.grid_columnconfigure(0, weight=1)
+        button_frame = ttk.Frame(parent)
+        button_frame.grid(row=4, column=0, sticky="ew", padx=5, pady=(0, 5))
+        self.generate_btn = ttk.Button(button_frame, text="Generate", command=self.start_generation)
+        self.generate_btn.pack(side="left", fill="x", expand=True)
+        self.cancel_btn = ttk.Button(
+            button_frame, text="Cancel", command=self.cancel_generation, state="disabled"
+        )
+        self.cancel_btn.pack(side="left", padx=(5, 0))
 
-        self._refresh_templates()
+        parent.grid_rowconfigure(1, weight=1)
+        parent.grid_columnconfigure(0, weight=1)
 
-        if self.template_service.list_templates():
-            first = self.template_service.list_templates()[0]
-            self.template_var.set(first)
-            self.preview.load_template(first)
+        self.status_var.set(LOADING_TEXT)
+        self._refresh_templates(use_cache=True)
 
         if _DND_AVAILABLE:
             self.preview.drop_target_register(DND_FILES)  # type: ignore
             self.preview.dnd_bind("<<Drop>>", self._on_drop)  # type: ignore
 
-    def _refresh_templates(self):
-        names = self.template_service.list_templates()
+    def _refresh_templates(self, use_cache: bool = False):
+        """Rescan the template folders on a background thread.
+
+        With ``use_cache`` the names stored in the index by the last run
+        are shown first, before the scan has validated them.
+        """
+        threading.Thread(
+            target=self._scan_templates, args=(use_cache,), name="template-scan", daemon=True
+        ).start()
+        self._scans_pending += 1
+        if self._scans_pending == 1:
+            self.after(POLL_INTERVAL_MS, self._poll_templates)
+
+    def _scan_templates(self, use_cache: bool):  # pragma: no cover - requires GUI
+        index = TemplateIndex(self.template_service.templates_dir)
+        if use_cache:
+            cached = index.cached_directories()
+            if cached is not None:
+                self._scan_results.put((cached, False))
+        try:
+            names = index.directories()
+        except Exception:  # pylint: disable=broad-except
+            names = self.template_service.list_templates()
+        self._scan_results.put((names, True))
+
+    def _poll_templates(self):  # pragma: no cover - requires GUI
+        try:
+            while True:
+                names, final = self._scan_results.get_nowait()
+                self._show_templates(names)
+                if final:
+                    self._scans_pending -= 1
+                    if self.status_var.get() == LOADING_TEXT:
+                        self.status_var.set("" if names else "No templates found")
+        except queue.Empty:
+            pass
+        if self._scans_pending:
+            self.after(POLL_INTERVAL_MS, self._poll_templates)
+
+    def _show_templates(self, names: List[str]):  # pragma: no cover - requires GUI
         self.template_box["values"] = names
+        self.template_box.configure(state="readonly")
+        if self.template_var.get() not in names:
+            self.template_var.set(names[0] if names else "")
+            if names:
+                self.preview.load_template(names[0])
 
     def _on_select(self, _event):
         if self.template_var.get():
@@ -78,77 +179,155 @@ class ProjectGeneratorGUI(TkinterDnD):  # type: ignore
     def _import_template(self):
         path = filedialog.askdirectory(title="Import Template")
         if path:
-            try:
-                dest = self.template_service.import_template(path)
-            except Exception as exc:  # pragma: no cover - requires GUI
-                print(f"Error importing template: {exc}")
-            else:
-                self._refresh_templates()
-                self.template_var.set(dest.name)
-                self.preview.load_template(dest.name)
+            self._start_imports([path])
+
+    def _start_imports(self, paths: List[str]):
+        """Import folders concurrently on the job queue; refresh once when all finish."""
+        templates_dir = self.template_service.templates_dir
+        busy = {job.dest for job in self.job_queue.active() if isinstance(job, ImportJob)}
+        jobs: List[ImportJob] = []
+        for path in paths:
+            job = ImportJob(templates_dir, Path(path), throttle=self.throttle)
+            if job.dest in busy:
+                # the same name twice would race for one destination folder
+                continue
+            busy.add(job.dest)
+            jobs.append(self.job_queue.submit(job))
+        if jobs:
+            self.status_var.set(f"Importing {len(jobs)} template(s)…")
+            self.after(POLL_INTERVAL_MS, self._poll_imports, jobs)
+
+    def _poll_imports(self, jobs: List[ImportJob]):  # pragma: no cover - requires GUI
+        finished = [job for job in jobs if job.state in FINAL_STATES]
+        if len(finished) < len(jobs):
+            self.status_var.set(f"Importing templates: {len(finished)}/{len(jobs)} finished")
+            self.after(POLL_INTERVAL_MS, self._poll_imports, jobs)
+            return
+        imported = [job for job in jobs if job.state == DONE]
+        failed = [job for job in jobs if job.state == FAILED]
+        self._refresh_templates()
+        if imported:
+            self.template_var.set(imported[-1].dest.name)
+            self.preview.load_template(imported[-1].dest.name)
+        self.status_var.set(f"Imported {len(imported)} of {len(jobs)} template(s)")
+        if failed:
+            messagebox.showerror(
+                "Import failed",
+                "\n".join(f"{job.src.name}: {job.latest['error']}" for job in failed),
+            )
 
     def start_generation(self):
-        """Start project generation in a worker thread."""
+        """Queue project generation on the shared job queue."""
         template_name = self.template_var.get()
-        if template_name:
-            self.after(0, self._update_progress, 0)
-            threading.Thread(
-                target=self._generate_project,
-                args=(template_name,),
-                daemon=True,
-            ).start()
-
-    def _generate_project(self, template_name):  # pragma: no cover - requires GUI
-        """Copy the selected template into a new project folder."""
-        src_root = self.template_service.templates_dir / template_name
-        files = list(src_root.rglob("*"))
-        total = len(files)
+        if not template_name:
+            return
         dest_root = Path("generated_projects") / template_name
-        if dest_root.exists():
-            shutil.rmtree(dest_root)
-        for idx, path in enumerate(files, 1):
-            time.sleep(0.1)
-            rel = path.relative_to(src_root)
-            dest = dest_root / rel
-            if path.is_dir():
-                dest.mkdir(parents=True, exist_ok=True)
-            else:
-                dest.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy2(path, dest)
-            self.after(0, self._update_progress, idx / total * 100)
-        self.after(0, self._update_progress, 100)
-        self.after(0, messagebox.showinfo, "Done", f"Project generated at {dest_root}")
-
-    def _update_progress(self, value):
-        self.progress["value"] = value
+        if any(
+            isinstance(job, GenerationJob) and job.dest == dest_root
+            for job in self.job_queue.active()
+        ):
+            messagebox.showinfo("Busy", f"'{template_name}' is already being generated")
+            return
+        self._job = self.job_queue.submit(
+            GenerationJob(
+                self.template_service,
+                template_name,
+                dest_root,
+                throttle=self.throttle,
+                replace=True,
+            )
+        )
+        self.progress["value"] = 0
+        self.status_var.set("Queued…")
+        self.cancel_btn.configure(state="normal")
+        if not self._polling_job:
+            self._polling_job = True
+            self.after(POLL_INTERVAL_MS, self._poll_generation)
+
+    def cancel_generation(self):
+        """Stop the latest generation; its partial output is removed."""
+        if self._job is not None:
+            self.job_queue.cancel(self._job)
+            self.cancel_btn.configure(state="disabled")
+            self.status_var.set("Cancelling…")
+
+    def _poll_generation(self):  # pragma: no cover - requires GUI
+        # follows the most recently started generation; the job panel shows all
+        job = self._job
+        snapshot = job.drain() if job is not None else None
+        if snapshot is None or snapshot["state"] == RUNNING:
+            if snapshot is not None:
+                self.progress["value"] = min(snapshot["done"] / (snapshot["total"] or 1) * 100, 100)
+                self.status_var.set(describe_progress(snapshot))
+            self.after(POLL_INTERVAL_MS, self._poll_generation)
+            return
+        self._polling_job = False
+        self.cancel_btn.configure(state="disabled")
+        state = snapshot["state"]
+        if state == DONE:
+            self.progress["value"] = 100
+            self.status_var.set(describe_progress(snapshot))
+            messagebox.showinfo("Done", f"Project generated at {job.dest}")
+        elif state == CANCELLED:
+            self.progress["value"] = 0
+            self.status_var.set("Cancelled, partial output removed")
+        else:
+            self.status_var.set("")
+            messagebox.showerror("Error", f"Generation failed: {snapshot['error']}")
+
+    def _close(self):  # pragma: no cover - requires GUI
+        """Cancel all jobs, give them a moment to roll back, then close."""
+        active = self.job_queue.active()
+        self.job_queue.shutdown()
+        for job in active:
+            job.join(CLOSE_TIMEOUT)
+        self.destroy()
 
     def _on_drop(self, event):  # pragma: no cover - requires GUI
-        paths = self.splitlist(event.data)
-        for path in paths:
-            try:
-                dest = self.template_service.import_template(path)
-            except Exception as exc:  # pylint: disable=broad-except
-                print(f"Error importing template: {exc}")
-            else:
-                self._refresh_templates()
-                self.template_var.set(dest.name)
-                self.preview.load_template(dest.name)
+        self._start_imports(self.splitlist(event.data))
+
+
+class ProjectGeneratorGUI(_TemplateTab, TkinterDnD):  # type: ignore
+    """Main GUI window for project generation."""
+
+    def __init__(self, templates_dir: str, throttle: Optional[IOThrottle] = None):
+        super().__init__()
+        self.throttle = throttle
+        self.title("Project Generator")
+        self.style = ttk.Style(self)
+        # use a modern theme if available
+        self.style.theme_use("clam")
+        self.job_queue = JobQueue(_gui_parallelism())
+
+        self._build_template_tab(self, templates_dir)
+        self.job_panel = JobPanel(self, self.job_queue)
+        self.job_panel.grid(row=5, column=0, sticky="ew", padx=5, pady=(0, 5))
+        self.protocol("WM_DELETE_WINDOW", self._close)
 
 
 def main():  # pragma: no cover - manual usage
-    app = ProjectGeneratorGUI("templates")
-    app.mainloop()
+    # LOKAL_PROFILE=<file> records the same phase spans as ``lokal --profile``
+    trace_path = os.environ.get("LOKAL_PROFILE")
+    tracer = tracing.Tracer() if trace_path else None
+    tracing.set_tracer(tracer)
+    app = ProjectGeneratorGUI("templates", throttle=IOThrottle.from_env())
+    try:
+        app.mainloop()
+    finally:
+        if tracer is not None:
+            tracer.write(Path(trace_path))
 
 
 if __name__ == "__main__":  # pragma: no cover
     main()
 
 
-class ProjectGeneratorApp(TkinterDnD):  # type: ignore
+class ProjectGeneratorApp(_TemplateTab, TkinterDnD):  # type: ignore
     """Extended GUI with dependency management."""
 
-    def __init__(self, templates_dir: str):
+    def __init__(self, templates_dir: str, throttle: Optional[IOThrottle] = None):
         super().__init__()
+        self.throttle = throttle
         self.title("Project Generator")
         self.style = ttk.Style(self)
         self.style.theme_use("clam")
@@ -158,56 +337,24 @@ class ProjectGeneratorApp(TkinterDnD):  # type: ignore
             VirtualEnvironmentManager,
         )
 
-        self.venv_manager = VirtualEnvironmentManager()
-        self.dep_manager = DependencyManager()
+        self.venv_manager = _venv_manager(VirtualEnvironmentManager)
+        sets_file = os.environ.get("LOKAL_DEPENDENCY_SETS")
+        self.dep_manager = DependencyManager(Path(sets_file) if sets_file else None)
+        self.job_queue = JobQueue(_gui_parallelism())
 
         self.notebook = ttk.Notebook(self)
         self.notebook.pack(fill="both", expand=True)
 
         self._setup_project_tab(templates_dir)
         self._setup_dependency_tab()
+        self._setup_jobs_tab()
+        self.protocol("WM_DELETE_WINDOW", self._close)
 
     # --- project tab -------------------------------------------------
     def _setup_project_tab(self, templates_dir: str):
         tab = ttk.Frame(self.notebook)
         self.notebook.add(tab, text="Project")
-
-        self.template_service = TemplateService(Path(templates_dir))
-
-        selector_frame = ttk.Frame(tab)
-        selector_frame.grid(row=0, column=0, sticky="ew", padx=5, pady=(5, 0))
-
-        self.template_var = tk.StringVar()
-        self.template_box = ttk.Combobox(
-            selector_frame, textvariable=self.template_var, state="readonly"
-        )
-        self.template_box.pack(side="left", fill="x", expand=True)
-        self.template_box.bind("<<ComboboxSelected>>", self._on_select)
-
-        import_btn = ttk.Button(selector_frame, text="Import", command=self._import_template)
-        import_btn.pack(side="left", padx=5)
-
-        self.preview = TemplatePreview(tab, self.template_service)
-        self.preview.grid(row=1, column=0, sticky="nsew", padx=5, pady=5)
-
-        self.progress = ttk.Progressbar(tab, mode="determinate", maximum=100)
-        self.progress.grid(row=2, column=0, sticky="ew", padx=5, pady=(0, 5))
-
-        generate_btn = ttk.Button(tab, text="Generate", command=self.start_generation)
-        generate_btn.grid(row=3, column=0, sticky="ew", padx=5, pady=(0, 5))
-
-        tab.grid_rowconfigure(1, weight=1)
-        tab.grid_columnconfigure(0, weight=1)
-
-        self._refresh_templates()
-        if self.template_service.list_templates():
-            first = self.template_service.list_templates()[0]
-            self.template_var.set(first)
-            self.preview.load_template(first)
-
-        if _DND_AVAILABLE:
-            self.preview.drop_target_register(DND_FILES)  # type: ignore
-            self.preview.dnd_bind("<<Drop>>", self._on_drop)  # type: ignore
+        self._build_template_tab(tab, templates_dir)
 
     # --- dependency tab ----------------------------------------------
     def _setup_dependency_tab(self):
@@ -217,43 +364,100 @@ class ProjectGeneratorApp(TkinterDnD):  # type: ignore
         ttk.Label(dep_frame, text="Python Version").grid(
             row=0, column=0, sticky="w", padx=5, pady=5
         )
-        self.python_var = tk.StringVar(value=self.venv_manager.default_python_version())
+        current = f"{sys.version_info[0]}.{sys.version_info[1]}"
+        self.python_var = tk.StringVar(value=current)
         self.python_box = ttk.Combobox(
             dep_frame,
             textvariable=self.python_var,
             state="readonly",
-            values=self.venv_manager.available_versions(),
+            values=[current],
         )
         self.python_box.grid(row=0, column=1, sticky="ew", padx=5, pady=5)
+        # probing new interpreters can take a moment on the first launch
+        self._versions: "queue.SimpleQueue[List[str]]" = queue.SimpleQueue()
+        threading.Thread(
+            target=self._discover_versions,
+            name="python-discovery",
+            daemon=True,
+        ).start()
+        self.after(POLL_INTERVAL_MS, self._poll_versions)
 
         ttk.Label(dep_frame, text="Dependency Sets").grid(row=1, column=0, sticky="nw", padx=5)
+        # one row of the tab however many sets the sets file defines
+        sets_frame = ttk.Frame(dep_frame)
+        sets_frame.grid(row=1, column=1, sticky="nsew", padx=5)
         self.dep_vars = {}
-        for i, name in enumerate(self.dep_manager.available_sets(), start=1):
+        for i, name in enumerate(self.dep_manager.available_sets()):
             var = tk.BooleanVar()
-            cb = ttk.Checkbutton(dep_frame, text=name, variable=var)
-            cb.grid(row=i, column=1, sticky="w", padx=5)
+            cb = ttk.Checkbutton(sets_frame, text=name, variable=var)
+            cb.grid(row=i, column=0, sticky="w")
             self.dep_vars[name] = var
 
         self.setup_progress = ttk.Progressbar(dep_frame, mode="determinate", maximum=100)
-        self.setup_progress.grid(row=5, column=0, columnspan=2, sticky="ew", padx=5, pady=(5, 0))
+        self.setup_progress.grid(row=2, column=0, columnspan=2, sticky="ew", padx=5, pady=(5, 0))
 
         setup_btn = ttk.Button(dep_frame, text="Create venv", command=self.start_setup_env)
-        setup_btn.grid(row=6, column=0, columnspan=2, sticky="ew", padx=5, pady=5)
+        setup_btn.grid(row=3, column=0, columnspan=2, sticky="ew", padx=5, pady=5)
 
         dep_frame.columnconfigure(1, weight=1)
 
+    def _discover_versions(self):  # pragma: no cover - requires GUI
+        try:
+            self._versions.put(self.venv_manager.available_versions())
+        except Exception:  # pylint: disable=broad-except
+            self._versions.put([self.python_var.get()])
+
+    def _poll_versions(self):  # pragma: no cover - requires GUI
+        try:
+            versions = self._versions.get_nowait()
+        except queue.Empty:
+            self.after(POLL_INTERVAL_MS, self._poll_versions)
+            return
+        self.python_box["values"] = versions
+        if self.python_var.get() not in versions:
+            self.python_var.set(self.venv_manager.default_python_version())
+
+    # --- jobs tab ----------------------------------------------------
+    def _setup_jobs_tab(self):
+        tab = ttk.Frame(self.notebook)
+        self.notebook.add(tab, text="Jobs")
+        self.job_panel = JobPanel(tab, self.job_queue)
+        self.job_panel.pack(fill="both", expand=True, padx=5, pady=5)
+
     def start_setup_env(self):  # pragma: no cover - requires GUI
-        """Start environment setup in background thread."""
-        deps = [n for n, v in self.dep_vars.items() if v.get()]
+        """Queue environment setup on the shared job queue."""
+        deps = self.dep_manager.resolve([n for n, v in self.dep_vars.items() if v.get()])
         py_version = self.python_var.get()
+        env_path = Path("env")
+        if any(isinstance(job, VenvJob) for job in self.job_queue.active()):
+            messagebox.showinfo("Busy", f"'{env_path}' is already being created")
+            return
+        replace = env_path.exists()
+        if replace and not messagebox.askyesno(
+            "Replace environment", f"'{env_path}' already exists. Replace it?"
+        ):
+            return
         self.setup_progress["value"] = 0
-        threading.Thread(
-            target=self._setup_env_worker,
-            args=(py_version, deps),
-            daemon=True,
-        ).start()
 
-    def _setup_env_worker(self, python_version: str, deps):  # pragma: no cover - requires GUI
-        for pct in self.venv_manager.create_environment(Path("env"), python_version, deps):
-            self.after(0, self.setup_progress.configure, value=pct)
-        self.after(0, messagebox.showinfo, "Done", "Virtual environment created")
+        def steps():
+            # removed on the worker thread, so a large env does not block the GUI
+            if replace:
+                shutil.rmtree(env_path)
+            return self.venv_manager.create_environment(env_path, py_version, deps)
+
+        job = VenvJob(steps, label=f"Create venv (Python {py_version})")
+        self.job_queue.submit(job)
+        self.after(POLL_INTERVAL_MS, self._poll_setup, job)
+
+    def _poll_setup(self, job: VenvJob):  # pragma: no cover - requires GUI
+        snapshot = job.drain()
+        if snapshot is not None:
+            self.setup_progress.configure(value=snapshot["done"])
+        if snapshot is None or snapshot["state"] == RUNNING:
+            self.after(POLL_INTERVAL_MS, self._poll_setup, job)
+        elif snapshot["state"] == DONE:
+            messagebox.showinfo("Done", "Virtual environment created")
+        elif snapshot["state"] == CANCELLED:
+            self.setup_progress.configure(value=0)
+        else:
+            messagebox.showerror("Error", f"Environment setup failed: {snapshot['error']}")
@@ -0,0 +1,150 @@
+"""Instrumentation hooks and an OpenMetrics/Prometheus metrics collector.
+
+Register a ``GenerationHook`` on ``TemplateService`` to observe generation
+and import: phase start/end, every finished file and errors. Services
+without hooks skip all callbacks, so the cost is one truthiness check.
+"""
+
+from __future__ import annotations
+
+import bisect
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Phase name reported around a whole operation (generate, import, ...).
+TOTAL_PHASE = "total"
+
+
+class GenerationHook:
+    """Base class for instrumentation hooks; override the callbacks you need."""
+
+    def on_phase_start(self, operation: str, phase: str, **info: Any) -> None:
+        """Called when ``phase`` of ``operation`` begins."""
+
+    def on_phase_end(self, operation: str, phase: str, seconds: float, **info: Any) -> None:
+        """Called when ``phase`` ends, also if it raised."""
+
+    def on_file_done(self, operation: str, path: str, nbytes: int, cached: bool = False) -> None:
+        """Called for every file written; ``cached`` marks files left untouched."""
+
+    def on_error(self, operation: str, error: BaseException) -> None:
+        """Called once when ``operation`` fails."""
+
+
+class _Histogram:
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+
+
+class MetricsCollector(GenerationHook):
+    """Count files, bytes, errors and cache hits; time operations and phases."""
+
+    COUNTERS = {
+        "files": "Files written by the operation.",
+        "bytes": "Bytes written by the operation.",
+        "errors": "Failed operations.",
+        "cache_hits": "Files that were already up to date and not written.",
+    }
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS, prefix: str = "lokal"):
+        self.prefix = prefix
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, str], float] = {}
+        self._operations: Dict[str, _Histogram] = {}
+        self._phases: Dict[Tuple[str, str], _Histogram] = {}
+
+    # --- hook callbacks ----------------------------------------------
+    def on_phase_end(self, operation: str, phase: str, seconds: float, **info: Any) -> None:
+        with self._lock:
+            if phase == TOTAL_PHASE:
+                histogram = self._operations.setdefault(operation, _Histogram(self.buckets))
+            else:
+                key = (operation, phase)
+                histogram = self._phases.setdefault(key, _Histogram(self.buckets))
+            histogram.observe(seconds)
+
+    def on_file_done(self, operation: str, path: str, nbytes: int, cached: bool = False) -> None:
+        with self._lock:
+            if cached:
+                self._add("cache_hits", operation, 1)
+            else:
+                self._add("files", operation, 1)
+                self._add("bytes", operation, nbytes)
+
+    def on_error(self, operation: str, error: BaseException) -> None:
+        with self._lock:
+            self._add("errors", operation, 1)
+
+    def _add(self, counter: str, operation: str, value: float) -> None:
+        key = (counter, operation)
+        self._counters[key] = self._counters.get(key, 0) + value
+
+    # --- export ------------------------------------------------------
+    def counter(self, name: str, operation: str) -> float:
+        """Return the current value of a counter."""
+        with self._lock:
+            return self._counters.get((name, operation), 0)
+
+    def render(self, openmetrics: bool = True) -> str:
+        """Return all metrics in OpenMetrics (or classic Prometheus) text format."""
+        lines: List[str] = []
+        with self._lock:
+            for name, help_text in self.COUNTERS.items():
+                family = f"{self.prefix}_{name}"
+                declared = family if openmetrics else f"{family}_total"
+                lines.append(f"# HELP {declared} {help_text}")
+                lines.append(f"# TYPE {declared} counter")
+                for (counter, operation), value in sorted(self._counters.items()):
+                    if counter == name:
+                        lines.append(f'{family}_total{{operation="{operation}"}} {value:g}')
+            self._render_histograms(
+                lines,
+                f"{self.prefix}_operation_duration_seconds",
+                "Wall-clock duration of whole operations.",
+                {(("operation", op),): h for op, h in self._operations.items()},
+            )
+            self._render_histograms(
+                lines,
+                f"{self.prefix}_phase_duration_seconds",
+                "Wall-clock duration of operation phases.",
+                {(("operation", op), ("phase", ph)): h for (op, ph), h in self._phases.items()},
+            )
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_histograms(
+        lines: List[str], family: str, help_text: str, histograms: Dict[Tuple, _Histogram]
+    ) -> None:
+        lines.append(f"# HELP {family} {help_text}")
+        lines.append(f"# TYPE {family} histogram")
+        for labels, histogram in sorted(histograms.items()):
+            base = ",".join(f'{key}="{value}"' for key, value in labels)
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f'{family}_bucket{{{base},le="{bound:g}"}} {cumulative}')
+            cumulative += histogram.counts[-1]
+            lines.append(f'{family}_bucket{{{base},le="+Inf"}} {cumulative}')
+            lines.append(f"{family}_count{{{base}}} {cumulative}")
+            lines.append(f"{family}_sum{{{base}}} {histogram.total:g}")
+
+    def write_textfile(self, path: Path, openmetrics: bool = True) -> Path:
+        """Atomically write the metrics, e.g. for node_exporter's textfile collector."""
+        path = Path(path)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(self.render(openmetrics), encoding="utf-8")
+        os.replace(tmp, path)
+        return path
@@ -0,0 +1,170 @@
+"""Discovery of installed Python interpreters.
+
+Candidates come from ``PATH``, pyenv and asdf installs and
+``/usr/bin/python3.*``. Each one is asked for its version by running it,
+in parallel, and the answers are stored in a cache keyed by the resolved
+executable path and its mtime, so a launch only probes interpreters that
+are new or were replaced since the last run.
+"""
+
+from __future__ import annotations
+
+import glob
+import json
+import os
+import re
+import subprocess
+import sys
+from concurrent.futures import Executor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from src.dependency_management import default_cache_dir
+
+CACHE_FILE = "interpreters.json"
+CACHE_VERSION = 1
+PROBE_TIMEOUT = 10.0
+PROBE_WORKERS = 8
+
+_NAME_RE = re.compile(r"^python(\d(\.\d+)?)?(\.exe)?$")
+_PROBE = "import sys; print('%d.%d.%d' % sys.version_info[:3])"
+
+
+class Interpreter(NamedTuple):
+    version: str  # "3.11.7"
+    path: str
+
+    @property
+    def short_version(self) -> str:
+        return ".".join(self.version.split(".")[:2])
+
+
+def candidate_paths(env: Optional[Dict[str, str]] = None) -> List[str]:
+    """Return interpreter executables to probe, in preference order, without duplicates."""
+    env = os.environ if env is None else env
+    home = Path(env.get("HOME", str(Path.home())))
+    patterns = [os.path.join(folder, "python*") for folder in env.get("PATH", "").split(os.pathsep)]
+    pyenv = env.get("PYENV_ROOT") or str(home / ".pyenv")
+    asdf = env.get("ASDF_DATA_DIR") or str(home / ".asdf")
+    patterns += [
+        os.path.join(pyenv, "versions", "*", "bin", "python*"),
+        os.path.join(asdf, "installs", "python", "*", "bin", "python*"),
+        "/usr/bin/python3.*",
+    ]
+    # pyenv shims pick a version at run time; the real installs are listed above
+    shims = os.path.join(pyenv, "shims")
+    seen = set()
+    found = []
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)):
+            if (
+                os.path.dirname(path) == shims
+                or not _NAME_RE.match(os.path.basename(path))
+                or not os.access(path, os.X_OK)
+            ):
+                continue
+            real = os.path.realpath(path)
+            if real not in seen and os.path.isfile(real):
+                seen.add(real)
+                found.append(real)
+    return found
+
+
+def probe(path: str) -> Optional[str]:
+    """Run ``path`` and return its ``major.minor.micro`` version, or None."""
+    try:
+        out = subprocess.run(
+            [path, "-c", _PROBE], capture_output=True, text=True, timeout=PROBE_TIMEOUT
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    version = out.stdout.strip()
+    return version if out.returncode == 0 and re.fullmatch(r"\d+\.\d+\.\d+", version) else None
+
+
+def _load_cache(path: Path) -> Dict[str, list]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if data.get("version") == CACHE_VERSION:
+            return data["interpreters"]
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+    return {}
+
+
+def _save_cache(path: Path, entries: Dict[str, list]) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".tmp-{os.getpid()}")
+        tmp.write_text(
+            json.dumps({"version": CACHE_VERSION, "interpreters": entries}), encoding="utf-8"
+        )
+        os.replace(tmp, path)
+    except OSError:
+        pass  # discovery still works, it just probes again next time
+
+
+def _usable(version: Optional[str]) -> bool:
+    # venv needs Python 3
+    return version is not None and _key(version) >= (3, 3)
+
+
+def discover(
+    candidates: Optional[Iterable[str]] = None,
+    cache_path: Optional[Path] = None,
+    executor: Optional[Executor] = None,
+    prober: Callable[[str], Optional[str]] = probe,
+) -> List[Interpreter]:
+    """Return one interpreter per ``major.minor`` version, newest first.
+
+    Only executables missing from the cache, or whose mtime changed, are
+    probed. Failed probes are cached too, so broken links are not re-run.
+    The running interpreter is always included.
+    """
+    cache_path = cache_path or default_cache_dir() / CACHE_FILE
+    paths = list(candidate_paths() if candidates is None else candidates)
+    current = os.path.realpath(sys.executable)
+    if current not in paths:
+        paths.append(current)
+
+    cached = _load_cache(cache_path)
+    entries: Dict[str, list] = {}
+    stale = []
+    for path in paths:
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            continue
+        entry = cached.get(path)
+        if entry is not None and entry[0] == mtime:
+            entries[path] = entry
+        else:
+            entries[path] = [mtime, None]
+            stale.append(path)
+
+    if stale:
+        if executor is None:
+            with ThreadPoolExecutor(max_workers=min(PROBE_WORKERS, len(stale))) as pool:
+                versions = list(pool.map(prober, stale))
+        else:
+            versions = list(executor.map(prober, stale))
+        for path, version in zip(stale, versions):
+            entries[path][1] = version
+    if stale or entries.keys() != cached.keys():
+        _save_cache(cache_path, entries)
+
+    by_version: Dict[str, Interpreter] = {}
+    for path in paths:
+        version = entries.get(path, [None, None])[1]
+        if not _usable(version):
+            continue
+        interpreter = Interpreter(version, path)
+        known = by_version.get(interpreter.short_version)
+        # same minor version in several places: keep the newest micro, then the first found
+        if known is None or _key(version) > _key(known.version):
+            by_version[interpreter.short_version] = interpreter
+    return sorted(by_version.values(), key=lambda i: _key(i.version), reverse=True)
+
+
+def _key(version: str) -> tuple:
+    return tuple(int(part) for part in version.split("."))
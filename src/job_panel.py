@@ -0,0 +1,92 @@
+import tkinter as tk
+from tkinter import ttk
+from typing import Dict
+
+from .jobs import PENDING, POLL_INTERVAL_MS, JobQueue
+
+MAX_PARALLELISM = 16
+
+
+class JobPanel(ttk.Frame):
+    """Widget listing the jobs of a ``JobQueue`` with per-job progress.
+
+    Rows are refreshed from each job's ``latest`` snapshot on the 30 Hz
+    poll. The selected jobs can be cancelled, finished ones cleared, and the
+    spinbox sets how many jobs run in parallel.
+    """
+
+    def __init__(self, parent, job_queue: JobQueue):
+        super().__init__(parent)
+        self.job_queue = job_queue
+
+        self.tree = ttk.Treeview(
+            self, columns=("state", "progress", "detail"), show="headings", height=5
+        )
+        for column, text, width in (
+            ("state", "State", 80),
+            ("progress", "Progress", 70),
+            ("detail", "Details", 320),
+        ):
+            self.tree.heading(column, text=text, anchor="w")
+            self.tree.column(column, width=width, anchor="w", stretch=column == "detail")
+        self.tree.grid(row=0, column=0, columnspan=4, sticky="nsew")
+
+        ttk.Button(self, text="Cancel job", command=self.cancel_selected).grid(
+            row=1, column=0, sticky="w", pady=(5, 0)
+        )
+        ttk.Button(self, text="Clear finished", command=self.clear_finished).grid(
+            row=1, column=1, sticky="w", padx=5, pady=(5, 0)
+        )
+        ttk.Label(self, text="Parallel jobs").grid(row=1, column=2, sticky="e", pady=(5, 0))
+        self.parallelism_var = tk.IntVar(value=job_queue.max_workers)
+        ttk.Spinbox(
+            self,
+            from_=1,
+            to=MAX_PARALLELISM,
+            width=4,
+            textvariable=self.parallelism_var,
+            command=self._on_parallelism,
+        ).grid(row=1, column=3, sticky="e", padx=(5, 0), pady=(5, 0))
+
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(2, weight=1)
+
+        # job id -> last rendered row values, to skip unchanged rows
+        self._rows: Dict[int, tuple] = {}
+        self.after(POLL_INTERVAL_MS, self._refresh)
+
+    def cancel_selected(self):
+        selected = {int(iid) for iid in self.tree.selection()}
+        for job in self.job_queue.jobs:
+            if job.id in selected:
+                self.job_queue.cancel(job)
+
+    def clear_finished(self):
+        self.job_queue.clear_finished()
+
+    def _on_parallelism(self):
+        try:
+            self.job_queue.set_parallelism(max(1, int(self.parallelism_var.get())))
+        except (tk.TclError, ValueError):
+            self.parallelism_var.set(self.job_queue.max_workers)
+
+    def _refresh(self):  # pragma: no cover - requires GUI
+        jobs = list(self.job_queue.jobs)
+        current = {job.id for job in jobs}
+        for job_id in [job_id for job_id in self._rows if job_id not in current]:
+            self.tree.delete(str(job_id))
+            del self._rows[job_id]
+        for job in jobs:
+            snapshot = job.latest
+            total = snapshot["total"] or 1
+            progress = "" if job.state == PENDING else f"{snapshot['done'] / total:.0%}"
+            detail = job.label if job.state == PENDING else f"{job.label}: {job.describe(snapshot)}"
+            values = (job.state, progress, detail)
+            if self._rows.get(job.id) == values:
+                continue
+            if job.id not in self._rows:
+                self.tree.insert("", "end", iid=str(job.id))
+            self.tree.item(str(job.id), values=values)
+            self._rows[job.id] = values
+        if self.winfo_exists():
+            self.after(POLL_INTERVAL_MS, self._refresh)
@@ -0,0 +1,361 @@
+"""Background jobs for the GUI.
+
+A ``Job`` runs on a worker thread and reports through a queue instead of
+calling into Tk: the GUI drains it on a timer (about 30 Hz) and only
+renders the latest state, so large templates no longer flood the event
+loop. Jobs can be cancelled; ``GenerationJob`` and ``ImportJob`` then
+remove their partial output again.
+
+``JobQueue`` is the application-wide bounded executor: it runs at most
+``max_workers`` jobs at a time, keeps the rest pending in submission order
+and can be resized while running.
+"""
+
+from __future__ import annotations
+
+import itertools
+import queue
+import shutil
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional
+
+from src.instrumentation import GenerationHook
+from src.template_service import TemplateService
+from src.throttle import IOThrottle
+
+POLL_INTERVAL_MS = 33
+
+# job states; the last three are final
+PENDING, RUNNING, DONE, CANCELLED, FAILED = "pending", "running", "done", "cancelled", "failed"
+FINAL_STATES = (DONE, CANCELLED, FAILED)
+
+
+def format_duration(seconds: float) -> str:
+    """Format seconds as ``m:ss`` or ``h:mm:ss``."""
+    minutes, secs = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
+
+
+class JobCancelled(Exception):
+    """Raised inside a job's work to abort it at a checkpoint."""
+
+
+class Job:
+    """Cancellable background work that reports progress snapshots.
+
+    ``updates`` receives ``{"state", "done", "total", "elapsed", ...}``
+    snapshots; the last one carries a final state and, for failures, the
+    ``error``. ``latest`` always holds the newest snapshot, for views that
+    only need the current state. Subclasses implement ``_execute``.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, label: str, clock: Callable[[], float] = time.monotonic):
+        self.id = next(self._ids)
+        self.label = label
+        self.state = PENDING
+        self.updates: "queue.SimpleQueue[Dict[str, Any]]" = queue.SimpleQueue()
+        self.latest: Dict[str, Any] = {"state": PENDING, "done": 0, "total": 0, "elapsed": 0.0}
+        self._cancel = threading.Event()
+        self._clock = clock
+        self._start = 0.0
+        self._finished = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def cancel(self) -> None:
+        """Ask the worker to stop at its next checkpoint."""
+        self._cancel.set()
+
+    def start(self) -> "Job":
+        """Run on a dedicated thread, outside any ``JobQueue``."""
+        threading.Thread(target=self.run, name=f"job-{self.id}", daemon=True).start()
+        return self
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        return self._finished.wait(timeout)
+
+    def run(self) -> None:
+        """Execute the job; called on the worker thread."""
+        self._start = self._clock()
+        snapshot: Dict[str, Any] = {"done": 0, "total": 0}
+        try:
+            if self.cancelled:
+                self.post(CANCELLED, snapshot)
+                return
+            self.state = RUNNING
+            try:
+                self._execute(snapshot)
+            except Exception as exc:  # pylint: disable=broad-except
+                self._rollback()
+                if self.cancelled:
+                    self.post(CANCELLED, snapshot)
+                else:
+                    self.post(FAILED, dict(snapshot, error=str(exc)))
+                return
+            if self.cancelled:
+                self._rollback()
+                self.post(CANCELLED, snapshot)
+            else:
+                self.post(DONE, snapshot)
+        finally:
+            self._finished.set()
+
+    def _execute(self, snapshot: Dict[str, Any]) -> None:
+        """Do the work, updating ``snapshot`` and calling ``post`` as it goes."""
+        raise NotImplementedError
+
+    def _rollback(self) -> None:
+        """Undo partial work after a failure or cancellation."""
+
+    def post(self, state: str, snapshot: Dict[str, Any]) -> None:
+        self.state = state
+        self.latest = dict(snapshot, state=state, elapsed=self._clock() - self._start)
+        self.updates.put(self.latest)
+
+    def drain(self) -> Optional[Dict[str, Any]]:
+        """Return the newest queued snapshot, discarding older ones."""
+        latest = None
+        try:
+            while True:
+                latest = self.updates.get_nowait()
+        except queue.Empty:
+            return latest
+
+    def describe(self, snapshot: Dict[str, Any]) -> str:
+        """Return a one-line status for ``snapshot``."""
+        if snapshot.get("error"):
+            return snapshot["error"]
+        total = snapshot["total"] or 1
+        return f"{snapshot['done'] / total:.0%} · {format_duration(snapshot['elapsed'])}"
+
+
+class GenerationJob(Job):
+    """Generate one project, cancellable between files with rollback.
+
+    Snapshots also carry the ``bytes`` written. With ``replace`` an
+    existing ``dest`` is removed first, on the worker thread.
+    """
+
+    def __init__(
+        self,
+        service: TemplateService,
+        template_name: str,
+        dest: Path,
+        throttle: Optional[IOThrottle] = None,
+        executor: Optional[Executor] = None,
+        replace: bool = False,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__(f"Generate {template_name}", clock)
+        self.service = service
+        self.template_name = template_name
+        self.dest = Path(dest)
+        self.throttle = throttle
+        self.executor = executor
+        self.replace = replace
+        self._owns_dest = False
+
+    def _execute(self, snapshot: Dict[str, Any]) -> None:
+        if self.replace:
+            shutil.rmtree(self.dest, ignore_errors=True)
+        # generate_project refuses existing destinations; never roll those back
+        self._owns_dest = not self.dest.exists()
+        snapshot["bytes"] = 0
+        events = self.service.generate_project(
+            self.template_name, self.dest, self.executor, throttle=self.throttle
+        )
+        try:
+            snapshot["total"] = sum(self.service.count_entries(self.template_name))
+            for event in events:
+                if self.cancelled:
+                    break
+                if event["event"] == "done":
+                    continue
+                snapshot["done"] += 1
+                snapshot["bytes"] += event.get("bytes", 0)
+                self.post(RUNNING, snapshot)
+        finally:
+            events.close()
+
+    def _rollback(self) -> None:
+        if self._owns_dest:
+            shutil.rmtree(self.dest, ignore_errors=True)
+
+    def describe(self, snapshot: Dict[str, Any]) -> str:
+        if snapshot.get("error"):
+            return snapshot["error"]
+        return describe_progress(snapshot)
+
+
+class VenvJob(Job):
+    """Create a virtual environment from a ``create_environment`` progress generator."""
+
+    def __init__(
+        self,
+        steps: Callable[[], Iterable[int]],
+        label: str = "Create venv",
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__(label, clock)
+        self._steps = steps
+
+    def _execute(self, snapshot: Dict[str, Any]) -> None:
+        snapshot["total"] = 100
+        steps = iter(self._steps())
+        try:
+            for pct in steps:
+                if self.cancelled:
+                    break
+                snapshot["done"] = pct
+                self.post(RUNNING, snapshot)
+        finally:
+            # lets create_environment remove a partial environment
+            getattr(steps, "close", lambda: None)()
+
+
+class _ImportProgress(GenerationHook):
+    """Feed ``import_template`` hook callbacks into an ``ImportJob`` snapshot."""
+
+    def __init__(self, job: "ImportJob", snapshot: Dict[str, Any]):
+        self.job = job
+        self.snapshot = snapshot
+
+    def on_phase_start(self, operation: str, phase: str, **info: Any) -> None:
+        if phase == "copy":
+            self.snapshot["total"] = info.get("files", 0)
+            # from here on the destination folder is ours to remove
+            self.job._owns_dest = True
+
+    def on_file_done(self, operation: str, path: str, nbytes: int, cached: bool = False) -> None:
+        if self.job.cancelled:
+            raise JobCancelled(path)
+        self.snapshot["done"] += 1
+        self.snapshot["bytes"] += nbytes
+        self.job.post(RUNNING, self.snapshot)
+
+
+class ImportJob(Job):
+    """Import one template folder; cancelling removes the partial copy."""
+
+    def __init__(
+        self,
+        templates_dir: Path,
+        src: Path,
+        throttle: Optional[IOThrottle] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__(f"Import {Path(src).name}", clock)
+        self.templates_dir = Path(templates_dir)
+        self.src = Path(src)
+        self.dest = self.templates_dir / self.src.name
+        self.throttle = throttle
+        self._owns_dest = False
+
+    def _execute(self, snapshot: Dict[str, Any]) -> None:
+        snapshot["bytes"] = 0
+        service = TemplateService(self.templates_dir, hooks=[_ImportProgress(self, snapshot)])
+        service.import_template(self.src, throttle=self.throttle)
+
+    def _rollback(self) -> None:
+        if self._owns_dest:
+            shutil.rmtree(self.dest, ignore_errors=True)
+
+    def describe(self, snapshot: Dict[str, Any]) -> str:
+        if snapshot.get("error"):
+            return snapshot["error"]
+        return describe_progress(snapshot, unit="files")
+
+
+class JobQueue:
+    """Application-wide bounded executor for ``Job`` objects.
+
+    At most ``max_workers`` jobs run at once, each on its own short-lived
+    thread; the others wait in submission order. Cancelling a pending job
+    finalizes it without ever starting it.
+    """
+
+    def __init__(self, max_workers: int = 2):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.max_workers = max_workers
+        self.jobs: List[Job] = []
+        self._pending: Deque[Job] = deque()
+        self._running = 0
+        self._lock = threading.Lock()
+
+    def submit(self, job: Job) -> Job:
+        with self._lock:
+            self.jobs.append(job)
+            self._pending.append(job)
+        self._dispatch()
+        return job
+
+    def set_parallelism(self, max_workers: int) -> None:
+        """Change how many jobs may run at once; takes effect immediately."""
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        with self._lock:
+            self.max_workers = max_workers
+        self._dispatch()
+
+    def cancel(self, job: Job) -> None:
+        job.cancel()
+        with self._lock:
+            if job not in self._pending:
+                return
+            self._pending.remove(job)
+        job.run()  # finalizes as cancelled without doing any work
+
+    def clear_finished(self) -> None:
+        """Forget jobs in a final state."""
+        with self._lock:
+            self.jobs = [job for job in self.jobs if job.state not in FINAL_STATES]
+
+    def active(self) -> List[Job]:
+        """Return the pending and running jobs."""
+        with self._lock:
+            return [job for job in self.jobs if job.state not in FINAL_STATES]
+
+    def shutdown(self) -> None:
+        """Cancel every pending and running job."""
+        for job in self.active():
+            self.cancel(job)
+
+    def _dispatch(self) -> None:
+        with self._lock:
+            while self._pending and self._running < self.max_workers:
+                job = self._pending.popleft()
+                self._running += 1
+                threading.Thread(
+                    target=self._run, args=(job,), name=f"job-{job.id}", daemon=True
+                ).start()
+
+    def _run(self, job: Job) -> None:
+        try:
+            job.run()
+        finally:
+            with self._lock:
+                self._running -= 1
+            self._dispatch()
+
+
+def describe_progress(snapshot: Dict[str, Any], unit: str = "entries") -> str:
+    """Return a status line with counts, throughput and ETA for a snapshot."""
+    done, total, elapsed = snapshot["done"], snapshot["total"], snapshot["elapsed"]
+    parts: List[str] = [f"{done:,}/{total:,} {unit}"]
+    if elapsed > 0 and done:
+        rate = done / elapsed
+        parts.append(f"{rate:,.0f}/s")
+        parts.append(f"{snapshot['bytes'] / elapsed / 1e6:.1f} MB/s")
+        if snapshot["state"] == RUNNING and total > done:
+            parts.append(f"ETA {format_duration((total - done) / rate)}")
+    return " · ".join(parts)
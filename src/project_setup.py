@@ -0,0 +1,166 @@
+"""Generate a project and provision its virtual environment concurrently.
+
+``generate_with_env`` runs ``TemplateService.generate_project`` on the
+calling thread and ``VirtualEnvironmentManager.create_environment`` on a
+worker thread, and merges both into one event stream. The environment
+goes to ``<project>/.venv`` unless another path is given. If either half
+fails, or the stream is closed early, the other one is stopped and
+everything created so far is removed again; by the worker itself if an
+environment step outlasts the stop timeout.
+
+Without explicit dependency sets the environment gets the template's
+``host_dependencies``: the pip packages its tests and tools need on the
+development machine, as opposed to ``dependencies``, which for the
+MicroPython templates names the libraries flashed onto the device.
+"""
+
+from __future__ import annotations
+
+import queue
+import shutil
+import threading
+import time
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from src.dependency_management import VirtualEnvironmentManager
+from src.template_service import TemplateService
+from src.throttle import IOThrottle
+
+ENV_DIR = ".venv"
+_WAIT_INTERVAL = 0.05
+# how long a failed or closed stream waits for the environment step in flight
+_STOP_TIMEOUT = 10.0
+
+
+def template_dependencies(service: TemplateService, template_name: str) -> List[str]:
+    """Return ``get_metadata()["host_dependencies"]`` of a registry template, else ``[]``."""
+    if (service.templates_dir / template_name).is_dir():
+        return []
+    info = service.registry.get_template_info(template_name)
+    if info is None:
+        return []
+    return sorted(set(info["metadata"].get("host_dependencies", [])))
+
+
+class _EnvWorker(threading.Thread):
+    """Drive ``create_environment`` and hand its progress to the consumer."""
+
+    def __init__(self, steps: Iterator[int]):
+        super().__init__(name="env-setup", daemon=True)
+        self.steps = steps
+        self.events: "queue.SimpleQueue[Dict[str, Any]]" = queue.SimpleQueue()
+        self.error: Optional[BaseException] = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._finished = False
+        self._cleanup: List[Path] = []
+
+    def stop(self, timeout: Optional[float] = None) -> bool:
+        """Ask the worker to stop and wait for it, polling like the event loop.
+
+        Returns False if a step is still running after ``timeout`` (by
+        default ``_STOP_TIMEOUT``), e.g. a pip install. It is left to finish;
+        ``run`` then closes ``steps``, which removes the partial environment.
+        """
+        self._stop_event.set()
+        deadline = time.monotonic() + (_STOP_TIMEOUT if timeout is None else timeout)
+        while self.is_alive() and time.monotonic() < deadline:
+            self.join(_WAIT_INTERVAL)
+        if self.is_alive():
+            return False
+        # never started or already done: make sure create_environment cleans up
+        getattr(self.steps, "close", lambda: None)()
+        return True
+
+    def remove_when_done(self, *paths: Path) -> bool:
+        """Have ``run`` remove ``paths`` when it ends; False if it already has ended."""
+        with self._lock:
+            if self._finished or not self.is_alive():
+                return False
+            self._cleanup.extend(paths)
+            return True
+
+    def run(self) -> None:
+        try:
+            for percent in self.steps:
+                if self._stop_event.is_set():
+                    break
+                self.events.put({"event": "env", "percent": percent})
+        except BaseException as exc:  # pylint: disable=broad-except
+            self.error = exc
+        finally:
+            # closing lets create_environment remove a partial environment
+            getattr(self.steps, "close", lambda: None)()
+            with self._lock:
+                self._finished = True
+                cleanup = self._cleanup
+            for path in cleanup:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def drain(self) -> Iterator[Dict[str, Any]]:
+        try:
+            while True:
+                yield self.events.get_nowait()
+        except queue.Empty:
+            return
+
+
+def generate_with_env(
+    service: TemplateService,
+    template_name: str,
+    dest: Path,
+    venv_manager: VirtualEnvironmentManager,
+    python_version: str,
+    packages: Sequence[str],
+    env_path: Optional[Path] = None,
+    executor: Optional[Executor] = None,
+    throttle: Optional[IOThrottle] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Yield generation events interleaved with ``{"event": "env", "percent": n}``.
+
+    The last event is ``{"event": "done", "path", "files", "bytes", "env"}``.
+    ``dest`` must not exist yet.
+    """
+    dest = Path(dest)
+    env_path = Path(env_path) if env_path is not None else dest / ENV_DIR
+    if dest.exists():
+        raise FileExistsError(f"Output directory '{dest}' already exists")
+    if env_path.exists():
+        raise FileExistsError(f"'{env_path}' already exists")
+
+    # create the output folder up front, so the environment can start at once
+    # and be placed inside it without tripping generate_project's exists check
+    dest.mkdir(parents=True)
+    events = service.generate_project(
+        template_name, dest, executor, throttle=throttle, exist_ok=True
+    )
+    worker = _EnvWorker(iter(venv_manager.create_environment(env_path, python_version, packages)))
+    summary: Optional[Dict[str, Any]] = None
+    try:
+        worker.start()
+        for event in events:
+            if worker.error is not None:
+                raise worker.error
+            yield from worker.drain()
+            if event["event"] == "done":
+                summary = event
+            else:
+                yield event
+        # files are done; keep streaming environment progress until it finishes
+        while worker.is_alive():
+            worker.join(_WAIT_INTERVAL)
+            yield from worker.drain()
+        if worker.error is not None:
+            raise worker.error
+        yield from worker.drain()
+    except BaseException:
+        events.close()
+        # a worker still inside a step may write into env_path: it removes
+        # both folders itself once that step returns
+        if worker.stop() or not worker.remove_when_done(dest, env_path):
+            shutil.rmtree(dest, ignore_errors=True)
+            shutil.rmtree(env_path, ignore_errors=True)
+        raise
+    yield dict(summary or {"event": "done", "path": str(dest)}, env=str(env_path))
@@ -7,7 +7,7 @@ dew point display system with multiple environmental sensors.
 from __future__ import annotations
 
 from typing import Any, Dict
-from .template_base import TemplateBase
+from .template_base import TemplateBase, read_template_files
 
 
 class TaupunktTemplate(TemplateBase):
@@ -42,6 +42,7 @@ class TaupunktTemplate(TemplateBase):
         """Return the project folder structure."""
         return {
             "src": {
+                "__init__.py": None,
                 "main.py": None,
                 "config.py": None,
                 "sensors": {
@@ -54,6 +55,7 @@ class TaupunktTemplate(TemplateBase):
                     "lcd_st7789.py": None,
                     "ui.py": None,
                     "graphics.py": None,
+                    "fake_spi.py": None,
                 },
                 "utils": {
                     "dew_point.py": None,
@@ -91,10 +93,15 @@ class TaupunktTemplate(TemplateBase):
                 "display_config.json": None,
             },
             "tests": {
+                "conftest.py": None,
                 "test_sensors.py": None,
                 "test_dew_point.py": None,
+                "test_fixed_point.py": None,
                 "test_display.py": None,
             },
+            "benchmarks": {
+                "bench_dew_point.py": None,
+            },
             "examples": {
                 "basic_display.py": None,
                 "with_logging.py": None,
@@ -104,6 +111,10 @@ class TaupunktTemplate(TemplateBase):
             ".gitignore": None,
         }
 
+    def get_file_contents(self) -> Dict[str, str]:
+        """Return the implemented project files, e.g. ``src/utils/dew_point.py``."""
+        return read_template_files("taupunkt")
+
     def get_metadata(self) -> Dict[str, Any]:
         """Return template metadata including dependencies."""
         return {
@@ -117,6 +128,8 @@ class TaupunktTemplate(TemplateBase):
                 "micropython-bmp280",
                 "micropython-sht41",
             ],
+            # pip packages for the project's tests and tools on the host
+            "host_dependencies": ["numpy", "pytest"],
             "config_files": [
                 "config/default_config.json",
                 "config/sensor_offsets.json",
@@ -236,10 +249,21 @@ class TaupunktAdvancedTemplate(TaupunktTemplate):
                 "chart.js": None,
             },
         }
+        structure["tests"]["test_ring_log.py"] = None
+        structure["tests"]["test_analyze_log.py"] = None
+        structure["tools"] = {
+            "analyze_log.py": None,
+        }
         structure["docs"]["software"]["mqtt_integration.md"] = None
         structure["docs"]["software"]["web_api.md"] = None
         return structure
 
+    def get_file_contents(self) -> Dict[str, str]:
+        """Return the base project files plus the advanced ones, e.g. the ring log."""
+        contents = super().get_file_contents()
+        contents.update(read_template_files("taupunkt_advanced"))
+        return contents
+
     def get_metadata(self) -> Dict[str, Any]:
         """Return advanced metadata."""
         metadata = super().get_metadata()
@@ -1,8 +1,21 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from pathlib import Path
 from typing import Any, Dict
 
+TEMPLATE_FILES_DIR = Path(__file__).parent / "template_files"
+
+
+def read_template_files(name: str) -> Dict[str, str]:
+    """Return ``{posix relative path: text}`` for ``template_files/<name>``."""
+    root = TEMPLATE_FILES_DIR / name
+    return {
+        path.relative_to(root).as_posix(): path.read_text(encoding="utf-8")
+        for path in sorted(root.rglob("*"))
+        if path.is_file() and "__pycache__" not in path.parts
+    }
+
 
 class TemplateBase(ABC):
     """Abstract base class for project templates."""
@@ -23,6 +36,13 @@ class TemplateBase(ABC):
     def get_metadata(self) -> Dict[str, Any]:
         """Return additional metadata such as dependencies."""
 
+    def get_file_contents(self) -> Dict[str, str]:
+        """Return ``{relative path: text}`` for files generated with content.
+
+        Files of the structure that are missing here are created empty.
+        """
+        return {}
+
 
 class SmartHomeTemplate(TemplateBase):
     """Template for WLED/LED controller projects."""
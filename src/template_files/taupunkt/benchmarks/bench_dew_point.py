@@ -0,0 +1,45 @@
+"""Compare the scalar and vectorized dew point implementations.
+
+Usage (from the project root)::
+
+    python benchmarks/bench_dew_point.py [samples]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.utils.dew_point import dew_point, dew_point_array  # noqa: E402
+
+
+def main(n=10_000_000):
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    t = rng.uniform(-40, 60, n)
+    rh = rng.uniform(1, 100, n)
+    out = np.empty(n)
+
+    scalar_n = min(n, 200_000)
+    ts, rhs = t[:scalar_n].tolist(), rh[:scalar_n].tolist()
+    start = time.perf_counter()
+    for a, b in zip(ts, rhs):
+        dew_point(a, b)
+    scalar = (time.perf_counter() - start) / scalar_n
+
+    dew_point_array(t[:1000], rh[:1000])
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        dew_point_array(t, rh, out=out)
+        best = min(best, time.perf_counter() - start)
+
+    print(f"scalar     : {scalar * 1e9:8.1f} ns/sample ({scalar_n:,} samples)")
+    print(f"vectorized : {best / n * 1e9:8.1f} ns/sample ({n:,} samples, {best * 1000:.0f} ms)")
+    print(f"speedup    : {scalar / (best / n):8.0f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000)
@@ -0,0 +1,5 @@
+"""Taupunkt firmware and host modules.
+
+A regular package, so ``src.…`` imports in the host tests resolve to this
+project even when another package named ``src`` is importable.
+"""
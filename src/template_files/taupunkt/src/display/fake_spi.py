@@ -0,0 +1,96 @@
+"""Host stand-ins for ``machine.SPI`` and ``machine.Pin`` to test the display code.
+
+``FakeSPI`` counts what the driver sends and also plays the panel: it
+follows CASET/RASET/RAMWR and writes pixel data into an emulated
+controller RAM, so tests can check both the SPI traffic of an update and
+what ends up on screen.
+"""
+
+from .lcd_st7789 import CASET, RAMWR, RASET
+
+RAM_WIDTH = 240
+RAM_HEIGHT = 320
+
+
+class FakePin:
+    def __init__(self, value=0):
+        self._value = value
+
+    def __call__(self, value=None):
+        if value is None:
+            return self._value
+        self._value = value
+
+    value = __call__
+
+
+class FakeSPI:
+    """Record bytes per bus write; give the same ``FakePin`` as DC to the driver."""
+
+    def __init__(self, dc, width=RAM_WIDTH, height=RAM_HEIGHT):
+        self.dc = dc
+        self.ram_width = width
+        self.ram = bytearray(width * height * 2)
+        self._command = None
+        self._args = bytearray()
+        self._columns = (0, width - 1)
+        self._rows = (0, height - 1)
+        self._x = self._y = 0
+        self.reset_counts()
+
+    def reset_counts(self):
+        self.command_bytes = 0
+        self.data_bytes = 0
+        self.writes = 0
+        self.commands = []
+
+    @property
+    def total_bytes(self):
+        return self.command_bytes + self.data_bytes
+
+    def write(self, buf):
+        self.writes += 1
+        if not self.dc():
+            self.command_bytes += len(buf)
+            for cmd in bytes(buf):
+                self._start(cmd)
+        elif self._command == RAMWR:
+            self.data_bytes += len(buf)
+            self._pixels(memoryview(buf))
+        else:
+            self.data_bytes += len(buf)
+            self._args.extend(buf)
+            if len(self._args) == 4:
+                span = (self._args[0] << 8 | self._args[1], self._args[2] << 8 | self._args[3])
+                if self._command == CASET:
+                    self._columns = span
+                elif self._command == RASET:
+                    self._rows = span
+
+    def _start(self, cmd):
+        self.commands.append(cmd)
+        self._command = cmd
+        self._args = bytearray()
+        if cmd == RAMWR:
+            self._x, self._y = self._columns[0], self._rows[0]
+
+    def _pixels(self, data):
+        x0, x1 = self._columns
+        pos = 0
+        while pos < len(data) and self._y <= self._rows[1]:
+            n = min(x1 + 1 - self._x, (len(data) - pos) // 2)
+            off = (self._y * self.ram_width + self._x) * 2
+            self.ram[off : off + 2 * n] = data[pos : pos + 2 * n]
+            pos += 2 * n
+            self._x += n
+            if self._x > x1:
+                self._x = x0
+                self._y += 1
+
+    def rect(self, x, y, w, h):
+        """Return the RGB565 bytes of a RAM rectangle, row by row."""
+        out = bytearray()
+        for row in range(y, y + h):
+            off = (row * self.ram_width + x) * 2
+            out += self.ram[off : off + 2 * w]
+        return bytes(out)
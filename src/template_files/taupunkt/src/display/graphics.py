@@ -0,0 +1,196 @@
+"""RGB565 framebuffer with dirty-region tracking for the ST7789.
+
+The whole 172x320 screen lives in one preallocated ``bytearray`` (110,080
+bytes, big-endian RGB565 as the panel expects it). The layout is fixed, so
+the areas that change - the value fields - are registered once as
+``Region`` objects, each keeping ready-made ``memoryview`` rows into the
+framebuffer. Drawing into a region marks it dirty, and ``flush`` sends only
+the dirty regions: one address window plus the region's pixels each,
+instead of the full 110 KB frame.
+
+After setup nothing is allocated per frame: glyphs are drawn pixel by
+pixel into the existing buffer, and the SPI writes reuse the stored views.
+"""
+
+try:
+    import micropython
+
+    micropython.const  # the project's micropython/ folder is not the module
+except (ImportError, AttributeError):  # CPython: @micropython.native is a no-op
+
+    class micropython:  # noqa: N801
+        @staticmethod
+        def native(func):
+            return func
+
+
+def rgb565(r, g, b):
+    """Pack 8-bit ``r, g, b`` into a 16-bit RGB565 colour."""
+    return (r & 0xF8) << 8 | (g & 0xFC) << 3 | b >> 3
+
+
+BLACK = 0x0000
+WHITE = 0xFFFF
+GREY = rgb565(128, 128, 128)
+CYAN = rgb565(0, 200, 255)
+ORANGE = rgb565(255, 160, 0)
+
+# 5x7 glyphs drawn in a 6x8 cell; one byte per row, bit 4 is the left column
+GLYPH_WIDTH = 6
+GLYPH_HEIGHT = 8
+FONT = {
+    " ": b"\x00\x00\x00\x00\x00\x00\x00",
+    "-": b"\x00\x00\x00\x1f\x00\x00\x00",
+    ".": b"\x00\x00\x00\x00\x00\x0c\x0c",
+    ":": b"\x00\x0c\x0c\x00\x0c\x0c\x00",
+    "%": b"\x18\x19\x02\x04\x08\x13\x03",
+    "°": b"\x0c\x12\x12\x0c\x00\x00\x00",
+    "?": b"\x0e\x11\x01\x02\x04\x00\x04",
+    "0": b"\x0e\x11\x13\x15\x19\x11\x0e",
+    "1": b"\x04\x0c\x04\x04\x04\x04\x0e",
+    "2": b"\x0e\x11\x01\x02\x04\x08\x1f",
+    "3": b"\x1f\x02\x04\x02\x01\x11\x0e",
+    "4": b"\x02\x06\x0a\x12\x1f\x02\x02",
+    "5": b"\x1f\x10\x1e\x01\x01\x11\x0e",
+    "6": b"\x06\x08\x10\x1e\x11\x11\x0e",
+    "7": b"\x1f\x01\x02\x04\x08\x08\x08",
+    "8": b"\x0e\x11\x11\x0e\x11\x11\x0e",
+    "9": b"\x0e\x11\x11\x0f\x01\x02\x0c",
+    "A": b"\x0e\x11\x11\x1f\x11\x11\x11",
+    "B": b"\x1e\x11\x11\x1e\x11\x11\x1e",
+    "C": b"\x0e\x11\x10\x10\x10\x11\x0e",
+    "D": b"\x1c\x12\x11\x11\x11\x12\x1c",
+    "E": b"\x1f\x10\x10\x1e\x10\x10\x1f",
+    "F": b"\x1f\x10\x10\x1e\x10\x10\x10",
+    "G": b"\x0e\x11\x10\x17\x11\x11\x0f",
+    "H": b"\x11\x11\x11\x1f\x11\x11\x11",
+    "I": b"\x0e\x04\x04\x04\x04\x04\x0e",
+    "J": b"\x07\x02\x02\x02\x02\x12\x0c",
+    "K": b"\x11\x12\x14\x18\x14\x12\x11",
+    "L": b"\x10\x10\x10\x10\x10\x10\x1f",
+    "M": b"\x11\x1b\x15\x15\x11\x11\x11",
+    "N": b"\x11\x11\x19\x15\x13\x11\x11",
+    "O": b"\x0e\x11\x11\x11\x11\x11\x0e",
+    "P": b"\x1e\x11\x11\x1e\x10\x10\x10",
+    "Q": b"\x0e\x11\x11\x11\x15\x12\x0d",
+    "R": b"\x1e\x11\x11\x1e\x14\x12\x11",
+    "S": b"\x0f\x10\x10\x0e\x01\x01\x1e",
+    "T": b"\x1f\x04\x04\x04\x04\x04\x04",
+    "U": b"\x11\x11\x11\x11\x11\x11\x0e",
+    "V": b"\x11\x11\x11\x11\x11\x0a\x04",
+    "W": b"\x11\x11\x11\x15\x15\x15\x0a",
+    "X": b"\x11\x11\x0a\x04\x0a\x11\x11",
+    "Y": b"\x11\x11\x0a\x04\x04\x04\x04",
+    "Z": b"\x1f\x01\x02\x04\x08\x10\x1f",
+}
+DIGITS = tuple(FONT[str(d)] for d in range(10))
+
+
+class Region:
+    """A fixed rectangle of a ``Framebuffer`` that is sent on its own when dirty."""
+
+    def __init__(self, fb, x, y, w, h):
+        if x < 0 or y < 0 or w <= 0 or h <= 0 or x + w > fb.width or y + h > fb.height:
+            raise ValueError("region outside the framebuffer")
+        self.x = x
+        self.y = y
+        self.w = w
+        self.h = h
+        self.dirty = False
+        stride = fb.width * 2
+        if w == fb.width:
+            # full-width rows are contiguous: a single write
+            self.rows = (fb.mv[y * stride : (y + h) * stride],)
+        else:
+            self.rows = tuple(
+                fb.mv[row * stride + x * 2 : row * stride + (x + w) * 2] for row in range(y, y + h)
+            )
+
+    @property
+    def nbytes(self):
+        return self.w * self.h * 2
+
+    def mark(self):
+        self.dirty = True
+
+
+class Framebuffer:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.buf = bytearray(width * height * 2)
+        self.mv = memoryview(self.buf)
+        self.regions = []
+        self._full = True  # the panel content is unknown until the first flush
+
+    def region(self, x, y, w, h):
+        """Register an area that is redrawn on its own; do this once at setup."""
+        region = Region(self, x, y, w, h)
+        self.regions.append(region)
+        return region
+
+    def invalidate(self):
+        """Send the whole frame on the next ``flush``, e.g. after a layout change."""
+        self._full = True
+
+    @micropython.native
+    def fill_rect(self, x, y, w, h, color):
+        buf = self.buf
+        hi = color >> 8
+        lo = color & 0xFF
+        stride = self.width * 2
+        for row in range(y, y + h):
+            off = row * stride + x * 2
+            for _ in range(w):
+                buf[off] = hi
+                buf[off + 1] = lo
+                off += 2
+
+    def fill(self, color):
+        self.fill_rect(0, 0, self.width, self.height, color)
+        self._full = True
+
+    @micropython.native
+    def glyph(self, bitmap, x, y, fg, bg, scale=1):
+        """Draw one 6x8 cell at ``x, y``, every font pixel as a ``scale`` square."""
+        buf = self.buf
+        stride = self.width * 2
+        for gy in range(GLYPH_HEIGHT):
+            bits = bitmap[gy] if gy < 7 else 0
+            for gx in range(GLYPH_WIDTH):
+                color = fg if (bits << gx) & 0x10 else bg
+                hi = color >> 8
+                lo = color & 0xFF
+                top = y + gy * scale
+                for row in range(top, top + scale):
+                    off = row * stride + (x + gx * scale) * 2
+                    for _ in range(scale):
+                        buf[off] = hi
+                        buf[off + 1] = lo
+                        off += 2
+
+    def text(self, s, x, y, fg, bg, scale=1):
+        """Draw ``s`` (upper case, digits, ``-.:%°``) and return its width in pixels."""
+        cell = GLYPH_WIDTH * scale
+        for ch in s.upper():
+            self.glyph(FONT.get(ch, FONT["?"]), x, y, fg, bg, scale)
+            x += cell
+        return len(s) * cell
+
+    def flush(self, lcd):
+        """Send what changed since the last flush; return the number of pixel bytes."""
+        if self._full:
+            self._full = False
+            for region in self.regions:
+                region.dirty = False
+            lcd.set_window(0, 0, self.width, self.height)
+            lcd.write(self.mv)
+            return len(self.buf)
+        sent = 0
+        for region in self.regions:
+            if region.dirty:
+                region.dirty = False
+                lcd.set_window(region.x, region.y, region.w, region.h)
+                lcd.write_rows(region.rows)
+                sent += region.nbytes
+        return sent
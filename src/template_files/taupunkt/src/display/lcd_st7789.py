@@ -0,0 +1,129 @@
+"""Minimal ST7789 driver for the Waveshare 1.47" 172x320 LCD (RGB565 over SPI).
+
+Only what the framebuffer needs: panel setup, an address window and raw
+pixel writes. Command and window bytes go through two small preallocated
+buffers, so drawing allocates nothing. ``spi`` is a ``machine.SPI`` (or
+``FakeSPI`` on the host); the pins are called with 0/1 like ``machine.Pin``.
+
+On the Pico 2 (see ``pin_configuration`` in the template metadata)::
+
+    from machine import Pin, SPI
+
+    spi = SPI(0, baudrate=62_500_000, sck=Pin(6), mosi=Pin(7))
+    lcd = ST7789(spi, dc=Pin(18, Pin.OUT), cs=Pin(17, Pin.OUT), rst=Pin(19, Pin.OUT))
+    lcd.init()
+"""
+
+try:
+    from time import sleep_ms
+except ImportError:  # CPython
+    from time import sleep
+
+    def sleep_ms(ms):
+        sleep(ms / 1000)
+
+
+SWRESET = 0x01
+SLPOUT = 0x11
+NORON = 0x13
+INVON = 0x21
+DISPON = 0x29
+CASET = 0x2A
+RASET = 0x2B
+RAMWR = 0x2C
+MADCTL = 0x36
+COLMOD = 0x3A
+
+WIDTH = 172
+HEIGHT = 320
+# the controller RAM is 240 columns wide; the 172 visible ones are centred
+X_OFFSET = 34
+# bytes of command overhead per window: CASET + 4, RASET + 4, RAMWR
+WINDOW_BYTES = 11
+
+
+class ST7789:
+    def __init__(
+        self,
+        spi,
+        dc,
+        cs=None,
+        rst=None,
+        width=WIDTH,
+        height=HEIGHT,
+        x_offset=X_OFFSET,
+        y_offset=0,
+    ):
+        self.spi = spi
+        self.dc = dc
+        self.cs = cs
+        self.rst = rst
+        self.width = width
+        self.height = height
+        self.x_offset = x_offset
+        self.y_offset = y_offset
+        self._cmd = bytearray(1)
+        self._args = bytearray(4)
+
+    def _select(self, level):
+        if self.cs is not None:
+            self.cs(level)
+
+    def command(self, cmd, data=None):
+        """Send one command byte, then its parameters (if any) as data."""
+        self._cmd[0] = cmd
+        self._select(0)
+        self.dc(0)
+        self.spi.write(self._cmd)
+        if data:
+            self.dc(1)
+            self.spi.write(data)
+        self._select(1)
+
+    def init(self):
+        """Reset the panel and switch it on in portrait RGB565 mode."""
+        if self.rst is not None:
+            self.rst(0)
+            sleep_ms(10)
+            self.rst(1)
+        self.command(SWRESET)
+        sleep_ms(150)
+        self.command(SLPOUT)
+        sleep_ms(10)
+        self.command(COLMOD, b"\x55")  # 16 bit per pixel
+        self.command(MADCTL, b"\x00")
+        self.command(INVON)  # this panel shows inverted colours otherwise
+        self.command(NORON)
+        self.command(DISPON)
+        sleep_ms(10)
+
+    def _range(self, cmd, start, end):
+        args = self._args
+        args[0] = start >> 8
+        args[1] = start & 0xFF
+        args[2] = end >> 8
+        args[3] = end & 0xFF
+        self.command(cmd, args)
+
+    def set_window(self, x, y, w, h):
+        """Address the ``w`` x ``h`` rectangle at ``x, y`` and start a RAM write."""
+        x += self.x_offset
+        y += self.y_offset
+        self._range(CASET, x, x + w - 1)
+        self._range(RASET, y, y + h - 1)
+        self.command(RAMWR)
+
+    def write(self, buf):
+        """Send pixel data for the current window."""
+        self._select(0)
+        self.dc(1)
+        self.spi.write(buf)
+        self._select(1)
+
+    def write_rows(self, rows):
+        """Send several pixel buffers back to back with one chip select."""
+        self._select(0)
+        self.dc(1)
+        for row in rows:
+            self.spi.write(row)
+        self._select(1)
@@ -0,0 +1,150 @@
+"""Dew point screen: static labels plus four value fields that redraw on change.
+
+Values come in as the integers the rest of the project uses (centi-degrees,
+centi-percent, deci-hPa). Each ``ValueField`` rounds to what it shows and
+compares that number with the one on screen, so sensor noise below the
+display resolution costs neither drawing nor SPI traffic. The digits are
+rendered straight from the integer, without building a string.
+
+    lcd.init()
+    ui = DewPointUI(lcd)
+    while True:
+        ui.update(t_c, rh_c, dew_point_fixed(t_c, rh_c), p_dhpa)
+"""
+
+from .graphics import (
+    BLACK,
+    CYAN,
+    DIGITS,
+    FONT,
+    GLYPH_HEIGHT,
+    GLYPH_WIDTH,
+    GREY,
+    ORANGE,
+    WHITE,
+    Framebuffer,
+    micropython,
+)
+
+_DOT = FONT["."]
+_MINUS = FONT["-"]
+_BLANK = FONT[" "]
+
+
+class ValueField:
+    """Right-aligned fixed-point number in a region of ``chars`` glyph cells.
+
+    ``divisor`` converts the input unit to the shown one (10 turns
+    centi-degrees into tenths), ``decimals`` places the point.
+    """
+
+    def __init__(self, fb, x, y, chars, divisor=10, decimals=1, scale=4, fg=WHITE, bg=BLACK):
+        self.fb = fb
+        self.x = x
+        self.y = y
+        self.chars = chars
+        self.divisor = divisor
+        self.decimals = decimals
+        self.scale = scale
+        self.fg = fg
+        self.bg = bg
+        self.shown = None
+        self.region = fb.region(x, y, chars * GLYPH_WIDTH * scale, GLYPH_HEIGHT * scale)
+
+    def update(self, value):
+        """Show ``value`` if it differs on screen; return True when it was redrawn."""
+        half = self.divisor >> 1
+        if value < 0:
+            shown = -((half - value) // self.divisor)
+        else:
+            shown = (value + half) // self.divisor
+        if shown == self.shown:
+            return False
+        self.shown = shown
+        self._render(shown)
+        self.region.mark()
+        return True
+
+    @micropython.native
+    def _render(self, n):
+        fb = self.fb
+        scale = self.scale
+        cell = GLYPH_WIDTH * scale
+        negative = n < 0
+        if negative:
+            n = -n
+        decimals = self.decimals
+        point = decimals == 0
+        digits = 0
+        pos = self.chars
+        while pos:
+            pos -= 1
+            if not point and digits == decimals:
+                glyph = _DOT
+                point = True
+            elif n or digits <= decimals:
+                glyph = DIGITS[n % 10]
+                n //= 10
+                digits += 1
+            elif negative:
+                glyph = _MINUS
+                negative = False
+            else:
+                glyph = _BLANK
+            fb.glyph(glyph, self.x + pos * cell, self.y, self.fg, self.bg, scale)
+
+
+class DewPointUI:
+    """Portrait layout for the 172x320 panel: title and four labelled values."""
+
+    TITLE = "TAUPUNKT"
+    # label, input divisor, colour; value order as in ``update``
+    FIELDS = (
+        ("TEMPERATUR °C", 10, WHITE),
+        ("FEUCHTE %", 10, WHITE),
+        ("TAUPUNKT °C", 10, CYAN),
+        ("DRUCK HPA", 1, WHITE),
+    )
+    TOP = 40
+    BLOCK = 68  # label 16 px, gap 4 px, value 32 px, gap 16 px
+    CHARS = 6
+    SCALE = 4
+
+    def __init__(self, lcd, fb=None):
+        self.lcd = lcd
+        self.fb = fb or Framebuffer(lcd.width, lcd.height)
+        width = self.CHARS * GLYPH_WIDTH * self.SCALE
+        x = (self.fb.width - width) // 2
+        self.fields = tuple(
+            ValueField(
+                self.fb,
+                x,
+                self.TOP + i * self.BLOCK + 20,
+                self.CHARS,
+                divisor,
+                1,
+                self.SCALE,
+                color,
+            )
+            for i, (_, divisor, color) in enumerate(self.FIELDS)
+        )
+        self.draw_static()
+
+    def draw_static(self):
+        """Draw background, title and labels; the next flush sends the full frame."""
+        fb = self.fb
+        fb.fill(BLACK)
+        fb.text(self.TITLE, (fb.width - len(self.TITLE) * 12) // 2, 12, ORANGE, BLACK, 2)
+        for i, (label, _, _) in enumerate(self.FIELDS):
+            fb.text(label, 4, self.TOP + i * self.BLOCK, GREY, BLACK, 2)
+        for field in self.fields:
+            field.shown = None
+
+    def update(self, t_c, rh_c, dew_point_c, pressure_dhpa):
+        """Redraw the changed fields and send them; return the pixel bytes sent."""
+        fields = self.fields
+        fields[0].update(t_c)
+        fields[1].update(rh_c)
+        fields[2].update(dew_point_c)
+        fields[3].update(pressure_dhpa)
+        return self.fb.flush(self.lcd)
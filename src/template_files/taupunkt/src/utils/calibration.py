@@ -0,0 +1,93 @@
+"""Integer sensor calibration and fusion for the Pico.
+
+Readings are ints in centi-units (2150 = 21.50 C or 21.50 %RH), like
+``dew_point_fixed`` expects. A ``Calibration`` maps a raw reading with a
+Q14 gain and an offset; ``Fusion`` combines the same quantity from several
+sensors with fixed inverse-variance weights. Neither allocates per
+reading: the weights are computed once and ``fuse`` reads a preallocated
+``array``.
+"""
+
+from array import array
+
+try:
+    import micropython
+
+    micropython.const  # the project's micropython/ folder is not the module
+except (ImportError, AttributeError):  # CPython: @micropython.native is a no-op
+
+    class micropython:  # noqa: N801
+        @staticmethod
+        def native(func):
+            return func
+
+
+GAIN_Q = 14
+GAIN_ONE = 1 << GAIN_Q
+WEIGHT_Q = 8
+WEIGHT_ONE = 1 << WEIGHT_Q
+
+
+class Calibration:
+    """``corrected = raw * gain / 2**14 + offset`` in centi-units."""
+
+    __slots__ = ("offset", "gain")
+
+    def __init__(self, offset=0, gain=GAIN_ONE):
+        self.offset = offset
+        self.gain = gain
+
+    @classmethod
+    def from_points(cls, raw_low, ref_low, raw_high, ref_high):
+        """Two-point calibration against reference readings (runs once, may use floats)."""
+        if raw_high == raw_low:
+            raise ValueError("calibration points must differ")
+        gain = (ref_high - ref_low) / (raw_high - raw_low)
+        offset = ref_low - raw_low * gain
+        return cls(int(round(offset)), int(round(gain * GAIN_ONE)))
+
+    @classmethod
+    def from_config(cls, entry):
+        """Build from a ``{"offset": ..., "gain": ...}`` entry of sensor_offsets.json."""
+        return cls(int(entry.get("offset", 0)), int(entry.get("gain", GAIN_ONE)))
+
+    @micropython.native
+    def apply(self, raw):
+        return ((raw * self.gain) >> GAIN_Q) + self.offset
+
+
+def load_calibrations(config):
+    """Return ``{(sensor, quantity): Calibration}`` for a parsed sensor_offsets.json."""
+    result = {}
+    for sensor, quantities in config.items():
+        for quantity, entry in quantities.items():
+            result[(sensor, quantity)] = Calibration.from_config(entry)
+    return result
+
+
+class Fusion:
+    """Weighted mean of one quantity from several sensors.
+
+    ``sigmas`` are the sensors' accuracies in the reading's unit; weights
+    are proportional to ``1 / sigma**2`` and stored as Q8 ints summing to
+    256, so ``fuse`` is a handful of integer multiply-adds.
+    """
+
+    def __init__(self, sigmas):
+        inverse = [1.0 / (s * s) for s in sigmas]
+        total = sum(inverse)
+        weights = [int(w / total * WEIGHT_ONE + 0.5) for w in inverse]
+        # give the rounding remainder to the most accurate sensor
+        best = inverse.index(max(inverse))
+        weights[best] += WEIGHT_ONE - sum(weights)
+        self.weights = array("i", weights)
+        self.count = len(weights)
+
+    @micropython.native
+    def fuse(self, values):
+        """Return the weighted mean of ``values[:count]`` (a preallocated array)."""
+        weights = self.weights
+        acc = WEIGHT_ONE >> 1
+        for i in range(self.count):
+            acc += values[i] * weights[i]
+        return acc >> WEIGHT_Q
@@ -0,0 +1,167 @@
+"""Dew point calculation (Magnus approximation).
+
+Three implementations of the same formula:
+
+* ``dew_point`` - scalar float, pure Python, runs unchanged on MicroPython.
+* ``dew_point_array`` - NumPy-vectorized for logged data on the host. It
+  works through the input in cache-sized chunks with in-place ufuncs, so
+  only one chunk-sized scratch buffer and mask are allocated however long
+  the input is.
+* ``dew_point_fixed`` - integer fixed point for the Pico. The log term
+  comes from a 257-entry ``array`` lookup table with linear
+  interpolation; every intermediate stays below 2**30, so on MicroPython
+  all values are small ints and a sample allocates nothing.
+
+The float versions accept an optional pressure pair to compute the pressure dew point
+of air that is compressed or expanded from ``pressure`` to
+``target_pressure`` (the vapour pressure scales with the total pressure).
+"""
+
+from array import array
+from math import log
+
+try:
+    import numpy as np
+except ImportError:  # MicroPython
+    np = None
+
+try:
+    import micropython
+
+    micropython.const  # the project's micropython/ folder is not the module
+except (ImportError, AttributeError):  # CPython: @micropython.native is a no-op
+
+    class micropython:  # noqa: N801
+        @staticmethod
+        def native(func):
+            return func
+
+
+# Magnus coefficients over water (Sonntag 1990), valid -45..60 C
+MAGNUS_A = 17.62
+MAGNUS_B = 243.12  # C
+MAGNUS_C = 6.112  # hPa
+
+LN100 = log(100.0)
+# elements per chunk in dew_point_array; 3 x 64K float64 stay in L2
+CHUNK = 1 << 16
+
+
+def saturation_vapor_pressure(t):
+    """Return the saturation vapour pressure over water in hPa at ``t`` C."""
+    return MAGNUS_C * 2.718281828459045 ** (MAGNUS_A * t / (MAGNUS_B + t))
+
+
+def dew_point(t, rh, pressure=None, target_pressure=None):
+    """Return the dew point in C for temperature ``t`` (C) and ``rh`` (%).
+
+    With ``pressure`` and ``target_pressure`` (same unit) the result is the
+    dew point after the air was brought to ``target_pressure``.
+    """
+    if rh <= 0.0:
+        raise ValueError("relative humidity must be > 0")
+    gamma = log(rh) - LN100 + MAGNUS_A * t / (MAGNUS_B + t)
+    if pressure is not None and target_pressure is not None:
+        gamma += log(target_pressure / pressure)
+    return MAGNUS_B * gamma / (MAGNUS_A - gamma)
+
+
+def dew_point_array(t, rh, pressure=None, target_pressure=None, out=None, chunk=CHUNK):
+    """Vectorized ``dew_point`` for 1-D arrays; returns ``out``.
+
+    ``t`` and ``rh`` must have the same length; ``pressure`` and
+    ``target_pressure`` may be arrays of that length or scalars. Samples
+    with ``rh <= 0`` give NaN instead of raising.
+    """
+    if np is None:
+        raise RuntimeError("dew_point_array needs NumPy")
+    t = np.asarray(t, dtype=np.float64)
+    rh = np.asarray(rh, dtype=np.float64)
+    if t.shape != rh.shape or t.ndim != 1:
+        raise ValueError("t and rh must be 1-D arrays of the same length")
+    n = t.shape[0]
+    if out is None:
+        out = np.empty(n, dtype=np.float64)
+    shift = None
+    if pressure is not None and target_pressure is not None:
+        shift = np.log(np.asarray(target_pressure, dtype=np.float64)) - np.log(
+            np.asarray(pressure, dtype=np.float64)
+        )
+        if shift.ndim:
+            shift = np.broadcast_to(shift, (n,))
+    scratch = np.empty(min(chunk, n), dtype=np.float64)
+    invalid = np.empty(min(chunk, n), dtype=np.bool_)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for start in range(0, n, chunk):
+            stop = min(start + chunk, n)
+            ts, o, s = t[start:stop], out[start:stop], scratch[: stop - start]
+            rhs, m = rh[start:stop], invalid[: stop - start]
+            # s = A * t / (B + t)
+            np.add(ts, MAGNUS_B, out=s)
+            np.divide(ts, s, out=s)
+            s *= MAGNUS_A
+            # o = gamma = ln(rh / 100) + s (+ pressure shift)
+            np.log(rhs, out=o)
+            o -= LN100
+            o += s
+            if shift is not None:
+                o += shift[start:stop] if shift.ndim else shift
+            # o = B * gamma / (A - gamma)
+            np.subtract(MAGNUS_A, o, out=s)
+            o *= MAGNUS_B
+            o /= s
+            # rh <= 0 gives NaN; the mask is reused per chunk like s
+            np.less_equal(rhs, 0.0, out=m)
+            np.copyto(o, np.nan, where=m)
+    return out
+
+
+# --- fixed point ------------------------------------------------------------
+# Temperatures and dew points are centi-degrees C, humidity is centi-percent
+# (2150 = 21.50 C, 4550 = 45.50 %RH). Internal values are Q16 or Q12.
+RH_MIN_C = 100  # 1 %RH; keeps B * gamma inside the small-int range
+RH_MAX_C = 10000
+_A_Q12 = 72172  # round(17.62 * 4096)
+_B_C = 24312  # 243.12 C
+_LN2_Q16 = 45426  # round(ln 2 * 65536)
+_LN10000_Q16 = 603609  # round(ln 10000 * 65536)
+# ln(1 + i / 256) in Q16, i = 0..256
+LN_LUT = array("i", [int(log(1 + i / 256) * 65536 + 0.5) for i in range(257)])
+
+
+@micropython.native
+def dew_point_fixed(t_c, rh_c):
+    """Return the dew point in centi-degrees for ``t_c`` (centi-C) and ``rh_c`` (centi-%).
+
+    Valid for -40..80 C; humidity is clamped to 1..100 %RH.
+    """
+    if rh_c < RH_MIN_C:
+        rh_c = RH_MIN_C
+    elif rh_c > RH_MAX_C:
+        rh_c = RH_MAX_C
+    # ln(rh_c): normalize into [2**15, 2**16), then interpolate the table
+    m = rh_c
+    k = 0
+    while m < 32768:
+        m <<= 1
+        k += 1
+    m -= 32768
+    i = m >> 7
+    lo = LN_LUT[i]
+    gamma = lo + (((LN_LUT[i + 1] - lo) * (m & 127)) >> 7)
+    gamma += (15 - k) * _LN2_Q16 - _LN10000_Q16
+    # + A * t / (B + t) in Q16; quotient and remainder keep A * t below 2**30
+    d = _B_C + t_c
+    q = _A_Q12 * t_c
+    gamma += ((q // d) << 4) + (((q % d) << 4) // d)
+    # B * gamma / (A - gamma), rounded, with gamma in Q12
+    g = (gamma + 8) >> 4
+    den = _A_Q12 - g
+    return (_B_C * g + (den >> 1)) // den
+
+
+@micropython.native
+def dew_point_fixed_into(t_c, rh_c, out, n):
+    """Fill ``out[:n]`` from the preallocated ``t_c``/``rh_c`` arrays."""
+    for j in range(n):
+        out[j] = dew_point_fixed(t_c[j], rh_c[j])
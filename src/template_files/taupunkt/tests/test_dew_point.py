@@ -0,0 +1,93 @@
+"""Accuracy and speed tests for src/utils/dew_point.py (run on the host with pytest)."""
+
+import math
+import time
+
+import pytest
+
+from src.utils.dew_point import dew_point, dew_point_array
+
+
+def reference_vapor_pressure(t):
+    """Buck (1996) saturation vapour pressure over water in hPa."""
+    return 6.1121 * math.exp((18.678 - t / 234.5) * (t / (257.14 + t)))
+
+
+def reference_dew_point(t, rh):
+    """Dew point by bisection on the Buck curve, independent of Magnus."""
+    target = rh / 100.0 * reference_vapor_pressure(t)
+    lo, hi = -100.0, t
+    for _ in range(60):
+        mid = (lo + hi) / 2
+        if reference_vapor_pressure(mid) < target:
+            lo = mid
+        else:
+            hi = mid
+    return (lo + hi) / 2
+
+
+GRID = [(t, rh) for t in range(-40, 61, 5) for rh in (1, 5, 10, 25, 50, 75, 90, 100)]
+
+
+@pytest.mark.parametrize(
+    "low, high, min_rh, bound",
+    [
+        # indoor/outdoor range of the sensors
+        (-20, 50, 10, 0.1),
+        # full Magnus validity range, down to 1 %RH
+        (-40, 60, 1, 0.35),
+    ],
+)
+def test_scalar_matches_reference(low, high, min_rh, bound):
+    worst = max(
+        abs(dew_point(t, rh) - reference_dew_point(t, rh))
+        for t, rh in GRID
+        if low <= t <= high and rh >= min_rh
+    )
+    assert worst < bound
+
+
+def test_saturated_air_dew_point_equals_temperature():
+    for t in (-30.0, 0.0, 21.5, 45.0):
+        assert dew_point(t, 100.0) == pytest.approx(t, abs=1e-9)
+
+
+def test_pressure_dew_point():
+    # compressing air to 8 bar raises its dew point well above ambient
+    assert dew_point(20.0, 50.0, 1013.0, 8000.0) > 40.0
+    assert dew_point(20.0, 50.0, 1013.0, 1013.0) == pytest.approx(dew_point(20.0, 50.0))
+
+
+def test_invalid_humidity():
+    with pytest.raises(ValueError):
+        dew_point(20.0, 0.0)
+
+
+def test_vectorized_matches_scalar():
+    np = pytest.importorskip("numpy")
+    rng = np.random.default_rng(7)
+    t = rng.uniform(-40, 60, 200_000)
+    rh = rng.uniform(1, 100, 200_000)
+    vector = dew_point_array(t, rh, chunk=4096)
+    for i in range(0, 200_000, 997):
+        assert vector[i] == pytest.approx(dew_point(t[i], rh[i]), abs=1e-9)
+    pressure = dew_point_array(t[:10], rh[:10], 1013.0, np.full(10, 2000.0))
+    assert pressure[3] == pytest.approx(dew_point(t[3], rh[3], 1013.0, 2000.0))
+    assert math.isnan(dew_point_array([20.0], [0.0])[0])
+    masked = dew_point_array(np.full(10, 20.0), [50, 0, 50, -1, 50, 50, 0, 50, 50, 50], chunk=4)
+    assert [i for i in range(10) if math.isnan(masked[i])] == [1, 3, 6]
+
+
+def test_vectorized_throughput():
+    np = pytest.importorskip("numpy")
+    n = 10_000_000
+    rng = np.random.default_rng(1)
+    t = rng.uniform(-40, 60, n)
+    rh = rng.uniform(1, 100, n)
+    out = np.empty(n)
+    dew_point_array(t[:1000], rh[:1000])  # warm up
+    start = time.perf_counter()
+    dew_point_array(t, rh, out=out)
+    elapsed = time.perf_counter() - start
+    print(f"\n{n:,} samples in {elapsed * 1000:.0f} ms ({n / elapsed / 1e6:.0f} M/s)")
+    assert elapsed < 1.0
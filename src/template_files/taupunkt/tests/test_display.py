@@ -0,0 +1,127 @@
+"""Host tests for the display layer, using the fake SPI bus in src/display/fake_spi.py."""
+
+import tracemalloc
+
+import pytest
+
+from src.display.fake_spi import FakePin, FakeSPI
+from src.display.graphics import BLACK, FONT, WHITE, Framebuffer
+from src.display.lcd_st7789 import (
+    CASET,
+    COLMOD,
+    DISPON,
+    INVON,
+    MADCTL,
+    NORON,
+    RAMWR,
+    RASET,
+    SLPOUT,
+    SWRESET,
+    WINDOW_BYTES,
+    X_OFFSET,
+    ST7789,
+)
+from src.display.ui import DewPointUI, ValueField
+
+FULL_FRAME = 172 * 320 * 2
+
+
+@pytest.fixture
+def lcd():
+    dc = FakePin()
+    return ST7789(FakeSPI(dc), dc, cs=FakePin(1))
+
+
+def _screen(lcd):
+    return lcd.spi.rect(X_OFFSET, 0, lcd.width, lcd.height)
+
+
+def test_init_sequence(lcd):
+    lcd.init()
+    assert lcd.spi.commands == [SWRESET, SLPOUT, COLMOD, MADCTL, INVON, NORON, DISPON]
+    assert lcd.cs() == 1
+
+
+def test_first_update_sends_the_full_frame(lcd):
+    ui = DewPointUI(lcd)
+    assert len(ui.fb.buf) == FULL_FRAME == 110_080
+    assert ui.update(2150, 4550, 921, 10132) == FULL_FRAME
+    assert lcd.spi.data_bytes == FULL_FRAME + 8  # + CASET/RASET arguments
+    assert lcd.spi.commands == [CASET, RASET, RAMWR]
+    assert _screen(lcd) == bytes(ui.fb.buf)
+
+
+def test_unchanged_values_send_nothing(lcd):
+    ui = DewPointUI(lcd)
+    ui.update(2150, 4550, 921, 10132)
+    lcd.spi.reset_counts()
+    # noise below the shown resolution (0.1) does not count as a change
+    assert ui.update(2151, 4549, 923, 10132) == 0
+    assert lcd.spi.total_bytes == 0
+
+
+def test_only_changed_fields_are_sent(lcd):
+    ui = DewPointUI(lcd)
+    ui.update(2150, 4550, 921, 10132)
+    lcd.spi.reset_counts()
+    sent = ui.update(2160, 4550, 935, 10132)
+    field = ui.fields[0].region.nbytes
+    assert sent == 2 * field == 2 * 144 * 32 * 2
+    assert lcd.spi.total_bytes == 2 * (field + WINDOW_BYTES)
+    assert lcd.spi.total_bytes < FULL_FRAME // 5
+    assert _screen(lcd) == bytes(ui.fb.buf)
+    print("\nfull frame %d bytes, two fields %d bytes" % (FULL_FRAME, lcd.spi.total_bytes))
+
+
+def test_incremental_updates_match_a_full_redraw(lcd):
+    ui = DewPointUI(lcd)
+    readings = [(2150, 4550, 921, 10132), (-1234, 9999, -1502, 9876), (5, 100, -5, 10000)]
+    for reading in readings:
+        ui.update(*reading)
+    dc = FakePin()
+    fresh = ST7789(FakeSPI(dc), dc)
+    DewPointUI(fresh).update(*readings[-1])
+    assert _screen(lcd) == _screen(fresh)
+
+
+def test_value_field_formats_fixed_point():
+    fb = Framebuffer(172, 320)
+    field = ValueField(fb, 0, 0, 6, divisor=10, decimals=1, scale=1, fg=WHITE, bg=BLACK)
+    reference = Framebuffer(172, 320)
+    for value, text in [(2150, "  21.5"), (-5, "  -0.1"), (4, "   0.0"), (-2345, " -23.5")]:
+        field.update(value)
+        reference.text(text, 0, 0, WHITE, BLACK)
+        assert fb.buf == reference.buf, text
+
+
+def test_glyphs_use_the_font():
+    fb = Framebuffer(12, 16)
+    fb.glyph(FONT["1"], 0, 0, WHITE, BLACK, scale=2)
+    # top row of "1" is 00100: white from x=4 to x=5 at scale 2
+    top = [fb.buf[2 * x] for x in range(12)]
+    assert top == [0, 0, 0, 0, 0xFF, 0xFF, 0, 0, 0, 0, 0, 0]
+
+
+class _NullSPI:
+    def write(self, buf):
+        pass
+
+
+def test_updates_allocate_no_buffers():
+    # a bus that keeps nothing, so only the display code is measured
+    ui = DewPointUI(ST7789(_NullSPI(), FakePin()))
+    buf = ui.fb.buf
+    ui.update(2150, 4550, 921, 10132)
+    ui.update(2160, 4560, 931, 10133)
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for i in range(5):
+            ui.update(2000 + 10 * i, 4000 + 10 * i, 800 + 10 * i, 10000 + i)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert ui.fb.buf is buf
+    # only transient small objects (CPython ints, bound methods), never a frame copy
+    assert peak - before < 4096
+    assert current - before < 1024
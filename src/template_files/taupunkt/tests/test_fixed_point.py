@@ -0,0 +1,131 @@
+"""Host checks for the fixed-point dew point and calibration (CPython + pytest).
+
+Besides the error bound against the float version, these tests trace the
+bytecode each variant executes: the fixed-point path must not call
+``log``/``exp`` and must keep every local below 2**30, the limit for
+MicroPython small ints on 32-bit ports (larger ints would be allocated).
+"""
+
+import dis
+import json
+import sys
+from array import array
+from pathlib import Path
+
+import pytest
+
+from src.utils import dew_point as dp
+from src.utils.calibration import Calibration, Fusion, load_calibrations
+
+SMALL_INT = 1 << 30
+
+
+class OpCounter:
+    """Count executed arithmetic/compare/subscript opcodes and calls in one function."""
+
+    def __init__(self, code, check_small_ints=False):
+        self.code = code
+        self.check_small_ints = check_small_ints
+        self.ops = {"arith": 0, "compare": 0, "subscript": 0, "call": 0}
+        self.largest = 0
+
+    def _local(self, frame, event, arg):
+        if event == "opcode":
+            name = dis.opname[frame.f_code.co_code[frame.f_lasti]]
+            if name == "BINARY_SUBSCR":
+                self.ops["subscript"] += 1
+            elif name.startswith(("BINARY_", "INPLACE_", "UNARY_")):
+                self.ops["arith"] += 1
+            elif name == "COMPARE_OP":
+                self.ops["compare"] += 1
+            elif name.startswith("CALL"):
+                self.ops["call"] += 1
+            if self.check_small_ints:
+                for value in frame.f_locals.values():
+                    if isinstance(value, int):
+                        self.largest = max(self.largest, abs(value))
+        return self._local
+
+    def _global(self, frame, event, arg):
+        if frame.f_code is self.code:
+            frame.f_trace_opcodes = True
+            return self._local
+        return None
+
+    def run(self, func, *args):
+        sys.settrace(self._global)
+        try:
+            return func(*args)
+        finally:
+            sys.settrace(None)
+
+
+GRID = [(t, rh) for t in range(-4000, 8001, 250) for rh in range(100, 10001, 330)]
+
+
+def test_fixed_point_error_bound():
+    worst = max(
+        abs(dp.dew_point_fixed(t, rh) / 100 - dp.dew_point(t / 100, rh / 100)) for t, rh in GRID
+    )
+    assert worst < 0.02  # C, well below the sensors' +/-1.5 C
+
+
+def test_fixed_point_clamps_humidity():
+    assert dp.dew_point_fixed(2000, 0) == dp.dew_point_fixed(2000, dp.RH_MIN_C)
+    assert dp.dew_point_fixed(2000, 12000) == pytest.approx(2000, abs=1)
+
+
+def test_fixed_point_stays_in_small_ints_and_avoids_log(monkeypatch):
+    log_calls = []
+    monkeypatch.setattr(dp, "log", lambda x: log_calls.append(x) or __import__("math").log(x))
+
+    fixed = OpCounter(dp.dew_point_fixed.__code__, check_small_ints=True)
+    for t, rh in GRID[::7]:
+        fixed.run(dp.dew_point_fixed, t, rh)
+    assert log_calls == []
+    assert fixed.largest < SMALL_INT
+
+    floating = OpCounter(dp.dew_point.__code__)
+    for t, rh in GRID[::7]:
+        floating.run(dp.dew_point, t / 100, rh / 100)
+    assert log_calls  # the float version needs a log per sample
+
+    samples = len(GRID[::7])
+    print("\nops per sample   fixed   float")
+    for kind in fixed.ops:
+        print(f"{kind:<14} {fixed.ops[kind] / samples:7.1f} {floating.ops[kind] / samples:7.1f}")
+    print(f"log calls      {0:7.1f} {len(log_calls) / samples:7.1f}")
+
+
+def test_batch_fills_preallocated_output():
+    n = 64
+    t = array("i", [2000 + i * 10 for i in range(n)])
+    rh = array("i", [5000] * n)
+    out = array("i", [0] * n)
+    dp.dew_point_fixed_into(t, rh, out, n)
+    assert list(out) == [dp.dew_point_fixed(t[i], 5000) for i in range(n)]
+
+
+def test_two_point_calibration():
+    cal = Calibration.from_points(raw_low=1000, ref_low=1050, raw_high=3000, ref_high=3010)
+    assert cal.apply(1000) == pytest.approx(1050, abs=1)
+    assert cal.apply(3000) == pytest.approx(3010, abs=1)
+    with pytest.raises(ValueError):
+        Calibration.from_points(1000, 1000, 1000, 2000)
+
+
+def test_calibrations_from_config():
+    config = json.loads(
+        (Path(__file__).resolve().parents[1] / "config" / "sensor_offsets.json").read_text()
+    )
+    calibrations = load_calibrations(config)
+    assert calibrations[("SHT41", "humidity")].apply(4550) == 4550
+
+
+def test_fusion_prefers_accurate_sensor():
+    # SHT41 +/-1.5 C, AHT20 +/-2 C
+    fusion = Fusion([1.5, 2.0])
+    assert sum(fusion.weights) == 256
+    assert fusion.weights[0] > fusion.weights[1]
+    fused = fusion.fuse(array("i", [2000, 2100]))
+    assert 2000 < fused < 2050
@@ -0,0 +1,243 @@
+"""Fixed-record binary ring-buffer log for sensor readings.
+
+Each reading is packed with ``struct`` into one 16-byte record::
+
+    <I  timestamp (s)          <h  SHT41 temperature (centi-C)
+    <H  SHT41 humidity (c-%)   <h  AHT20 temperature (centi-C)
+    <H  AHT20 humidity (c-%)   <H  BMP280 pressure (deci-hPa)
+    <B  lap (mod 256)          <B  CRC-8 of the first 15 bytes
+
+The file is preallocated once (16-byte header + ``capacity`` records) and
+never grows. Records are collected in a preallocated batch buffer and
+written in one go, so the flash sees a few large writes instead of one
+small write per reading. The lap byte counts how often the writer went
+round the file; after a restart the write position follows the last
+valid slot of the first lap. Slots without a valid CRC (never written,
+torn by a power loss or corrupted later) are ignored there and skipped
+by the reader.
+"""
+
+import struct
+
+# MicroPython's struct has no Struct class: use the module-level functions
+RECORD_FMT = "<IhHhHHBB"
+RECORD_SIZE = struct.calcsize(RECORD_FMT)  # 16
+HEADER_FMT = "<4sBBHII"  # magic, version, record size, 0, capacity, 0
+HEADER_SIZE = struct.calcsize(HEADER_FMT)
+MAGIC = b"TPLG"
+VERSION = 1
+FIELDS = (
+    "timestamp",
+    "sht41_temp",
+    "sht41_rh",
+    "aht20_temp",
+    "aht20_rh",
+    "pressure",
+)
+DEFAULT_CAPACITY = 65536  # 1 MiB of flash
+DEFAULT_BATCH = 64  # records per write (1 KiB)
+READ_CHUNK = 256  # records per read in the iterator
+
+
+def _crc8_table():
+    table = bytearray(256)
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x07) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+        table[i] = crc
+    return bytes(table)
+
+
+CRC8_TABLE = _crc8_table()
+
+
+def crc8(buf, start, length):
+    """CRC-8 (poly 0x07, init 0xFF) of ``buf[start:start + length]`` without slicing.
+
+    The non-zero init makes an all-zero, never written slot invalid.
+    """
+    crc = 0xFF
+    table = CRC8_TABLE
+    for i in range(start, start + length):
+        crc = table[crc ^ buf[i]]
+    return crc
+
+
+class RingLog:
+    """Append-only ring buffer of sensor records in a preallocated file.
+
+    ``append`` packs into the batch buffer and writes when it is full;
+    call ``flush`` before power-down. Iterating yields record tuples
+    (see ``FIELDS``) from oldest to newest, including unflushed ones.
+    """
+
+    def __init__(self, path, capacity=DEFAULT_CAPACITY, batch=DEFAULT_BATCH):
+        if not 0 < batch <= capacity:
+            raise ValueError("batch must be between 1 and capacity")
+        self.path = path
+        self.batch = batch
+        self._buf = bytearray(batch * RECORD_SIZE)
+        self._pending = 0
+        try:
+            self._file = open(path, "r+b")
+        except OSError:
+            self._create(path, capacity)
+        self._read_header()
+        self._recover()
+
+    # --- file layout ------------------------------------------------------
+    def _create(self, path, capacity):
+        with open(path, "wb") as f:
+            f.write(struct.pack(HEADER_FMT, MAGIC, VERSION, RECORD_SIZE, 0, capacity, 0))
+            zeros = bytes(RECORD_SIZE * 256)
+            left = capacity
+            while left:
+                n = min(left, 256)
+                f.write(zeros if n == 256 else bytes(RECORD_SIZE * n))
+                left -= n
+        self._file = open(path, "r+b")
+
+    def _read_header(self):
+        self._file.seek(0)
+        header = self._file.read(HEADER_SIZE)
+        magic, version, size, _, capacity, _ = struct.unpack(HEADER_FMT, header)
+        if magic != MAGIC or version != VERSION or size != RECORD_SIZE:
+            raise ValueError("not a Taupunkt ring log: %s" % self.path)
+        self.capacity = capacity
+
+    def _offset(self, slot):
+        return HEADER_SIZE + slot * RECORD_SIZE
+
+    def _valid(self, buf, offset):
+        return crc8(buf, offset, RECORD_SIZE - 1) == buf[offset + RECORD_SIZE - 1]
+
+    def _recover(self):
+        """Find the next write slot, the number of stored records and the current lap.
+
+        Only slots with a valid CRC take part: the head follows the last
+        valid slot of the first lap, so a corrupt slot in the middle of the
+        log is skipped instead of being taken for the write position.
+        """
+        head = None
+        first_lap = None
+        run_end = 0  # one past the last valid slot on first_lap
+        chunk = bytearray(READ_CHUNK * RECORD_SIZE)
+        view = memoryview(chunk)
+        self._file.seek(self._offset(0))
+        slot = 0
+        while slot < self.capacity and head is None:
+            n = min(READ_CHUNK, self.capacity - slot)
+            self._file.readinto(view[: n * RECORD_SIZE])
+            for i in range(n):
+                off = i * RECORD_SIZE
+                if not self._valid(chunk, off):
+                    continue
+                lap = chunk[off + RECORD_SIZE - 2]
+                if first_lap is None:
+                    first_lap = lap
+                if lap != first_lap:
+                    # records of the previous lap follow: the writer went round
+                    head = run_end
+                    break
+                run_end = slot + i + 1
+            slot += n
+        wrapped = head is not None or run_end == self.capacity
+        if head is None:
+            head = run_end % self.capacity
+        if first_lap is None:
+            self._lap = 0
+        elif head == 0:
+            # every valid slot on one lap up to the end: the next write wraps
+            self._lap = (first_lap + 1) & 0xFF
+        else:
+            self._lap = first_lap
+        self._head = head
+        self._count = self.capacity if wrapped else head
+
+    # --- writing ------------------------------------------------------------
+    def append(self, timestamp, sht41_temp, sht41_rh, aht20_temp, aht20_rh, pressure):
+        """Add one reading; values are ints in the units listed in the module doc."""
+        off = self._pending * RECORD_SIZE
+        buf = self._buf
+        # records that land after the wrap belong to the next lap
+        lap = self._lap if self._head + self._pending < self.capacity else (self._lap + 1) & 0xFF
+        struct.pack_into(
+            RECORD_FMT,
+            buf,
+            off,
+            timestamp,
+            sht41_temp,
+            sht41_rh,
+            aht20_temp,
+            aht20_rh,
+            pressure,
+            lap,
+            0,
+        )
+        buf[off + RECORD_SIZE - 1] = crc8(buf, off, RECORD_SIZE - 1)
+        self._pending += 1
+        if self._pending == self.batch:
+            self.flush()
+
+    def flush(self):
+        """Write the pending batch, in at most two writes when it wraps."""
+        pending = self._pending
+        if not pending:
+            return
+        view = memoryview(self._buf)
+        first = min(pending, self.capacity - self._head)
+        self._file.seek(self._offset(self._head))
+        self._file.write(view[: first * RECORD_SIZE])
+        if first < pending:
+            self._file.seek(self._offset(0))
+            self._file.write(view[first * RECORD_SIZE : pending * RECORD_SIZE])
+        self._file.flush()
+        if self._head + pending >= self.capacity:
+            self._lap = (self._lap + 1) & 0xFF
+        self._head = (self._head + pending) % self.capacity
+        self._count = min(self._count + pending, self.capacity)
+        self._pending = 0
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- reading ------------------------------------------------------------
+    def __len__(self):
+        return min(self._count + self._pending, self.capacity)
+
+    def __iter__(self):
+        """Yield records oldest first, reading the file in chunks."""
+        stored = self._count
+        skip = max(0, stored + self._pending - self.capacity)
+        start = (self._head - stored) % self.capacity
+        chunk = bytearray(READ_CHUNK * RECORD_SIZE)
+        view = memoryview(chunk)
+        done = 0
+        while done < stored:
+            slot = (start + done) % self.capacity
+            n = min(READ_CHUNK, stored - done, self.capacity - slot)
+            self._file.seek(self._offset(slot))
+            self._file.readinto(view[: n * RECORD_SIZE])
+            for i in range(n):
+                if done + i < skip:
+                    continue
+                off = i * RECORD_SIZE
+                if self._valid(chunk, off):
+                    yield struct.unpack_from(RECORD_FMT, chunk, off)[:6]
+            done += n
+        for i in range(self._pending):
+            yield struct.unpack_from(RECORD_FMT, self._buf, i * RECORD_SIZE)[:6]
+
+    def since(self, timestamp):
+        """Yield records with a timestamp at or after ``timestamp``."""
+        for record in self:
+            if record[0] >= timestamp:
+                yield record
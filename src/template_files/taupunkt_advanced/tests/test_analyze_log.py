@@ -0,0 +1,215 @@
+"""Host tests for the streaming log analysis in tools/analyze_log.py."""
+
+import json
+import struct
+import tracemalloc
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.storage.database import (  # noqa: E402
+    HEADER_FMT,
+    HEADER_SIZE,
+    MAGIC,
+    RECORD_SIZE,
+    VERSION,
+    RingLog,
+)
+from src.utils.dew_point import dew_point_array  # noqa: E402
+from tools.analyze_log import (  # noqa: E402
+    LTTB,
+    RECORD_DTYPE,
+    RollingMean,
+    analyze,
+    crc8_array,
+    iter_records,
+    main,
+    open_log,
+    scan,
+)
+
+
+def _reading(i):
+    return (1_700_000_000 + 10 * i, 1500 + i % 700, 3000 + i % 4000, 1450, 5200, 10132)
+
+
+def _write_log(path, n, capacity=None, start=1_700_000_000, step=10, seed=0):
+    """Write ``n`` records straight from NumPy (much faster than RingLog for big files)."""
+    capacity = capacity or n
+    rng = np.random.default_rng(seed)
+    records = np.zeros(capacity, dtype=RECORD_DTYPE)
+    records["timestamp"][:n] = start + step * np.arange(n)
+    records["sht41_temp"][:n] = 2000 + 500 * np.sin(np.arange(n) / 5000) + rng.integers(-20, 20, n)
+    records["sht41_rh"][:n] = rng.integers(3000, 7000, n)
+    records["aht20_temp"][:n] = 1900
+    records["aht20_rh"][:n] = 5000
+    records["pressure"][:n] = rng.integers(9900, 10300, n)
+    records["crc"][:n] = crc8_array(records[:n])
+    with open(path, "wb") as f:
+        f.write(struct.pack(HEADER_FMT, MAGIC, VERSION, RECORD_SIZE, 0, capacity, 0))
+        records.tofile(f)
+    return records[:n]
+
+
+def _lttb_reference(x, y, threshold):
+    every = (len(x) - 2) / (threshold - 2)
+    a = 0
+    out = [0]
+    for i in range(threshold - 2):
+        lo, hi = int((i + 1) * every) + 1, min(int((i + 2) * every) + 1, len(x))
+        avg_x, avg_y = x[lo:hi].mean(), y[lo:hi].mean()
+        start, stop = int(i * every) + 1, int((i + 1) * every) + 1
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:stop] - y[a]) - (x[a] - x[start:stop]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        out.append(a)
+    out.append(len(x) - 1)
+    return out
+
+
+def test_dtype_matches_ring_log_records(tmp_path):
+    path = str(tmp_path / "log.bin")
+    with RingLog(path, capacity=100, batch=8) as log:
+        for i in range(250):
+            log.append(*_reading(i))
+    info = scan(path)
+    assert (info.capacity, info.count, info.head) == (100, 100, 50)
+    decoded = np.concatenate(list(iter_records(info, chunk=32)))
+    with RingLog(path) as log:
+        expected = list(log)
+    assert [tuple(int(v) for v in r)[:6] for r in decoded] == expected
+
+
+def test_records_are_views_into_the_memory_map(tmp_path):
+    path = tmp_path / "log.bin"
+    _write_log(path, 1000)
+    assert isinstance(open_log(path), np.memmap)
+    chunks = list(iter_records(scan(path), chunk=256))
+    assert sum(len(c) for c in chunks) == 1000
+    assert all(isinstance(c, np.memmap) and not c.flags.owndata for c in chunks)
+
+
+def test_invalid_and_empty_slots_are_skipped(tmp_path):
+    path = tmp_path / "log.bin"
+    records = _write_log(path, 500, capacity=800)
+    data = bytearray(path.read_bytes())
+    data[HEADER_SIZE + 100 * RECORD_SIZE] ^= 0x01
+    path.write_bytes(bytes(data))
+    info = scan(path, chunk=64)
+    # the corrupt slot 100 is masked; the head stays after the last record
+    assert (info.head, info.count) == (500, 499)
+    timestamps = np.concatenate([c["timestamp"] for c in iter_records(info)])
+    assert timestamps.tolist() == np.delete(records["timestamp"], 100).tolist()
+
+
+@pytest.mark.parametrize("chunk", [7, 64, 1024])
+def test_corrupt_slot_mid_log_is_not_the_head(tmp_path, chunk):
+    path = tmp_path / "log.bin"
+    with RingLog(str(path), capacity=100, batch=8) as log:
+        for i in range(250):
+            log.append(*_reading(i))
+    data = bytearray(path.read_bytes())
+    for slot in (10, 48, 70):
+        data[HEADER_SIZE + slot * RECORD_SIZE + 3] ^= 0xFF
+    path.write_bytes(bytes(data))
+    info = scan(path, chunk=chunk)
+    assert (info.head, info.count) == (50, 97)
+    decoded = np.concatenate(list(iter_records(info, chunk=chunk)))
+    with RingLog(str(path)) as log:
+        assert [tuple(int(v) for v in r)[:6] for r in decoded] == list(log)
+
+
+def test_rolling_mean_across_chunks():
+    values = np.random.default_rng(1).normal(10, 3, 10_000)
+    rolling = RollingMean(50)
+    got = np.concatenate([rolling.update(values[i : i + 777]) for i in range(0, 10_000, 777)])
+    full = np.convolve(values, np.ones(50) / 50, mode="valid")
+    assert np.allclose(got[49:], full)
+    assert got[0] == values[0] and np.isclose(got[9], values[:10].mean())
+
+
+@pytest.mark.parametrize("n,threshold,chunk", [(10_000, 100, 333), (5_000, 7, 4096), (999, 50, 1)])
+def test_streaming_lttb_matches_reference(n, threshold, chunk):
+    rng = np.random.default_rng(n)
+    x = np.cumsum(rng.uniform(1, 2, n))
+    y = np.cumsum(rng.normal(0, 1, n))
+    lttb = LTTB(n, threshold)
+    for i in range(0, n, chunk):
+        lttb.update(x[i : i + chunk], y[i : i + chunk])
+    xs, ys = lttb.finish()
+    expected = _lttb_reference(x, y, threshold)
+    assert xs == x[expected].tolist() and ys == y[expected].tolist()
+
+
+def test_lttb_keeps_short_series():
+    lttb = LTTB(5, 100)
+    lttb.update(np.arange(5.0), np.ones(5))
+    assert lttb.finish() == ([0.0, 1.0, 2.0, 3.0, 4.0], [1.0] * 5)
+
+
+def test_analyze_matches_in_memory_numpy(tmp_path):
+    paths = [tmp_path / "a.bin", tmp_path / "b.bin"]
+    first = _write_log(paths[0], 30_000, seed=1)
+    second = _write_log(paths[1], 20_000, start=1_700_300_000, seed=2)
+    result = analyze(paths, period=3600, window=30, points=500, chunk=4096)
+    records = np.concatenate((first, second))
+    t = records["sht41_temp"] / 100.0
+    rh = records["sht41_rh"] / 100.0
+    dew = dew_point_array(t, rh)
+
+    assert result["records"] == 50_000
+    summary = result["summary"]["dew_point"]
+    assert summary["count"] == 50_000
+    assert np.isclose(summary["mean"], dew.mean()) and np.isclose(summary["std"], dew.std())
+    assert (summary["min"], summary["max"]) == (dew.min(), dew.max())
+    assert np.isclose(result["summary"]["pressure"]["mean"], records["pressure"].mean() / 10)
+
+    hours = records["timestamp"] // 3600
+    assert [p["start"] // 3600 for p in result["periods"]] == np.unique(hours).tolist()
+    period = result["periods"][3]
+    in_period = hours == period["start"] // 3600
+    assert period["count"] == in_period.sum()
+    assert np.isclose(period["dew_point"]["mean"], dew[in_period].mean())
+    assert period["temperature"]["max"] == t[in_period].max()
+
+    chart = result["chart"]
+    assert len(chart["timestamp"]) == 500
+    assert chart["timestamp"][0] == records["timestamp"][0]
+    assert chart["timestamp"][-1] == records["timestamp"][-1]
+    assert chart["timestamp"] == sorted(chart["timestamp"])
+
+
+def _peak_memory(path):
+    # daily aggregates keep the result itself small next to the working set
+    tracemalloc.start()
+    try:
+        result = analyze([path], period=86400, chunk=1 << 15, points=1000)
+        return result, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_memory_is_bounded_by_chunk_size(tmp_path):
+    small, big = tmp_path / "small.bin", tmp_path / "big.bin"
+    _write_log(small, 200_000)
+    _write_log(big, 2_000_000)
+    _, small_peak = _peak_memory(small)
+    result, big_peak = _peak_memory(big)
+    size = big.stat().st_size
+    print("\n%d MiB log, peak %.1f MiB traced" % (size >> 20, big_peak / 2**20))
+    assert result["records"] == 2_000_000
+    # ten times the data, about the same working set
+    assert big_peak < 1.5 * small_peak
+    assert big_peak < size / 4
+
+
+def test_cli_writes_chart_json(tmp_path, capsys):
+    path = tmp_path / "log.bin"
+    _write_log(path, 5000)
+    out = tmp_path / "web" / "static" / "history.json"
+    main([str(path), "--points", "100", "--out", str(out)])
+    history = json.loads(out.read_text())
+    assert len(history["chart"]["dew_point"]) == 100
+    assert "5000 records" in capsys.readouterr().out
@@ -0,0 +1,134 @@
+"""Host tests for the binary ring-buffer log in src/storage/database.py."""
+
+import importlib
+import struct
+import sys
+import time
+import types
+
+import pytest
+
+import src.storage.database as database
+from src.storage.database import HEADER_SIZE, RECORD_SIZE, RingLog
+
+
+def _reading(i):
+    return (1_700_000_000 + i, 2000 + i % 500, 4500 + i % 1000, 1900, 5000, 10132)
+
+
+def test_records_are_16_bytes_and_file_is_preallocated(tmp_path):
+    path = tmp_path / "log.bin"
+    with RingLog(str(path), capacity=100, batch=8) as log:
+        for i in range(10):
+            log.append(*_reading(i))
+    assert RECORD_SIZE == 16
+    assert path.stat().st_size == HEADER_SIZE + 100 * RECORD_SIZE
+
+
+def test_wraparound_keeps_newest_records_in_order(tmp_path):
+    path = str(tmp_path / "log.bin")
+    with RingLog(path, capacity=100, batch=7) as log:
+        for i in range(250):
+            log.append(*_reading(i))
+        # unflushed records are visible too
+        assert [r[0] for r in log] == [_reading(i)[0] for i in range(150, 250)]
+    with RingLog(path) as log:
+        assert len(log) == 100
+        assert list(log) == [_reading(i) for i in range(150, 250)]
+        log.append(*_reading(250))
+        log.flush()
+    with RingLog(path) as log:
+        assert [r[0] for r in log][-2:] == [_reading(249)[0], _reading(250)[0]]
+        assert len(list(log)) == 100
+
+
+@pytest.mark.parametrize("written", [0, 1, 99, 100, 256, 512, 513])
+def test_reopen_finds_write_position(tmp_path, written):
+    # capacity 256: the lap byte, not a sequence number, must locate the head
+    path = str(tmp_path / "log.bin")
+    with RingLog(path, capacity=256, batch=16) as log:
+        for i in range(written):
+            log.append(*_reading(i))
+    with RingLog(path, capacity=256) as log:
+        expected = [_reading(i)[0] for i in range(max(0, written - 256), written)]
+        assert [r[0] for r in log] == expected
+        log.append(*_reading(written))
+    with RingLog(path) as log:
+        assert [r[0] for r in log][-1] == _reading(written)[0]
+
+
+def test_torn_record_is_skipped(tmp_path):
+    path = tmp_path / "log.bin"
+    with RingLog(str(path), capacity=50, batch=10) as log:
+        for i in range(20):
+            log.append(*_reading(i))
+    data = bytearray(path.read_bytes())
+    data[HEADER_SIZE + 19 * RECORD_SIZE + 3] ^= 0xFF  # corrupt the newest record
+    path.write_bytes(bytes(data))
+    with RingLog(str(path)) as log:
+        assert [r[0] for r in log] == [_reading(i)[0] for i in range(19)]
+        log.append(*_reading(99))
+    with RingLog(str(path)) as log:
+        assert [r[0] for r in log][-1] == _reading(99)[0]
+
+
+@pytest.mark.parametrize("written", [20, 70])
+def test_corrupt_record_mid_log_is_not_the_write_position(tmp_path, written):
+    path = tmp_path / "log.bin"
+    with RingLog(str(path), capacity=50, batch=10) as log:
+        for i in range(written):
+            log.append(*_reading(i))
+    data = bytearray(path.read_bytes())
+    data[HEADER_SIZE + 5 * RECORD_SIZE + 3] ^= 0xFF
+    path.write_bytes(bytes(data))
+    kept = [_reading(i)[0] for i in range(max(0, written - 50), written)]
+    lost = _reading(50 * (written // 50) + 5)[0]  # the record in slot 5
+    kept.remove(lost)
+    with RingLog(str(path)) as log:
+        assert [r[0] for r in log] == kept
+        log.append(*_reading(99))
+    with RingLog(str(path)) as log:
+        assert [r[0] for r in log][-2:] == [kept[-1], _reading(99)[0]]
+
+
+def test_since_and_empty_log(tmp_path):
+    path = str(tmp_path / "log.bin")
+    with RingLog(path, capacity=64, batch=4) as log:
+        assert list(log) == [] and len(log) == 0
+        for i in range(10):
+            log.append(*_reading(i))
+        assert [r[0] for r in log.since(_reading(7)[0])] == [_reading(i)[0] for i in (7, 8, 9)]
+
+
+def test_throughput(tmp_path):
+    n = 100_000
+    path = str(tmp_path / "log.bin")
+    start = time.perf_counter()
+    with RingLog(path, capacity=65536, batch=64) as log:
+        for i in range(n):
+            log.append(*_reading(i))
+    write = time.perf_counter() - start
+    start = time.perf_counter()
+    with RingLog(path) as log:
+        count = sum(1 for _ in log)
+    read = time.perf_counter() - start
+    print(f"\nwrite {n / write:,.0f} rec/s, read {count / read:,.0f} rec/s")
+    assert count == 65536
+    assert write < 10 and read < 10
+
+
+def test_uses_only_the_micropython_struct_functions(tmp_path, monkeypatch):
+    # MicroPython's struct module has no Struct class
+    micro = types.ModuleType("struct")
+    for name in ("calcsize", "pack", "pack_into", "unpack", "unpack_from"):
+        setattr(micro, name, getattr(struct, name))
+    monkeypatch.setitem(sys.modules, "struct", micro)
+    try:
+        module = importlib.reload(database)
+        with module.RingLog(str(tmp_path / "log.bin"), capacity=10, batch=4) as log:
+            for i in range(12):
+                log.append(*_reading(i))
+            assert [r[0] for r in log] == [_reading(i)[0] for i in range(2, 12)]
+    finally:
+        monkeypatch.undo()
+        importlib.reload(database)
@@ -0,0 +1,402 @@
+"""Streaming analysis of Taupunkt ring logs on the host.
+
+Log files written by ``src/storage/database.py`` are memory-mapped and read
+as a NumPy structured array whose dtype mirrors the 16-byte record, so
+decoding copies nothing. Everything after that works chunk by chunk:
+
+1. ``scan`` finds the oldest slot of a file and counts its valid records
+   (vectorized CRC-8 check).
+2. ``analyze`` streams the records oldest first and computes the dew point,
+   a rolling mean of it, overall statistics and per-period aggregates, and
+   downsamples the rolling series with LTTB (largest triangle three
+   buckets) for the ``web/static/chart.js`` dashboard.
+
+Memory use depends on ``chunk`` and ``points``, not on the size of the logs,
+so multi-GB files can be processed on a workstation::
+
+    python -m tools.analyze_log logs/*.bin --out web/static/history.json
+"""
+
+import argparse
+import json
+import math
+import struct
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from src.storage.database import (
+    CRC8_TABLE,
+    HEADER_FMT,
+    HEADER_SIZE,
+    MAGIC,
+    RECORD_SIZE,
+    VERSION,
+)
+from src.utils.dew_point import dew_point_array
+
+RECORD_DTYPE = np.dtype(
+    [
+        ("timestamp", "<u4"),
+        ("sht41_temp", "<i2"),
+        ("sht41_rh", "<u2"),
+        ("aht20_temp", "<i2"),
+        ("aht20_rh", "<u2"),
+        ("pressure", "<u2"),
+        ("lap", "u1"),
+        ("crc", "u1"),
+    ]
+)
+assert RECORD_DTYPE.itemsize == RECORD_SIZE
+
+SENSORS = ("sht41", "aht20")
+SERIES = ("temperature", "humidity", "pressure", "dew_point")
+DEFAULT_CHUNK = 1 << 20  # records (16 MiB of log) per step
+DEFAULT_PERIOD = 3600  # s per aggregate
+DEFAULT_WINDOW = 60  # samples in the rolling dew point mean
+DEFAULT_POINTS = 2000  # chart points after downsampling
+
+_CRC_TABLE = np.frombuffer(CRC8_TABLE, dtype=np.uint8)
+
+
+class LogInfo(NamedTuple):
+    path: str
+    capacity: int
+    head: int  # oldest slot, i.e. the next one the device would write
+    count: int  # usable records
+
+
+def open_log(path):
+    """Memory-map a ring log read-only as an array of ``RECORD_DTYPE``."""
+    with open(path, "rb") as f:
+        header = f.read(HEADER_SIZE)
+    if len(header) != HEADER_SIZE:
+        raise ValueError("not a Taupunkt ring log: %s" % path)
+    magic, version, size, _, capacity, _ = struct.unpack(HEADER_FMT, header)
+    if magic != MAGIC or version != VERSION or size != RECORD_SIZE:
+        raise ValueError("not a Taupunkt ring log: %s" % path)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE, shape=(capacity,))
+
+
+def crc8_array(records):
+    """Return the CRC-8 of the first 15 bytes of every record, as ``uint8``."""
+    raw = records.view(np.uint8).reshape(-1, RECORD_SIZE)
+    crc = np.full(raw.shape[0], 0xFF, dtype=np.uint8)
+    for column in range(RECORD_SIZE - 1):
+        np.bitwise_xor(crc, raw[:, column], out=crc)
+        np.take(_CRC_TABLE, crc, out=crc)
+    return crc
+
+
+def usable_mask(records, sensor="sht41"):
+    """Records with a valid CRC and a humidity reading (``rh == 0`` has no dew point)."""
+    return (crc8_array(records) == records["crc"]) & (records[sensor + "_rh"] > 0)
+
+
+def scan(path, sensor="sht41", chunk=DEFAULT_CHUNK):
+    """Locate the oldest record of a ring log and count the usable ones.
+
+    Mirrors ``RingLog._recover``: slots with a bad CRC are masked out, and
+    the head follows the last valid slot before the lap byte changes.
+    """
+    records = open_log(path)
+    head = None
+    first_lap = None
+    run_end = 0  # one past the last valid slot on first_lap
+    count = 0
+    for start in range(0, len(records), chunk):
+        part = records[start : start + chunk]
+        valid = crc8_array(part) == part["crc"]
+        count += int(np.count_nonzero(valid & (part[sensor + "_rh"] > 0)))
+        slots = np.flatnonzero(valid)
+        if head is not None or not slots.size:
+            continue
+        laps = part["lap"][slots]
+        if first_lap is None:
+            first_lap = laps[0]
+        breaks = np.flatnonzero(laps != first_lap)
+        if breaks.size:
+            if breaks[0]:
+                run_end = start + int(slots[breaks[0] - 1]) + 1
+            head = run_end
+        else:
+            run_end = start + int(slots[-1]) + 1
+    if head is None:
+        head = run_end % len(records) if len(records) else 0
+    return LogInfo(str(path), len(records), head, count)
+
+
+def iter_records(info, sensor="sht41", chunk=DEFAULT_CHUNK):
+    """Yield usable records of a scanned log oldest first, ``chunk`` slots at a time.
+
+    Chunks without invalid slots are views into the memory map; only the
+    others are compacted into a copy.
+    """
+    records = open_log(info.path)
+    for lo, hi in ((info.head, info.capacity), (0, info.head)):
+        for start in range(lo, hi, chunk):
+            part = records[start : min(start + chunk, hi)]
+            keep = usable_mask(part, sensor)
+            yield part if keep.all() else part[keep]
+
+
+class Summary:
+    """Count, mean, standard deviation, min and max, merged chunk by chunk."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values):
+        n = values.size
+        if not n:
+            return
+        mean = float(values.mean())
+        total = self.count + n
+        delta = mean - self.mean
+        # pairwise merge of the squared deviations (Chan et al.)
+        self.m2 += float(values.var()) * n + delta * delta * self.count * n / total
+        self.mean += delta * n / total
+        self.count = total
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def as_dict(self):
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "std": math.sqrt(self.m2 / self.count),
+            "min": self.min,
+            "max": self.max,
+        }
+
+
+class PeriodStats:
+    """Count and per-series mean/min/max for each ``timestamp // period`` bucket."""
+
+    def __init__(self, period, names=SERIES):
+        self.period = period
+        self.names = tuple(names)
+        self._rows = {}  # bucket -> [count, sum, min, max, sum, min, max, ...]
+
+    def update(self, timestamps, series):
+        if not timestamps.size:
+            return
+        buckets, inverse, counts = np.unique(
+            timestamps // self.period, return_inverse=True, return_counts=True
+        )
+        # group each series by bucket: one stable sort, then reduceat per group
+        order = np.argsort(inverse, kind="stable")
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        columns = [counts.astype(np.float64)]
+        for name in self.names:
+            grouped = series[name][order]
+            columns += [
+                np.add.reduceat(grouped, starts),
+                np.minimum.reduceat(grouped, starts),
+                np.maximum.reduceat(grouped, starts),
+            ]
+        table = np.column_stack(columns)
+        for bucket, row in zip(buckets.tolist(), table):
+            known = self._rows.get(bucket)
+            if known is None:
+                self._rows[bucket] = row.copy()
+                continue
+            known[0] += row[0]
+            known[1::3] += row[1::3]
+            np.minimum(known[2::3], row[2::3], out=known[2::3])
+            np.maximum(known[3::3], row[3::3], out=known[3::3])
+
+    def as_list(self):
+        result = []
+        for bucket in sorted(self._rows):
+            row = self._rows[bucket]
+            entry = {"start": bucket * self.period, "count": int(row[0])}
+            for i, name in enumerate(self.names):
+                total, low, high = row[1 + 3 * i : 4 + 3 * i].tolist()
+                entry[name] = {"mean": total / row[0], "min": low, "max": high}
+            result.append(entry)
+        return result
+
+
+class RollingMean:
+    """Mean over the last ``window`` samples, carried across chunk boundaries.
+
+    The first ``window - 1`` samples of the stream get the mean of what is
+    available so far.
+    """
+
+    def __init__(self, window):
+        if window < 1:
+            raise ValueError("window must be >= 1")
+        self.window = window
+        self._tail = np.empty(0)
+
+    def update(self, values):
+        ext = np.concatenate((self._tail, values))
+        csum = np.empty(ext.size + 1)
+        csum[0] = 0.0
+        np.cumsum(ext, out=csum[1:])
+        k = np.arange(self._tail.size, ext.size)
+        lo = np.maximum(k - (self.window - 1), 0)
+        out = (csum[k + 1] - csum[lo]) / (k + 1 - lo)
+        keep = min(self.window - 1, ext.size)
+        self._tail = ext[ext.size - keep :].copy()
+        return out
+
+
+class LTTB:
+    """Largest-Triangle-Three-Buckets downsampling of a stream of ``n`` points.
+
+    Points arrive in chunks via ``update``; only the current and the next
+    bucket are held, so memory is bounded by ``2 * n / threshold + chunk``.
+    ``finish`` returns the ``threshold`` selected points as two lists.
+    """
+
+    def __init__(self, n, threshold):
+        self.n = n
+        self.threshold = threshold
+        self._passthrough = threshold < 3 or n <= threshold
+        self._every = 0.0 if self._passthrough else (n - 2) / (threshold - 2)
+        self._x = np.empty(0)
+        self._y = np.empty(0)
+        self._offset = 0  # stream index of self._x[0]
+        self._bucket = 0
+        self._a = None
+        self.x = []
+        self.y = []
+
+    def _range(self, bucket):
+        return int(bucket * self._every) + 1, min(int((bucket + 1) * self._every) + 1, self.n)
+
+    def update(self, x, y):
+        if self._passthrough:
+            self.x.extend(x.tolist())
+            self.y.extend(y.tolist())
+            return
+        if not x.size:
+            return
+        self._x = np.concatenate((self._x, x))
+        self._y = np.concatenate((self._y, y))
+        if self._a is None:
+            self._select(0)
+        end = self._offset + self._x.size
+        while self._bucket < self.threshold - 2:
+            lo, hi = self._range(self._bucket)
+            next_lo, next_hi = self._range(self._bucket + 1)
+            if next_hi > end:
+                break
+            off = self._offset
+            avg_x = self._x[next_lo - off : next_hi - off].mean()
+            avg_y = self._y[next_lo - off : next_hi - off].mean()
+            ax, ay = self._a
+            xs = self._x[lo - off : hi - off]
+            ys = self._y[lo - off : hi - off]
+            # twice the triangle area; the factor does not change the argmax
+            area = np.abs((ax - avg_x) * (ys - ay) - (ax - xs) * (avg_y - ay))
+            self._select(lo - off + int(np.argmax(area)))
+            self._bucket += 1
+            self._x = self._x[next_lo - off :]
+            self._y = self._y[next_lo - off :]
+            self._offset = next_lo
+
+    def _select(self, i):
+        self._a = (self._x[i], self._y[i])
+        self.x.append(float(self._x[i]))
+        self.y.append(float(self._y[i]))
+
+    def finish(self):
+        if not self._passthrough:
+            if self._offset + self._x.size != self.n:
+                raise ValueError(
+                    "expected %d points, got %d" % (self.n, self._offset + self._x.size)
+                )
+            self._select(self._x.size - 1)
+        return self.x, self.y
+
+
+def analyze(
+    paths,
+    sensor="sht41",
+    period=DEFAULT_PERIOD,
+    window=DEFAULT_WINDOW,
+    points=DEFAULT_POINTS,
+    chunk=DEFAULT_CHUNK,
+):
+    """Return statistics, per-period aggregates and a downsampled chart series.
+
+    ``paths`` are read in the given order, each log oldest record first.
+    Temperature and humidity come from ``sensor`` ("sht41" or "aht20").
+    """
+    if sensor not in SENSORS:
+        raise ValueError("unknown sensor: %s" % sensor)
+    infos = [scan(path, sensor, chunk) for path in paths]
+    total = sum(info.count for info in infos)
+    summaries = {name: Summary() for name in SERIES}
+    periods = PeriodStats(period)
+    rolling = RollingMean(window)
+    chart = LTTB(total, points)
+    dew = np.empty(chunk)
+    for info in infos:
+        for records in iter_records(info, sensor, chunk):
+            n = len(records)
+            t = records[sensor + "_temp"] / 100.0
+            rh = records[sensor + "_rh"] / 100.0
+            series = {
+                "temperature": t,
+                "humidity": rh,
+                "pressure": records["pressure"] / 10.0,
+                "dew_point": dew_point_array(t, rh, out=dew[:n]),
+            }
+            for name in SERIES:
+                summaries[name].update(series[name])
+            timestamps = records["timestamp"]
+            periods.update(timestamps, series)
+            chart.update(timestamps.astype(np.float64), rolling.update(series["dew_point"]))
+    xs, ys = chart.finish()
+    return {
+        "records": total,
+        "sensor": sensor,
+        "period": period,
+        "window": window,
+        "summary": {name: summaries[name].as_dict() for name in SERIES},
+        "periods": periods.as_list(),
+        "chart": {"timestamp": [int(x) for x in xs], "dew_point": ys},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze Taupunkt ring logs.")
+    parser.add_argument("logs", nargs="+", help="log files in chronological order")
+    parser.add_argument("--sensor", choices=SENSORS, default="sht41")
+    parser.add_argument("--period", type=int, default=DEFAULT_PERIOD, help="aggregate seconds")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="rolling samples")
+    parser.add_argument("--points", type=int, default=DEFAULT_POINTS, help="chart points")
+    parser.add_argument("--chunk", type=int, default=DEFAULT_CHUNK, help="records per step")
+    parser.add_argument("--out", default="web/static/history.json")
+    args = parser.parse_args(argv)
+    result = analyze(args.logs, args.sensor, args.period, args.window, args.points, args.chunk)
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result), encoding="utf-8")
+    dew = result["summary"]["dew_point"]
+    print(
+        "%d records, dew point %.2f .. %.2f C, %d chart points -> %s"
+        % (
+            result["records"],
+            dew.get("min", math.nan),
+            dew.get("max", math.nan),
+            len(result["chart"]["timestamp"]),
+            out,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+// Dew point history chart for the dashboard.
+//
+// Draws the downsampled series written by `python -m tools.analyze_log`
+// (web/static/history.json) into <canvas id="history-chart">. The tool
+// already reduced the data to a few thousand LTTB points, so the chart is
+// a plain canvas polyline without any charting library.
+
+(function () {
+  "use strict";
+
+  const SOURCE = "static/history.json";
+  const PAD = 40;
+
+  function draw(canvas, chart) {
+    const ctx = canvas.getContext("2d");
+    const xs = chart.timestamp;
+    const ys = chart.dew_point;
+    const w = canvas.width;
+    const h = canvas.height;
+    ctx.clearRect(0, 0, w, h);
+    if (xs.length < 2) {
+      return;
+    }
+    const x0 = xs[0];
+    const x1 = xs[xs.length - 1];
+    const y0 = Math.floor(Math.min.apply(null, ys));
+    const y1 = Math.ceil(Math.max.apply(null, ys)) || y0 + 1;
+    const sx = (w - 2 * PAD) / (x1 - x0 || 1);
+    const sy = (h - 2 * PAD) / (y1 - y0 || 1);
+
+    ctx.strokeStyle = "#999";
+    ctx.fillStyle = "#333";
+    ctx.font = "12px sans-serif";
+    ctx.strokeRect(PAD, PAD, w - 2 * PAD, h - 2 * PAD);
+    ctx.fillText(y1 + " °C", 2, PAD + 4);
+    ctx.fillText(y0 + " °C", 2, h - PAD);
+    ctx.fillText(new Date(x0 * 1000).toLocaleDateString(), PAD, h - PAD / 3);
+    const last = new Date(x1 * 1000).toLocaleDateString();
+    ctx.fillText(last, w - PAD - ctx.measureText(last).width, h - PAD / 3);
+
+    ctx.strokeStyle = "#1f77b4";
+    ctx.beginPath();
+    for (let i = 0; i < xs.length; i++) {
+      const px = PAD + (xs[i] - x0) * sx;
+      const py = h - PAD - (ys[i] - y0) * sy;
+      if (i === 0) {
+        ctx.moveTo(px, py);
+      } else {
+        ctx.lineTo(px, py);
+      }
+    }
+    ctx.stroke();
+  }
+
+  function load() {
+    const canvas = document.getElementById("history-chart");
+    if (!canvas) {
+      return;
+    }
+    fetch(SOURCE)
+      .then((response) => response.json())
+      .then((history) => draw(canvas, history.chart))
+      .catch((error) => console.error("history chart:", error));
+  }
+
+  document.addEventListener("DOMContentLoaded", load);
+})();
@@ -0,0 +1,138 @@
+"""Persistent name index of directory and registry templates.
+
+Shell completion runs on every keypress, so it must not list the templates
+directory or import the registry modules each time. The index is stored in
+``<templates_dir>/.lokal/index.json`` and refreshed only when the mtime of
+the templates directory (or of the registry module) changes.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+CACHE_DIR = ".lokal"
+INDEX_FILE = "index.json"
+INDEX_VERSION = 2
+
+_REGISTRY_MODULE = Path(__file__).with_name("template_registry.py")
+
+
+def _load_registry_names() -> List[str]:
+    from src.template_registry import get_default_registry
+
+    return get_default_registry().list_available()
+
+
+def _mtime_ns(path: Path) -> int:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return -1
+
+
+class TemplateIndex:
+    """Sorted, mtime-validated index of all known template names."""
+
+    def __init__(
+        self,
+        templates_dir: Path,
+        registry_loader: Optional[Callable[[], List[str]]] = None,
+    ):
+        self.templates_dir = Path(templates_dir)
+        self.index_path = self.templates_dir / CACHE_DIR / INDEX_FILE
+        self._registry_loader = registry_loader or _load_registry_names
+        self._data: Optional[Dict] = None
+
+    def names(self) -> List[str]:
+        """Return the sorted names of directory and registry templates."""
+        if self._data is None:
+            self._data = self._load()
+        return self._data["names"]
+
+    def directories(self) -> List[str]:
+        """Return the sorted names of the template folders only."""
+        if self._data is None:
+            self._data = self._load()
+        return self._data["directories"]
+
+    def cached_directories(self) -> Optional[List[str]]:
+        """Return the folder names stored by the last run without revalidating.
+
+        This is a single file read, meant to show something immediately
+        while ``directories()`` rescans a slow templates directory.
+        """
+        cached = self._read()
+        return cached["directories"] if cached is not None else None
+
+    def complete(self, prefix: str) -> List[str]:
+        """Return the names starting with ``prefix`` using a binary search."""
+        names = self.names()
+        start = bisect.bisect_left(names, prefix)
+        end = start
+        while end < len(names) and names[end].startswith(prefix):
+            end += 1
+        return names[start:end]
+
+    def invalidate(self) -> None:
+        """Forget the in-memory copy so the next lookup revalidates."""
+        self._data = None
+
+    def _load(self) -> Dict:
+        dir_mtime = _mtime_ns(self.templates_dir)
+        registry_mtime = _mtime_ns(_REGISTRY_MODULE)
+        cached = self._read()
+        if (
+            cached is not None
+            and cached.get("templates_mtime_ns") == dir_mtime
+            and cached.get("registry_mtime_ns") == registry_mtime
+        ):
+            return cached
+
+        registry = (
+            cached["registry"]
+            if cached is not None and cached.get("registry_mtime_ns") == registry_mtime
+            else sorted(self._registry_loader())
+        )
+        directories = sorted(self._scan_directories())
+        data = {
+            "version": INDEX_VERSION,
+            "registry_mtime_ns": registry_mtime,
+            "registry": registry,
+            "directories": directories,
+            "names": sorted(set(directories) | set(registry)),
+        }
+        self._write(data)
+        return data
+
+    def _scan_directories(self) -> List[str]:
+        try:
+            with os.scandir(self.templates_dir) as it:
+                return [e.name for e in it if e.is_dir() and not e.name.startswith(".")]
+        except OSError:
+            return []
+
+    def _read(self) -> Optional[Dict]:
+        try:
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+            return None
+        return data
+
+    def _write(self, data: Dict) -> None:
+        """Store the index; stamp it with the directory mtime after mkdir."""
+        if not self.templates_dir.is_dir():
+            return
+        try:
+            self.index_path.parent.mkdir(exist_ok=True)
+            data["templates_mtime_ns"] = _mtime_ns(self.templates_dir)
+            tmp = self.index_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data), encoding="utf-8")
+            os.replace(tmp, self.index_path)
+        except OSError:
+            pass
@@ -0,0 +1,123 @@
+"""Per-template manifests used by incremental re-import.
+
+A manifest records, for every file of an imported template, the size,
+mtime and (once computed) SHA-256 digest it had when it was last synced.
+It lives in ``<templates_dir>/.lokal/manifests/<name>.json`` so an update
+only has to stat the source tree; unchanged destination files are never
+opened or rewritten.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from src.template_index import CACHE_DIR
+
+MANIFEST_DIR = "manifests"
+MANIFEST_VERSION = 1
+
+# rel path -> [size, mtime_ns, sha256 or None]
+FileTable = Dict[str, List[Any]]
+
+
+class TreeScan(NamedTuple):
+    """Result of ``scan_tree``."""
+
+    files: FileTable
+    dirs: List[str]
+    # rel path -> link target, for every symlink met on the way
+    symlinks: Dict[str, str]
+    # symlinked folders pointing back at one of their own ancestors
+    loops: List[str]
+
+
+def manifest_path(templates_dir: Path, template_name: str) -> Path:
+    return Path(templates_dir) / CACHE_DIR / MANIFEST_DIR / f"{template_name}.json"
+
+
+def load_manifest(path: Path) -> Optional[Tuple[FileTable, List[str]]]:
+    """Return ``(files, dirs)`` from a manifest, or None if missing or stale."""
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return None
+    return data["files"], data["dirs"]
+
+
+def save_manifest(path: Path, files: FileTable, dirs: List[str]) -> None:
+    """Atomically write a manifest."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    payload = {"version": MANIFEST_VERSION, "files": files, "dirs": sorted(dirs)}
+    tmp.write_text(json.dumps(payload), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def scan_tree(root: Path) -> TreeScan:
+    """Stat every file below ``root``.
+
+    Symlinks are followed like ``shutil.copytree`` does by default, except
+    for links back to an ancestor folder, which are reported as loops
+    instead of being descended into. Dangling links are only recorded in
+    ``symlinks``.
+    """
+    files: FileTable = {}
+    dirs: List[str] = []
+    symlinks: Dict[str, str] = {}
+    loops: List[str] = []
+    root_stat = Path(root).stat()
+    stack = [(Path(root), "", frozenset({(root_stat.st_dev, root_stat.st_ino)}))]
+    while stack:
+        folder, prefix, ancestors = stack.pop()
+        with os.scandir(folder) as it:
+            for entry in it:
+                rel = prefix + entry.name
+                if entry.is_symlink():
+                    symlinks[rel] = os.readlink(entry.path)
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                if entry.is_dir():
+                    key = (stat.st_dev, stat.st_ino)
+                    if key in ancestors:
+                        loops.append(rel)
+                        continue
+                    dirs.append(rel)
+                    stack.append((Path(entry.path), rel + "/", ancestors | {key}))
+                else:
+                    files[rel] = [stat.st_size, stat.st_mtime_ns, None]
+    return TreeScan(files, dirs, symlinks, loops)
+
+
+def tree_unchanged(root: Path, mtimes: Dict[str, int]) -> bool:
+    """Return True if no folder recorded by ``TemplateWalk(mtimes=...)`` changed.
+
+    Adding, removing or renaming an entry updates the mtime of its parent
+    folder, so comparing the folder mtimes catches every change to the
+    tree's shape without listing a single folder.
+    """
+    root = Path(root)
+    for rel, mtime in mtimes.items():
+        try:
+            if os.stat(root / rel).st_mtime_ns != mtime:
+                return False
+        except OSError:
+            return False
+    return True
+
+
+def file_digest(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """Return the SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,245 @@
+"""Import-time analysis of template files.
+
+``import_template`` classifies every file once, in parallel and reading
+only the first few KB of each: text or binary, the text encoding and the
+size. Together with the symlinks, symlink loops and oversized files found
+while scanning, the result is stored in a per-template sidecar,
+``<templates_dir>/.lokal/metadata/<name>.json``. Generation, listing and
+preview read these decisions instead of inspecting the files again.
+
+The sidecar is JSON lines: a header object with the totals and the mtime
+of every folder of the imported copy, then one ``[path, info]`` line per
+file in ``walk_template`` order. Listing reads only the header; preview
+and generation stream the file lines alongside their walk with a
+``FileInfoCursor``, so memory does not grow with the template. Each file
+record keeps the size and mtime of the copy, and the cursor drops records
+of files that were edited in place since.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+import os
+import stat
+from concurrent.futures import Executor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.template_index import CACHE_DIR
+from src.template_manifest import TreeScan
+
+METADATA_DIR = "metadata"
+METADATA_VERSION = 3
+SAMPLE_SIZE = 8192
+LARGE_FILE_SIZE = 50 * 1024 * 1024
+ANALYZE_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+# bytes that plain 8-bit text may contain: printable range plus common controls
+_TEXT_BYTES = bytes({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x100)) - {0x7F})
+
+
+def metadata_path(templates_dir: Path, template_name: str) -> Path:
+    return Path(templates_dir) / CACHE_DIR / METADATA_DIR / f"{template_name}.json"
+
+
+def sniff(path: Path, sample_size: int = SAMPLE_SIZE) -> Tuple[str, Optional[str]]:
+    """Return ``(kind, encoding)`` of a file from its first ``sample_size`` bytes.
+
+    ``kind`` is ``"text"`` or ``"binary"``; ``encoding`` is None for binary
+    files. Undecodable 8-bit text without control bytes is reported as
+    ``latin-1``.
+    """
+    with open(path, "rb") as fh:
+        sample = fh.read(sample_size)
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return "text", encoding
+    if b"\0" in sample:
+        return "binary", None
+    try:
+        # incremental so a multi-byte character cut at the sample end is fine
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+    except UnicodeDecodeError:
+        if not sample.translate(None, _TEXT_BYTES):
+            return "text", "latin-1"
+        return "binary", None
+    return "text", "ascii" if sample.isascii() else "utf-8"
+
+
+def classify_files(
+    root: Path, rels: Iterable[str], executor: Optional[Executor] = None
+) -> Dict[str, Tuple[str, Optional[str]]]:
+    """Sniff the files ``rels`` below ``root`` on a worker pool."""
+    rels = list(rels)
+    if not rels:
+        return {}
+    if executor is None:
+        with ThreadPoolExecutor(max_workers=min(ANALYZE_WORKERS, len(rels))) as pool:
+            return classify_files(root, rels, pool)
+    kinds = executor.map(sniff, [root / rel for rel in rels], chunksize=64)
+    return dict(zip(rels, kinds))
+
+
+def build_metadata(
+    scan: TreeScan,
+    kinds: Dict[str, Tuple[str, Optional[str]]],
+    template_root: Path,
+    large_file_size: int = LARGE_FILE_SIZE,
+    tree: Optional[Dict[str, int]] = None,
+    stats: Optional[Dict[str, Tuple[int, int]]] = None,
+) -> Dict[str, Any]:
+    """Combine a tree scan and file classifications into a sidecar payload.
+
+    The identity of ``template_root`` and the folder mtimes ``tree`` of the
+    imported copy are stored, so a sidecar is not trusted once the folder
+    was replaced or entries were added, removed or renamed by hand.
+    ``stats`` holds ``(size, mtime_ns)`` of the regular files of the copy;
+    only records with an ``mtime`` are handed out by ``FileInfoCursor``.
+    """
+    stats = stats or {}
+    files = {}
+    for rel, (size, _, _) in sorted(scan.files.items(), key=lambda item: walk_key(item[0])):
+        files[rel] = {"size": size, "kind": kinds[rel][0], "encoding": kinds[rel][1]}
+        if rel in stats:
+            files[rel]["size"], files[rel]["mtime"] = stats[rel]
+    return {
+        "version": METADATA_VERSION,
+        "root": root_id(template_root),
+        "tree": dict(tree or {}),
+        "files": files,
+        "file_count": len(files),
+        "dirs": len(scan.dirs),
+        "bytes": sum(info["size"] for info in files.values()),
+        "large_files": [rel for rel, info in files.items() if info["size"] > large_file_size],
+        "symlinks": dict(sorted(scan.symlinks.items())),
+        "loops": sorted(scan.loops),
+    }
+
+
+def root_id(template_root: Path) -> List[int]:
+    stat = Path(template_root).stat()
+    return [stat.st_dev, stat.st_ino]
+
+
+def walk_key(rel: str) -> List[str]:
+    """Sort key that orders relative paths like ``walk_template`` yields them."""
+    return rel.split("/")
+
+
+def load_metadata(
+    path: Path, template_root: Optional[Path] = None, files: bool = True
+) -> Optional[Dict[str, Any]]:
+    """Return a stored sidecar, or None if missing, stale or from another version.
+
+    With ``template_root`` the sidecar must also belong to that folder.
+    With ``files=False`` only the header is read and ``"files"`` is absent.
+    """
+    try:
+        with open(path, encoding="utf-8") as fh:
+            data = json.loads(fh.readline())
+            if not isinstance(data, dict) or data.get("version") != METADATA_VERSION:
+                return None
+            if template_root is not None and data.get("root") != root_id(template_root):
+                return None
+            if files:
+                data["files"] = dict(_file_lines(fh))
+    except (OSError, ValueError):
+        return None
+    return data
+
+
+def save_metadata(path: Path, metadata: Dict[str, Any]) -> None:
+    """Atomically write a sidecar: the header line, then one line per file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    header = {key: value for key, value in metadata.items() if key != "files"}
+    with open(tmp, "w", encoding="utf-8") as fh:
+        fh.write(json.dumps(header) + "\n")
+        for item in metadata["files"].items():
+            fh.write(json.dumps(item) + "\n")
+    os.replace(tmp, path)
+
+
+def _file_lines(fh) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    for line in fh:
+        rel, info = json.loads(line)
+        yield rel, info
+
+
+def _unchanged(path: Path, info: Dict[str, Any]) -> bool:
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return (
+        stat.S_ISREG(st.st_mode)
+        and st.st_size == info["size"]
+        and st.st_mtime_ns == info.get("mtime")
+    )
+
+
+class FileInfoCursor:
+    """Look up sidecar file records while reading the sidecar lazily.
+
+    Lookups must come in ``walk_template`` order; the cursor then reads
+    each line once and holds a single record in memory. Paths the sidecar
+    does not know (or asked for out of order) give None, which callers
+    treat like a template without sidecar. With ``root`` a record is only
+    returned while ``root / path`` is a regular file of the recorded size
+    and mtime.
+    """
+
+    def __init__(self, path: Optional[Path] = None, root: Optional[Path] = None):
+        self._root = Path(root) if root is not None else None
+        self._fh = None
+        self._lines: Iterator[Tuple[str, Dict[str, Any]]] = iter(())
+        self._current: Optional[Tuple[List[str], Dict[str, Any]]] = None
+        if path is not None:
+            try:
+                self._fh = open(path, encoding="utf-8")
+                self._fh.readline()
+            except OSError:
+                self.close()
+            else:
+                self._lines = _file_lines(self._fh)
+
+    def get(self, rel: str) -> Optional[Dict[str, Any]]:
+        key = walk_key(rel)
+        while True:
+            if self._current is None:
+                try:
+                    line_rel, info = next(self._lines)
+                except (StopIteration, ValueError):
+                    self.close()
+                    return None
+                self._current = (walk_key(line_rel), info)
+            current_key, info = self._current
+            if current_key < key:
+                self._current = None
+                continue
+            if current_key != key:
+                return None
+            if self._root is not None and not _unchanged(self._root / rel, info):
+                return None
+            return info
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        self._lines = iter(())
+
+    def __enter__(self) -> "FileInfoCursor":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -1,34 +1,198 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice, takewhile
 from tkinter import ttk
+from typing import Any, Callable, List, Optional, Tuple
+
+from .jobs import POLL_INTERVAL_MS
+
+INSERT_BATCH = 500
+SEARCH_LIMIT = 1000
+FILTER_DELAY_MS = 250
+_ROOT = "/"
+
+
+def list_folder(template_service, template_name: str, rel: str = "") -> List[Tuple[str, bool]]:
+    """Return the ``(relative_path, is_dir)`` children of one template folder."""
+    return list(template_service.walk_template(template_name, max_depth=1, subpath=rel or None))
+
+
+def search_template(
+    template_service,
+    template_name: str,
+    text: str,
+    limit: int = SEARCH_LIMIT,
+    cancelled: Optional[Callable[[], bool]] = None,
+) -> Tuple[List[Tuple[str, bool]], bool]:
+    """Return entries whose name contains ``text`` (case-insensitive).
+
+    At most ``limit`` matches are returned; the flag tells whether the
+    search stopped early. The walk ends as soon as ``cancelled()`` returns
+    True, e.g. because a newer search replaced this one.
+    """
+    needle = text.lower()
+    walk = template_service.walk_template(template_name)
+    if cancelled is not None:
+        walk = takewhile(lambda _entry: not cancelled(), walk)
+    matches = ((rel, is_dir) for rel, is_dir in walk if needle in rel.rsplit("/", 1)[-1].lower())
+    found = list(islice(matches, limit + 1))
+    return found[:limit], len(found) > limit
 
 
 class TemplatePreview(ttk.Frame):
-    """Widget to display the folder structure of a template."""
+    """Widget to display the folder structure of a template.
+
+    Only the top level is listed up front; a folder's children are listed
+    on a background thread when it is expanded and inserted in batches, so
+    the Tk mainloop never blocks on large templates. The filter box shows
+    matching entries as a flat list without expanding the tree.
+    """
 
     def __init__(self, parent, template_service):
         super().__init__(parent)
         self.template_service = template_service
+        self.template_name: Optional[str] = None
+
+        self.filter_entry = ttk.Entry(self)
+        self.filter_entry.grid(row=0, column=0, columnspan=2, sticky="ew", pady=(0, 5))
+        self.filter_entry.bind("<KeyRelease>", self._on_filter_changed)
 
         self.tree = ttk.Treeview(self)
         self.tree.heading("#0", text="Template Content", anchor="w")
-        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.tree.grid(row=1, column=0, sticky="nsew")
+        self.tree.bind("<<TreeviewOpen>>", self._on_open)
 
         scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
         self.tree.configure(yscrollcommand=scrollbar.set)
-        scrollbar.grid(row=0, column=1, sticky="ns")
+        scrollbar.grid(row=1, column=1, sticky="ns")
 
         # make frame expandable
-        self.grid_rowconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
         self.grid_columnconfigure(0, weight=1)
 
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="preview")
+        self._results: "queue.SimpleQueue[Tuple[int, Callable[[Any], None], Any]]" = (
+            queue.SimpleQueue()
+        )
+        # bumped on every reload so results for an old template are dropped
+        self._generation = 0
+        self._unloaded: set = set()
+        self._pending = 0
+        self._filter_job: Optional[str] = None
+        self.bind("<Destroy>", lambda _event: self._executor.shutdown(wait=False))
+
     def load_template(self, template_name: str):
-        """Load and display the given template."""
+        """Load and display the top level of the given template."""
+        self.template_name = template_name
+        self.filter_entry.delete(0, "end")
+        self._show_tree()
+
+    def _show_tree(self):
+        self._generation += 1
         self.tree.delete(*self.tree.get_children())
-        structure = self.template_service.get_template_structure(template_name)
-        for root, children in structure.items():
-            self._insert_node("", root, children)
-
-    def _insert_node(self, parent, text, children):
-        node = self.tree.insert(parent, "end", text=text, open=True)
-        if children:
-            for name, sub in children.items():
-                self._insert_node(node, name, sub)
+        self._unloaded.clear()
+        if self.template_name is None:
+            return
+        self.tree.insert("", "end", iid=_ROOT, text=self.template_name, open=True)
+        self._list(_ROOT)
+
+    # --- lazy expansion ----------------------------------------------
+    def _on_open(self, _event):
+        node = self.tree.focus()
+        if node in self._unloaded:
+            self._unloaded.discard(node)
+            self._list(node)
+
+    def _list(self, node: str):
+        rel = "" if node == _ROOT else node[1:]
+        template_name = self.template_name
+        self._submit(
+            lambda: list_folder(self.template_service, template_name, rel),
+            lambda entries: self._insert_batches(node, entries),
+        )
+
+    def _insert_batches(self, node: str, entries: List[Tuple[str, bool]], start: int = 0):
+        generation = self._generation
+        if start == 0:
+            self._clear_placeholder(node)
+        for rel, is_dir in entries[start : start + INSERT_BATCH]:
+            self._insert_entry(node, rel, is_dir, rel.rsplit("/", 1)[-1])
+        if start + INSERT_BATCH < len(entries):
+            self.after_idle(self._continue_batches, generation, node, entries, start)
+
+    def _continue_batches(self, generation: int, node: str, entries, start: int):
+        if generation == self._generation:
+            self._insert_batches(node, entries, start + INSERT_BATCH)
+
+    def _insert_entry(self, parent: str, rel: str, is_dir: bool, text: str):
+        iid = _ROOT + rel
+        self.tree.insert(parent, "end", iid=iid, text=text)
+        if is_dir:
+            # placeholder so the folder shows an expander before it is listed
+            self.tree.insert(iid, "end", text="…")
+            self._unloaded.add(iid)
+
+    def _clear_placeholder(self, node: str):
+        for child in self.tree.get_children(node):
+            if not child.startswith(_ROOT):
+                self.tree.delete(child)
+
+    # --- filter ------------------------------------------------------
+    def _on_filter_changed(self, _event):
+        if self._filter_job is not None:
+            self.after_cancel(self._filter_job)
+        self._filter_job = self.after(FILTER_DELAY_MS, self._apply_filter)
+
+    def _apply_filter(self):
+        self._filter_job = None
+        text = self.filter_entry.get().strip()
+        if not text:
+            self._show_tree()
+            return
+        self._generation += 1
+        self.tree.delete(*self.tree.get_children())
+        self._unloaded.clear()
+        template_name = self.template_name
+        generation = self._generation
+        # the worker drops a search once a newer keystroke bumped the generation
+        self._submit(
+            lambda: search_template(
+                self.template_service,
+                template_name,
+                text,
+                cancelled=lambda: generation != self._generation,
+            ),
+            self._show_matches,
+        )
+
+    def _show_matches(self, result: Tuple[List[Tuple[str, bool]], bool]):
+        matches, truncated = result
+        for rel, is_dir in matches:
+            self.tree.insert("", "end", text=rel + ("/" if is_dir else ""))
+        if truncated:
+            self.tree.insert("", "end", text=f"… more than {SEARCH_LIMIT} matches")
+
+    # --- background work ---------------------------------------------
+    def _submit(self, work: Callable[[], Any], apply: Callable[[Any], None]):
+        generation = self._generation
+        future = self._executor.submit(work)
+        future.add_done_callback(lambda f: self._results.put((generation, apply, f)))
+        self._pending += 1
+        if self._pending == 1:
+            self.after(POLL_INTERVAL_MS, self._poll)
+
+    def _poll(self):  # pragma: no cover - requires GUI
+        try:
+            while True:
+                generation, apply, future = self._results.get_nowait()
+                self._pending -= 1
+                if generation != self._generation:
+                    continue
+                if future.exception() is not None:
+                    self.tree.insert("", "end", text=f"Error: {future.exception()}")
+                    continue
+                apply(future.result())
+        except queue.Empty:
+            pass
+        if self._pending:
+            self.after(POLL_INTERVAL_MS, self._poll)
@@ -32,6 +32,11 @@ class TemplateRegistry:
             "metadata": template.get_metadata(),
         }
 
+    def get_file_contents(self, name: str) -> Dict[str, str]:
+        """Return ``{relative path: text}`` for the files a template fills in."""
+        template_class = self._templates.get(name.lower())
+        return template_class().get_file_contents() if template_class else {}
+
 
 _default_registry = None
 
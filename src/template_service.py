@@ -1,24 +1,194 @@
-from pathlib import Path
-from typing import Union, Dict, Any
+import os
+import shutil
+import stat
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
+from itertools import islice
+from pathlib import Path, PurePosixPath
+from typing import Union, Dict, Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from src import tracing
+from src.instrumentation import TOTAL_PHASE, GenerationHook
+from src.template_manifest import (
+    TreeScan,
+    file_digest,
+    load_manifest,
+    manifest_path,
+    save_manifest,
+    scan_tree,
+    tree_unchanged,
+)
+from src.template_metadata import (
+    FileInfoCursor,
+    build_metadata,
+    classify_files,
+    load_metadata,
+    metadata_path,
+    root_id,
+    save_metadata,
+)
+from src.throttle import IOThrottle
+
+# a stopped preview counts at most this many of the entries it left out
+REMAINING_LIMIT = 10_000
 
 
 class TemplateService:
     """Service for managing template folders."""
 
-    def __init__(self, templates_dir: Path):
-        """Initialize with the directory containing all templates."""
+    def __init__(
+        self,
+        templates_dir: Path,
+        registry: Optional[Any] = None,
+        hooks: Optional[Iterable[GenerationHook]] = None,
+    ):
+        """Initialize with the directory containing all templates.
+
+        ``registry`` is consulted for template names that have no folder in
+        ``templates_dir``; it defaults to the shared ``TemplateRegistry``.
+        ``hooks`` receive phase, file and error callbacks during generation
+        and import.
+        """
         self.templates_dir = Path(templates_dir)
         self.templates_dir.mkdir(parents=True, exist_ok=True)
+        self._registry = registry
+        self.hooks: List[GenerationHook] = [*(hooks or ())]
+        # template name -> ((sidecar mtime, template root id), sidecar header)
+        self._metadata: Dict[str, Tuple[Tuple[int, ...], Dict[str, Any]]] = {}
+
+    def add_hook(self, hook: GenerationHook) -> None:
+        """Register an instrumentation hook."""
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook: GenerationHook) -> None:
+        """Unregister a previously added hook."""
+        self.hooks.remove(hook)
+
+    @contextmanager
+    def _phase(self, operation: str, phase: str, **info: Any) -> Iterator[tracing.PausableSpan]:
+        """Trace ``phase`` and report it to the hooks, if any are registered.
+
+        Generators pause the yielded span around each ``yield``, so phase
+        durations do not include the time the consumer spends per event.
+        """
+        hooks = self.hooks
+        for hook in hooks:
+            hook.on_phase_start(operation, phase, **info)
+        span = tracing.PausableSpan(operation if phase == TOTAL_PHASE else phase, **info)
+        try:
+            yield span
+        finally:
+            span.pause()
+            for hook in hooks:
+                hook.on_phase_end(operation, phase, span.elapsed, **info)
+
+    @contextmanager
+    def _operation(self, operation: str, **info: Any) -> Iterator[tracing.PausableSpan]:
+        """Wrap a whole operation in the ``total`` phase and report failures."""
+        try:
+            with self._phase(operation, TOTAL_PHASE, **info) as span:
+                yield span
+        except Exception as exc:
+            for hook in self.hooks:
+                hook.on_error(operation, exc)
+            raise
+
+    def _file_done(self, operation: str, path: str, nbytes: int, cached: bool = False) -> None:
+        for hook in self.hooks:
+            hook.on_file_done(operation, path, nbytes, cached)
+
+    @property
+    def registry(self):
+        """Return the template registry, importing it on first use."""
+        if self._registry is None:
+            from src.template_registry import get_default_registry
+
+            self._registry = get_default_registry()
+        return self._registry
 
     def list_templates(self):
-        """Return a sorted list of available template names."""
-        return sorted(p.name for p in self.templates_dir.iterdir() if p.is_dir())
+        """Return a sorted list of available template names.
+
+        Hidden folders such as the ``.lokal`` cache directory are skipped.
+        """
+        return sorted(
+            p.name
+            for p in self.templates_dir.iterdir()
+            if p.is_dir() and not p.name.startswith(".")
+        )
+
+    def template_metadata(self, template_name: str, files: bool = True) -> Optional[Dict[str, Any]]:
+        """Return the metadata sidecar written at import, or None.
+
+        Templates that were copied into the templates dir by hand have no
+        sidecar, and a sidecar is ignored once a folder of the template was
+        changed since (every folder mtime is compared); callers then
+        inspect the files themselves. With ``files=False`` only the header
+        is returned, without the per-file ``"files"`` table.
+        """
+        root = self.templates_dir / template_name
+        path = metadata_path(self.templates_dir, template_name)
+        try:
+            key = (path.stat().st_mtime_ns, *root_id(root))
+        except OSError:
+            return None
+        cached = self._metadata.get(template_name)
+        if cached is None or cached[0] != key:
+            header = load_metadata(path, root, files=False)
+            if header is None:
+                return None
+            cached = (key, header)
+            self._metadata[template_name] = cached
+        if not tree_unchanged(root, cached[1]["tree"]):
+            return None
+        if not files:
+            return cached[1]
+        return load_metadata(path, root)
+
+    def file_info(self, template_name: str) -> FileInfoCursor:
+        """Return a cursor over the sidecar's file records, for lookups in walk order.
+
+        Without a valid sidecar every lookup gives None.
+        """
+        if self.template_metadata(template_name, files=False) is None:
+            return FileInfoCursor()
+        return FileInfoCursor(
+            metadata_path(self.templates_dir, template_name), self.templates_dir / template_name
+        )
+
+    def count_entries(self, template_name: str) -> Tuple[int, int]:
+        """Return ``(files, dirs)`` of a template, from its sidecar when present."""
+        metadata = self.template_metadata(template_name, files=False)
+        if metadata is not None:
+            return metadata["file_count"], metadata["dirs"]
+        files = dirs = 0
+        for _, is_dir in self.walk_template(template_name):
+            if is_dir:
+                dirs += 1
+            else:
+                files += 1
+        return files, dirs
+
+    def has_template(self, template_name: str) -> bool:
+        """Return True if the name is a template folder or a registry template."""
+        if (self.templates_dir / template_name).is_dir():
+            return True
+        return template_name.lower() in self.registry.list_available()
+
+    def _registry_structure(self, template_name: str) -> Optional[Dict[str, Any]]:
+        if (self.templates_dir / template_name).exists():
+            return None
+        if template_name.lower() not in self.registry.list_available():
+            return None
+        info = self.registry.get_template_info(template_name)
+        return info["structure"] if info else None
 
     def get_template_structure(self, template_name: str) -> Dict[str, Any]:
         """Return a nested dict representing the folder structure."""
         root = self.templates_dir / template_name
         if not root.exists():
-            return {}
+            registered = self._registry_structure(template_name)
+            return {template_name: registered} if registered is not None else {}
         structure: Dict[str, Any] = {}
         for path in sorted(root.rglob("*")):
             relative = path.relative_to(root)
@@ -32,16 +202,506 @@ class TemplateService:
                 node[parts[-1]] = None
         return {template_name: structure}
 
-    def import_template(self, src_path: Union[str, Path]):
-        """Import a template folder by copying it into the templates dir."""
+    def walk_template(
+        self,
+        template_name: str,
+        max_depth: Optional[int] = None,
+        subpath: Optional[str] = None,
+    ) -> "TemplateWalk":
+        """Return a lazy ``(relative_path, is_dir)`` walk over a template.
+
+        ``max_depth`` limits how many levels below ``subpath`` (or the
+        template root) are listed; deeper folders are never opened.
+        Registry templates are walked from their structure.
+        """
+        root = self.templates_dir / template_name
+        parts = PurePosixPath(subpath or "").parts
+        if ".." in parts or PurePosixPath(subpath or "").is_absolute():
+            raise ValueError(f"Invalid path '{subpath}'")
+        if root.is_dir():
+            start = root.joinpath(*parts)
+            if not start.is_dir():
+                raise FileNotFoundError(f"'{subpath}' is not a folder of '{template_name}'")
+            return TemplateWalk(start, parts, max_depth)
+        structure = self._registry_structure(template_name)
+        if structure is None:
+            raise FileNotFoundError(f"Template '{template_name}' not found")
+        for part in parts:
+            structure = structure.get(part)
+            if not isinstance(structure, dict):
+                raise FileNotFoundError(f"'{subpath}' is not a folder of '{template_name}'")
+        return TemplateWalk(structure, parts, max_depth)
+
+    def generate_project(
+        self,
+        template_name: str,
+        dest: Union[str, Path],
+        executor: Optional[Executor] = None,
+        batch_size: int = 1024,
+        throttle: Optional[IOThrottle] = None,
+        exist_ok: bool = False,
+    ) -> Iterator[Dict[str, Any]]:
+        """Materialize a template into ``dest`` and yield one event per entry.
+
+        The walk is processed in batches of ``batch_size`` entries, each
+        going through the ``scan``, ``plan``, ``mkdir`` and ``copy`` (or
+        ``render`` for registry templates) phases, so memory stays bounded.
+        Files are copied on ``executor`` when given, through ``throttle``
+        if bandwidth/IOPS limits or an I/O priority apply. A final ``verify``
+        phase checks the totals before ``{"event": "done", ...}`` is yielded.
+        ``dest`` must not exist unless ``exist_ok`` is set.
+        """
+        with self._operation("generate", template=template_name) as span:
+            for event in self._generate(
+                template_name, Path(dest), executor, batch_size, throttle, exist_ok
+            ):
+                span.pause()
+                yield event
+                span.resume()
+
+    def _generate(
+        self,
+        template_name: str,
+        dest: Path,
+        executor: Optional[Executor],
+        batch_size: int,
+        throttle: Optional[IOThrottle],
+        exist_ok: bool = False,
+    ) -> Iterator[Dict[str, Any]]:
+        if dest.exists() and not exist_ok:
+            raise FileExistsError(f"Output directory '{dest}' already exists")
+        if not self.has_template(template_name):
+            raise FileNotFoundError(f"Template '{template_name}' not found")
+        root = self.templates_dir / template_name
+        render = not root.is_dir()
+        walk = self.walk_template(template_name)
+        contents = self.registry.get_file_contents(template_name) if render else {}
+        dest.mkdir(parents=True, exist_ok=exist_ok)
+        with FileInfoCursor() if render else self.file_info(template_name) as file_info:
+            yield from self._generate_batches(
+                walk, root, dest, render, contents, file_info, executor, batch_size, throttle
+            )
+
+    def _generate_batches(
+        self,
+        walk: "TemplateWalk",
+        root: Path,
+        dest: Path,
+        render: bool,
+        contents: Dict[str, Optional[str]],
+        file_info: FileInfoCursor,
+        executor: Optional[Executor],
+        batch_size: int,
+        throttle: Optional[IOThrottle],
+    ) -> Iterator[Dict[str, Any]]:
+        hooks = self.hooks
+        planned = files = total_bytes = 0
+        while True:
+            with self._phase("generate", "scan"):
+                batch = list(islice(walk, batch_size))
+            if not batch:
+                break
+            with self._phase("generate", "plan", entries=len(batch)):
+                dirs = [rel for rel, is_dir in batch if is_dir]
+                copies = [rel for rel, is_dir in batch if not is_dir]
+                planned += len(copies)
+            with self._phase("generate", "mkdir", dirs=len(dirs)):
+                for rel in dirs:
+                    (dest / rel).mkdir(exist_ok=True)
+            for rel in dirs:
+                yield {"event": "mkdir", "path": rel}
+            if render:
+                with self._phase("generate", "render", files=len(copies)):
+                    results: Iterable[Tuple[str, int]] = [
+                        _render_file(dest, rel, contents.get(rel)) for rel in copies
+                    ]
+            elif executor is None:
+                with self._phase("generate", "copy", files=len(copies)):
+                    results = [
+                        _copy_file(root / rel, dest / rel, rel, throttle, file_info.get(rel))
+                        for rel in copies
+                    ]
+            else:
+                results = self._copy_parallel(executor, root, dest, copies, throttle, file_info)
+            for rel, size in results:
+                files += 1
+                total_bytes += size
+                if hooks:
+                    self._file_done("generate", rel, size)
+                yield {"event": "file", "path": rel, "bytes": size}
+
+        with self._phase("generate", "verify", files=files):
+            if files != planned:
+                raise RuntimeError(f"Generated {files} of {planned} planned files")
+        yield {"event": "done", "path": str(dest), "files": files, "bytes": total_bytes}
+
+    def _copy_parallel(
+        self,
+        executor: Executor,
+        root: Path,
+        dest: Path,
+        copies: List[str],
+        throttle: Optional[IOThrottle] = None,
+        file_info: Optional[FileInfoCursor] = None,
+    ) -> Iterator[Tuple[str, int]]:
+        """Copy one batch on ``executor``, yielding results as they finish."""
+        file_info = file_info or FileInfoCursor()
+        with self._phase("generate", "copy", files=len(copies)) as span:
+            pending = {
+                executor.submit(
+                    _copy_file, root / rel, dest / rel, rel, throttle, file_info.get(rel)
+                )
+                for rel in copies
+            }
+            try:
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        result = future.result()
+                        span.pause()
+                        yield result
+                        span.resume()
+            finally:
+                # on cancellation, do not let queued copies outlive the caller
+                for future in pending:
+                    future.cancel()
+                wait(pending)
+
+    def import_template(
+        self,
+        src_path: Union[str, Path],
+        throttle: Optional[IOThrottle] = None,
+        update: bool = False,
+        executor: Optional[Executor] = None,
+    ):
+        """Import a template folder by copying it into the templates dir.
+
+        Before copying, an ``analyze`` phase classifies the files on
+        ``executor`` (a private pool by default) and rejects symlink loops;
+        the result is stored as the template's metadata sidecar.
+        ``throttle`` limits the bandwidth/IOPS and I/O priority of the copy.
+        With ``update`` an existing template is synced instead, see
+        ``sync_template``.
+        """
+        if update:
+            self.sync_template(src_path, throttle, executor)
+            return self.templates_dir / Path(src_path).name
+        src = Path(src_path)
+        with self._operation("import", template=src.name):
+            dest = self.templates_dir / src.name
+            if dest.exists():
+                raise FileExistsError(f"Template '{src.name}' already exists")
+            if not src.is_dir():
+                raise ValueError("Only directories can be imported as templates")
+            with self._phase("import", "analyze"):
+                scan = _checked_scan(src)
+                kinds = classify_files(src, scan.files, executor)
+            with self._phase("import", "copy", files=len(scan.files)):
+                copy: Callable[[str, str], Any] = (
+                    throttle.copy_file if throttle is not None else shutil.copy2
+                )
+                if self.hooks:
+                    copy = self._reporting_copy(dest, copy)
+                shutil.copytree(src, dest, copy_function=copy)
+            with self._phase("import", "manifest"):
+                save_manifest(manifest_path(self.templates_dir, src.name), scan.files, scan.dirs)
+                tree, stats = _tree_state(dest)
+                save_metadata(
+                    metadata_path(self.templates_dir, src.name),
+                    build_metadata(scan, kinds, dest, tree=tree, stats=stats),
+                )
+        return dest
+
+    def sync_template(
+        self,
+        src_path: Union[str, Path],
+        throttle: Optional[IOThrottle] = None,
+        executor: Optional[Executor] = None,
+    ) -> Dict[str, int]:
+        """Bring an imported template up to date with ``src_path``.
+
+        Files are compared by size and mtime against the manifest written by
+        the last import; when only the mtime differs the SHA-256 digests
+        decide. Only new or changed files are copied and files or folders
+        that vanished from the source are deleted, so the work is
+        proportional to the changes; the metadata sidecar is updated by
+        classifying just the copied files. A template that was not imported
+        yet is imported in full.
+
+        Returns the counts ``copied``, ``deleted``, ``unchanged`` and the
+        ``bytes`` copied.
+        """
         src = Path(src_path)
+        if not src.is_dir():
+            raise ValueError("Only directories can be imported as templates")
         dest = self.templates_dir / src.name
-        if dest.exists():
-            raise FileExistsError(f"Template '{src.name}' already exists")
-        if src.is_dir():
-            import shutil
+        manifest = manifest_path(self.templates_dir, src.name)
+        if not dest.exists():
+            self.import_template(src, throttle, executor=executor)
+            files = load_manifest(manifest)[0]
+            return {
+                "copied": len(files),
+                "deleted": 0,
+                "unchanged": 0,
+                "bytes": sum(size for size, _, _ in files.values()),
+            }
+
+        with self._operation("import", template=src.name, update=True):
+            with self._phase("import", "scan"):
+                scan = _checked_scan(src)
+                source_files, source_dirs = scan.files, scan.dirs
+                known = load_manifest(manifest)
+                if known is None:
+                    # imported before manifests existed: the destination is the baseline
+                    known = scan_tree(dest)[:2]
+                known_files, known_dirs = known
+
+            with self._phase("import", "plan"):
+                copies: List[str] = []
+                unchanged: List[str] = []
+                for rel, (size, mtime_ns, _) in source_files.items():
+                    previous = known_files.get(rel)
+                    if previous is None or previous[0] != size:
+                        copies.append(rel)
+                    elif previous[1] == mtime_ns:
+                        unchanged.append(rel)
+                        source_files[rel][2] = previous[2]
+                    else:
+                        # same size, new mtime: only the content can tell
+                        digest = file_digest(src / rel)
+                        if previous[2] is None:
+                            previous[2] = file_digest(dest / rel)
+                        source_files[rel][2] = digest
+                        if digest == previous[2]:
+                            unchanged.append(rel)
+                        else:
+                            copies.append(rel)
+                removed_files = [rel for rel in known_files if rel not in source_files]
+                source_dir_set = set(source_dirs)
+                removed_dirs = [rel for rel in known_dirs if rel not in source_dir_set]
+
+            with self._phase("import", "delete"):
+                for rel in removed_files:
+                    target = dest / rel
+                    if target.is_symlink() or target.is_file():
+                        target.unlink()
+                # deepest first, so parents are empty by the time they are removed
+                for rel in sorted(removed_dirs, key=lambda r: r.count("/"), reverse=True):
+                    shutil.rmtree(dest / rel, ignore_errors=True)
+
+            copied_bytes = 0
+            with self._phase("import", "copy", files=len(copies)):
+                for rel in sorted(source_dirs):
+                    (dest / rel).mkdir(exist_ok=True)
+                copy = throttle.copy_file if throttle is not None else shutil.copy2
+                for rel in copies:
+                    target = dest / rel
+                    if target.is_symlink():
+                        target.unlink()
+                    copy(src / rel, target)
+                    size = source_files[rel][0]
+                    copied_bytes += size
+                    if self.hooks:
+                        self._file_done("import", rel, size)
+                if self.hooks:
+                    for rel in unchanged:
+                        self._file_done("import", rel, source_files[rel][0], cached=True)
+
+            with self._phase("import", "analyze", files=len(copies)):
+                sidecar = metadata_path(self.templates_dir, src.name)
+                previous = (load_metadata(sidecar, dest) or {}).get("files", {})
+                kinds = {
+                    rel: (previous[rel]["kind"], previous[rel]["encoding"])
+                    for rel in unchanged
+                    if rel in previous
+                }
+                kinds.update(
+                    classify_files(src, [rel for rel in source_files if rel not in kinds], executor)
+                )
+
+            with self._phase("import", "manifest"):
+                save_manifest(manifest, source_files, source_dirs)
+                tree, stats = _tree_state(dest)
+                save_metadata(sidecar, build_metadata(scan, kinds, dest, tree=tree, stats=stats))
+
+        return {
+            "copied": len(copies),
+            "deleted": len(removed_files),
+            "unchanged": len(unchanged),
+            "bytes": copied_bytes,
+        }
+
+    def _reporting_copy(
+        self, dest_root: Path, copy_function: Callable[[str, str], Any]
+    ) -> Callable[[str, str], Any]:
+        """Wrap a ``copytree`` copy function so each file is reported to the hooks."""
+
+        def copy(src: str, dst: str) -> Any:
+            result = copy_function(src, dst)
+            self._file_done(
+                "import", Path(dst).relative_to(dest_root).as_posix(), os.path.getsize(dst)
+            )
+            return result
+
+        return copy
+
+
+def _tree_state(root: Path) -> Tuple[Dict[str, int], Dict[str, Tuple[int, int]]]:
+    """Return the folder mtimes and the ``(size, mtime_ns)`` of the regular files of a copy."""
+    mtimes: Dict[str, int] = {}
+    stats: Dict[str, Tuple[int, int]] = {}
+    for rel, is_dir in TemplateWalk(root, mtimes=mtimes):
+        if not is_dir:
+            st = os.lstat(root / rel)
+            if stat.S_ISREG(st.st_mode):
+                stats[rel] = (st.st_size, st.st_mtime_ns)
+    return mtimes, stats
+
+
+def _checked_scan(src: Path) -> TreeScan:
+    """Scan a template source, refusing symlink loops before anything is copied."""
+    scan = scan_tree(src)
+    if scan.loops:
+        raise ValueError(f"Template contains symlink loops: {', '.join(sorted(scan.loops))}")
+    return scan
+
+
+def entry_record(
+    rel: str, is_dir: bool, info: Optional[Dict[str, Any]] = None, cut: bool = False
+) -> Dict[str, Any]:
+    """Return the machine-readable record for one ``walk_template`` entry.
+
+    ``info`` from the metadata sidecar adds ``size``, ``kind`` and
+    ``encoding`` to file records; ``cut`` marks a non-empty folder whose
+    content was left out by the depth limit with ``"truncated": true``.
+    """
+    record = {"path": rel, "type": "dir" if is_dir else "file", "depth": rel.count("/")}
+    if info is not None:
+        record.update((key, value) for key, value in info.items() if key != "mtime")
+    if cut:
+        record["truncated"] = True
+    return record
+
 
-            shutil.copytree(src, dest)
+class TemplateWalk:
+    """Iterator over template entries in sorted depth-first order.
+
+    Uses an explicit stack, so arbitrarily deep templates cannot exhaust
+    the recursion limit, and lists each folder only when it is entered.
+    ``last_cut`` is True right after a non-empty folder was yielded that
+    ``max_depth`` keeps closed. After stopping early, ``remaining()``
+    counts the entries that were not yielded.
+
+    With a ``mtimes`` dict, the mtime of every folder is recorded in it
+    just before the folder is listed, so ``tree_unchanged`` can later tell
+    whether anything was added, removed or renamed since the walk.
+    """
+
+    def __init__(
+        self,
+        root: Union[Path, Dict[str, Any]],
+        prefix_parts: Tuple[str, ...] = (),
+        max_depth: Optional[int] = None,
+        mtimes: Optional[Dict[str, int]] = None,
+    ):
+        self.max_depth = max_depth
+        self.mtimes = mtimes
+        self.last_cut = False
+        prefix = "/".join(prefix_parts) + "/" if prefix_parts else ""
+        # each frame: [prefix, depth, entries, position]
+        self._stack: List[List[Any]] = [[prefix, 0, self._list(root, prefix), 0]]
+
+    def __iter__(self) -> "TemplateWalk":
+        return self
+
+    def __next__(self) -> Tuple[str, bool]:
+        while self._stack:
+            frame = self._stack[-1]
+            prefix, depth, entries, position = frame
+            if position >= len(entries):
+                self._stack.pop()
+                continue
+            frame[3] = position + 1
+            name, is_dir, source = entries[position]
+            rel = prefix + name
+            self.last_cut = False
+            if is_dir and (self.max_depth is None or depth + 1 < self.max_depth):
+                self._stack.append([rel + "/", depth + 1, self._list(source, rel + "/"), 0])
+            elif is_dir:
+                self.last_cut = _has_entries(source)
+            return rel, is_dir
+        raise StopIteration
+
+    def _list(
+        self, source: Union[Path, Dict[str, Any]], prefix: str
+    ) -> List[Tuple[str, bool, Any]]:
+        if self.mtimes is not None and not isinstance(source, dict):
+            self.mtimes[prefix[:-1]] = os.stat(source).st_mtime_ns
+        return _list_entries(source)
+
+    def remaining(self, limit: Optional[int] = None) -> int:
+        """Count the entries not yielded yet by walking on (within ``max_depth``).
+
+        Stops after ``limit`` entries, so the count is exact only when it is
+        below ``limit``. The walk is exhausted or advanced afterwards.
+        """
+        count = 0
+        for _ in islice(self, limit):
+            count += 1
+        return count
+
+
+def _has_entries(source: Union[Path, Dict[str, Any]]) -> bool:
+    if isinstance(source, dict):
+        return bool(source)
+    with os.scandir(source) as it:
+        return next(it, None) is not None
+
+
+def _list_entries(source: Union[Path, Dict[str, Any]]) -> List[Tuple[str, bool, Any]]:
+    """Return sorted ``(name, is_dir, child_source)`` tuples for one folder."""
+    if isinstance(source, dict):
+        return [(name, isinstance(sub, dict), sub) for name, sub in sorted(source.items())]
+    with os.scandir(source) as it:
+        entries = [(e.name, e.is_dir(follow_symlinks=False), Path(e.path)) for e in it]
+    entries.sort(key=lambda e: e[0])
+    return entries
+
+
+def _render_file(dest: Path, rel: str, content: Optional[str] = None) -> Tuple[str, int]:
+    """Write a registry template file; files without content stay empty."""
+    if content is None:
+        (dest / rel).touch()
+        return rel, 0
+    data = content.encode("utf-8")
+    (dest / rel).write_bytes(data)
+    return rel, len(data)
+
+
+def _copy_file(
+    src: Path,
+    dest: Path,
+    rel: str,
+    throttle: Optional[IOThrottle] = None,
+    info: Optional[Dict[str, Any]] = None,
+) -> Tuple[str, int]:
+    """Copy one template file; ``info`` from the metadata sidecar saves the lstat/stat.
+
+    ``info`` must come from a ``FileInfoCursor`` that checked it against
+    ``src``, so it describes a regular file. Without it, symlinks (e.g.
+    ones added to the templates dir by hand) are recreated as links.
+    """
+    tracer = tracing.get_tracer()
+    start = tracer.now_ns() if tracer is not None else 0
+    if info is None and src.is_symlink():
+        os.symlink(os.readlink(src), dest)
+        size = 0
+    else:
+        if throttle is not None:
+            throttle.copy_file(src, dest)
         else:
-            raise ValueError("Only directories can be imported as templates")
-        return dest
+            shutil.copy2(src, dest)
+        size = info["size"] if info is not None else dest.stat().st_size
+    if tracer is not None:
+        tracer.record("copy_file", start, tracer.now_ns(), "file", {"path": rel, "bytes": size})
+    return rel, size
@@ -0,0 +1,217 @@
+"""I/O throttling and priority for the copy path.
+
+``IOThrottle`` limits bandwidth and I/O operations per second with token
+buckets, so large generations share the disk smoothly with other jobs
+instead of saturating it. ``set_io_priority`` lowers the Linux I/O
+scheduling class through ``ioprio_set``; elsewhere it is a no-op.
+``io_priority`` applies a class for the duration of one task and restores
+the thread's previous one, so pooled worker threads do not keep it.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import functools
+import os
+import platform
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3}
+
+# ioprio_set(2)/ioprio_get(2) constants and per-architecture syscall numbers
+IOPRIO_WHO_PROCESS = 1
+IOPRIO_CLASS_SHIFT = 13
+IO_PRIORITY_CLASSES = {"best-effort": 2, "idle": 3}
+_IOPRIO_SET_SYSCALL = {
+    "x86_64": 251,
+    "amd64": 251,
+    "i386": 289,
+    "i686": 289,
+    "aarch64": 30,
+    "arm64": 30,
+    "riscv64": 30,
+    "armv7l": 314,
+    "ppc64le": 273,
+    "s390x": 282,
+}
+# ioprio_get directly follows ioprio_set on every architecture above
+_IOPRIO_GET_SYSCALL = {machine: nr + 1 for machine, nr in _IOPRIO_SET_SYSCALL.items()}
+
+
+def parse_size(value: str) -> int:
+    """Parse ``512``, ``64K``, ``10M`` or ``1G`` (powers of 1024) into bytes."""
+    text = str(value).strip().upper().rstrip("B")
+    unit = text[-1:] if text[-1:] in SIZE_UNITS else ""
+    return int(float(text[: len(text) - len(unit)]) * SIZE_UNITS[unit])
+
+
+class TokenBucket:
+    """Thread-safe token bucket that sleeps callers to hold ``rate`` per second.
+
+    Requests larger than the bucket put it into debt, so the long-run rate
+    stays exact and bursts never exceed ``capacity``.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity is not None else max(self.rate / 10, 1.0)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def consume(self, amount: float = 1.0) -> float:
+        """Take ``amount`` tokens, sleeping until they are covered; return the delay."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= amount
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if delay > 0:
+            self._sleep(delay)
+        return delay
+
+
+@functools.lru_cache(maxsize=None)
+def _libc() -> Optional[ctypes.CDLL]:
+    """Load the C library once; None if it cannot be loaded."""
+    try:
+        return ctypes.CDLL(None, use_errno=True)
+    except OSError:
+        return None
+
+
+def _ioprio_syscall(table: dict, *args: int) -> Optional[int]:
+    """Run an ioprio syscall for the calling thread; None if unavailable."""
+    syscall_nr = table.get(platform.machine().lower())
+    if not platform.system() == "Linux" or syscall_nr is None:
+        return None
+    libc = _libc()
+    if libc is None:
+        return None
+    return libc.syscall(syscall_nr, IOPRIO_WHO_PROCESS, 0, *args)
+
+
+def get_io_priority() -> Optional[int]:
+    """Return the raw ``ioprio`` value of the calling thread, or None if unavailable."""
+    value = _ioprio_syscall(_IOPRIO_GET_SYSCALL)
+    return value if value is not None and value >= 0 else None
+
+
+def set_io_priority(io_class: str, level: int = 4) -> bool:
+    """Set the I/O scheduling class of the calling thread.
+
+    Returns False when ``ioprio_set`` is unavailable (non-Linux, unknown
+    architecture or the call was refused); the copy then simply runs with
+    the default priority.
+    """
+    if io_class not in IO_PRIORITY_CLASSES:
+        raise ValueError(f"Unknown I/O priority '{io_class}'")
+    data = 0 if io_class == "idle" else level
+    value = (IO_PRIORITY_CLASSES[io_class] << IOPRIO_CLASS_SHIFT) | data
+    return _ioprio_syscall(_IOPRIO_SET_SYSCALL, value) == 0
+
+
+@contextmanager
+def io_priority(io_class: Optional[str]) -> Iterator[None]:
+    """Run the block with ``io_class`` and restore the thread's previous priority.
+
+    ``None`` leaves the priority alone.
+    """
+    previous = get_io_priority() if io_class is not None else None
+    applied = io_class is not None and set_io_priority(io_class)
+    try:
+        yield
+    finally:
+        if applied and previous is not None:
+            _ioprio_syscall(_IOPRIO_SET_SYSCALL, previous)
+
+
+class IOThrottle:
+    """Bandwidth/IOPS limits and I/O priority applied to file copies."""
+
+    def __init__(
+        self,
+        max_bandwidth: Optional[int] = None,
+        max_iops: Optional[int] = None,
+        io_priority: Optional[str] = None,
+        chunk_size: int = 1024 * 1024,
+    ):
+        self.max_bandwidth = max_bandwidth
+        self.max_iops = max_iops
+        self.io_priority = io_priority
+        self._bandwidth = TokenBucket(max_bandwidth) if max_bandwidth else None
+        self._iops = TokenBucket(max_iops) if max_iops else None
+        # keep chunks small enough that one chunk is ~100 ms of bandwidth
+        self.chunk_size = max(4096, min(chunk_size, (max_bandwidth or chunk_size * 10) // 10))
+        if io_priority is not None and io_priority not in IO_PRIORITY_CLASSES:
+            raise ValueError(f"Unknown I/O priority '{io_priority}'")
+
+    @classmethod
+    def from_options(
+        cls,
+        max_bandwidth: Optional[int] = None,
+        max_iops: Optional[int] = None,
+        io_priority: Optional[str] = None,
+    ) -> Optional["IOThrottle"]:
+        """Return a throttle for the given limits, or None if none is set."""
+        if not (max_bandwidth or max_iops or io_priority):
+            return None
+        return cls(max_bandwidth, max_iops, io_priority)
+
+    @classmethod
+    def from_env(cls) -> Optional["IOThrottle"]:
+        """Build a throttle from ``LOKAL_MAX_BANDWIDTH``/``_IOPS``/``LOKAL_IO_PRIORITY``."""
+        bandwidth = os.environ.get("LOKAL_MAX_BANDWIDTH")
+        iops = os.environ.get("LOKAL_MAX_IOPS")
+        return cls.from_options(
+            parse_size(bandwidth) if bandwidth else None,
+            int(iops) if iops else None,
+            os.environ.get("LOKAL_IO_PRIORITY") or None,
+        )
+
+    def options(self) -> dict:
+        """Return the constructor options, e.g. to forward them to the daemon."""
+        return {
+            "max_bandwidth": self.max_bandwidth,
+            "max_iops": self.max_iops,
+            "io_priority": self.io_priority,
+        }
+
+    def _op(self) -> None:
+        if self._iops is not None:
+            self._iops.consume(1)
+
+    def copy_file(self, src, dst) -> str:
+        """Copy ``src`` to ``dst`` with metadata, honouring the limits.
+
+        The I/O priority applies to the calling thread only while this file
+        is copied (``ioprio_set`` with who=0 affects just that thread).
+        """
+        with io_priority(self.io_priority):
+            self._op()
+            with open(src, "rb") as reader, open(dst, "wb") as writer:
+                while True:
+                    chunk = reader.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    if self._bandwidth is not None:
+                        self._bandwidth.consume(len(chunk))
+                    self._op()
+                    writer.write(chunk)
+            shutil.copystat(src, dst)
+        return str(dst)
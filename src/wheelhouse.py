@@ -0,0 +1,517 @@
+"""Offline package installs from a local directory of wheels.
+
+A ``Wheelhouse`` indexes its directory by project name and version once
+(the index is cached next to the unpacked wheels and refreshed for every
+wheel file whose size or mtime changed). ``install`` resolves the requested
+packages together with their ``Requires-Dist`` dependencies and puts them
+into a virtual environment without pip: every wheel is unpacked once into a
+content-addressed cache and then hardlinked (or reflinked) into the
+environment, with one worker per wheel.
+"""
+
+from __future__ import annotations
+
+import configparser
+import hashlib
+import json
+import os
+import platform
+import re
+import shutil
+import sys
+import sysconfig
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from email.parser import HeaderParser
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from src.dependency_management import (
+    clone_file,
+    default_cache_dir,
+    normalize_name,
+    parse_requirement,
+    venv_python,
+)
+
+INDEX_VERSION = 2
+INSTALL_WORKERS = min(8, (os.cpu_count() or 1) + 2)
+
+_WHEEL_RE = re.compile(
+    r"^(?P<name>[^-]+)-(?P<version>[^-]+)(?:-(?P<build>\d[^-]*))?"
+    r"-(?P<python>[^-]+)-(?P<abi>[^-]+)-(?P<platform>[^-]+)\.whl$"
+)
+# "name[extra,...] (>=1.0,<2); marker" as found in Requires-Dist lines
+_REQUIRES_RE = re.compile(
+    r"^\s*(?P<name>[A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:\[(?P<extras>[^\]]*)\])?"
+    r"\s*\(?(?P<spec>[^;()]*)\)?\s*(?:;(?P<marker>.*))?$"
+)
+_MARKER_TOKEN_RE = re.compile(
+    r"\s*(?:(?P<string>'[^']*'|\"[^\"]*\")|(?P<op>===|==|!=|<=|>=|~=|<|>|\(|\))"
+    r"|(?P<word>[A-Za-z_][A-Za-z0-9_.]*))"
+)
+_VERSION_MARKERS = {"python_version", "python_full_version", "implementation_version"}
+_LAUNCHER = """#!{python}
+import sys
+from {module} import {attr}
+
+if __name__ == "__main__":
+    sys.exit({func}())
+"""
+
+
+class Wheel(NamedTuple):
+    name: str
+    version: str
+    filename: str
+    digest: str
+    tags: Tuple[str, str, str]
+    requires: Tuple[str, ...] = ()
+
+
+def version_key(version: str) -> Tuple:
+    """Sort key for versions: numeric release parts first, pre-releases before finals."""
+    release = re.match(r"\d+(?:\.\d+)*", version)
+    numbers = tuple(int(part) for part in release.group().split(".")) if release else ()
+    numbers += (0,) * (8 - len(numbers))
+    rest = version[release.end() if release else 0 :]
+    # "1.0" sorts after "1.0rc1" but before "1.0.post1"
+    suffix_rank = 1 if not rest else (2 if rest.lstrip(".").startswith("post") else 0)
+    return numbers, suffix_rank, rest
+
+
+def satisfies(version: str, clauses: Sequence[str]) -> bool:
+    """Return whether ``version`` meets every clause such as ``">=2.0"``.
+
+    ``==`` clauses may end in ``.*``; ``~=X.Y`` means ``>=X.Y`` within ``X``.
+    """
+    key = version_key(version)
+    for clause in clauses:
+        op = re.match(r"==|!=|>=|<=|~=|>|<", clause).group()
+        target = clause[len(op) :]
+        if target.endswith(".*"):
+            prefix = target[:-2].split(".")
+            matched = version.split(".")[: len(prefix)] == prefix
+            if matched != (op == "=="):
+                return False
+            continue
+        other = version_key(target)
+        if op == "~=":
+            release = target.split(".")[:-1] or [target]
+            if key < other or version.split(".")[: len(release)] != release:
+                return False
+        elif not {
+            "==": key == other,
+            "!=": key != other,
+            ">=": key >= other,
+            "<=": key <= other,
+            ">": key > other,
+            "<": key < other,
+        }[op]:
+            return False
+    return True
+
+
+def split_requirement(requirement: str) -> Tuple[str, List[str], Set[str], str]:
+    """Split ``"name[extra] (>=1.0); marker"`` into name, clauses, extras and marker."""
+    match = _REQUIRES_RE.match(requirement)
+    if match is None:
+        raise ValueError(f"Invalid requirement '{requirement}'")
+    name, clauses = parse_requirement(match["name"] + match["spec"])
+    extras = {normalize_name(e.strip()) for e in (match["extras"] or "").split(",") if e.strip()}
+    return name, clauses, extras, (match["marker"] or "").strip()
+
+
+def marker_environment(python_version: str) -> Dict[str, str]:
+    """Return the PEP 508 marker variables for ``python_version`` on this machine."""
+    release = python_version.split(".")
+    full_version = ".".join((release + ["0"])[:3])
+    return {
+        "python_version": ".".join(release[:2]),
+        "python_full_version": full_version,
+        "implementation_name": sys.implementation.name,
+        "implementation_version": full_version,
+        "platform_python_implementation": platform.python_implementation(),
+        "os_name": os.name,
+        "sys_platform": sys.platform,
+        "platform_system": platform.system(),
+        "platform_machine": platform.machine(),
+        "platform_release": platform.release(),
+        "extra": "",
+    }
+
+
+def evaluate_marker(marker: str, environment: Dict[str, str]) -> bool:
+    """Evaluate an environment marker such as ``python_version < "3.10"``."""
+    tokens: List[Tuple[str, str]] = []
+    marker = marker.strip()
+    position = 0
+    while position < len(marker):
+        match = _MARKER_TOKEN_RE.match(marker, position)
+        if match is None or match.end() == position:
+            raise ValueError(f"Invalid marker '{marker}'")
+        tokens.append((match.lastgroup or "", match[match.lastgroup or 0].strip()))
+        position = match.end()
+    tokens.reverse()
+
+    def take() -> Tuple[str, str]:
+        return tokens.pop() if tokens else ("", "")
+
+    def peek() -> Tuple[str, str]:
+        return tokens[-1] if tokens else ("", "")
+
+    def value() -> Tuple[str, bool]:
+        kind, text = take()
+        if kind == "string":
+            return text[1:-1], False
+        if kind == "word" and text in environment:
+            return environment[text], text in _VERSION_MARKERS
+        raise ValueError(f"Invalid marker '{marker}'")
+
+    def operator() -> str:
+        kind, text = take()
+        if kind == "op" and text not in "()":
+            return text
+        if (kind, text) == ("word", "in"):
+            return "in"
+        if (kind, text) == ("word", "not") and take() == ("word", "in"):
+            return "not in"
+        raise ValueError(f"Invalid marker '{marker}'")
+
+    def comparison() -> bool:
+        if peek() == ("op", "("):
+            take()
+            result = disjunction()
+            if take() != ("op", ")"):
+                raise ValueError(f"Invalid marker '{marker}'")
+            return result
+        (left, left_version), op, (right, right_version) = value(), operator(), value()
+        if op in ("in", "not in"):
+            return (left in right) == (op == "in")
+        if op == "===" or not (left_version or right_version) and op in ("==", "!="):
+            return (left == right) == (op != "!=")
+        return satisfies(left, [op + right])
+
+    def conjunction() -> bool:
+        result = comparison()
+        while peek() == ("word", "and"):
+            take()
+            result = comparison() and result
+        return result
+
+    def disjunction() -> bool:
+        result = conjunction()
+        while peek() == ("word", "or"):
+            take()
+            result = conjunction() or result
+        return result
+
+    result = disjunction()
+    if tokens:
+        raise ValueError(f"Invalid marker '{marker}'")
+    return result
+
+
+def _applies(marker: str, environment: Dict[str, str], extras: Set[str]) -> bool:
+    if not marker:
+        return True
+    return any(evaluate_marker(marker, dict(environment, extra=extra)) for extra in extras or {""})
+
+
+def site_packages(venv: Path) -> Path:
+    """Return the site-packages folder of a virtual environment."""
+    if os.name == "nt":
+        return venv / "Lib" / "site-packages"
+    found = sorted(venv.glob("lib/python*/site-packages"))
+    if not found:
+        raise FileNotFoundError(f"No site-packages in '{venv}'")
+    return found[-1]
+
+
+def compatible(tags: Sequence[str], python_version: str) -> bool:
+    """Return whether wheel ``tags`` (python, abi, platform) suit the interpreter."""
+    major, minor = python_version.split(".")[:2]
+    pythons = {f"py{major}", f"py{major}{minor}", f"cp{major}{minor}"}
+    abis = {"none", "abi3", f"cp{major}{minor}"}
+    platform = sysconfig.get_platform().replace("-", "_").replace(".", "_")
+    arch = platform.split("_", 1)[-1]
+    python, abi, platforms = tags
+    return (
+        any(tag in pythons for tag in python.split("."))
+        and any(tag in abis for tag in abi.split("."))
+        and any(
+            tag in ("any", platform)
+            or platform.startswith("linux")
+            and re.fullmatch(rf"(many|musl)linux(1|2010|2014|_\d+_\d+)_{arch}", tag) is not None
+            for tag in platforms.split(".")
+        )
+    )
+
+
+def _digest(path: Path) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def _requires_dist(path: Path) -> Tuple[str, ...]:
+    """Return the ``Requires-Dist`` lines of a wheel's METADATA."""
+    try:
+        with zipfile.ZipFile(path) as archive:
+            for name in archive.namelist():
+                if name.count("/") == 1 and name.endswith(".dist-info/METADATA"):
+                    text = archive.read(name).decode("utf-8", errors="replace")
+                    return tuple(HeaderParser().parsestr(text).get_all("Requires-Dist") or ())
+    except zipfile.BadZipFile:
+        pass
+    return ()
+
+
+def _wheel_from_json(data: list) -> Wheel:
+    return Wheel(*data[:4], tuple(data[4]), tuple(data[5]))
+
+
+class Wheelhouse:
+    """A directory of ``.whl`` files used as an offline package index."""
+
+    def __init__(
+        self,
+        directory: Path,
+        cache_dir: Optional[Path] = None,
+        max_workers: int = INSTALL_WORKERS,
+    ):
+        self.directory = Path(directory)
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+        self.max_workers = max_workers
+        self._index: Optional[Dict[str, List[Wheel]]] = None
+        self._lock = threading.Lock()
+
+    # --- index -----------------------------------------------------------
+    def _index_path(self) -> Path:
+        key = hashlib.sha256(str(self.directory.resolve()).encode()).hexdigest()[:16]
+        return self.cache_dir / "wheelhouse" / f"{key}.json"
+
+    def index(self) -> Dict[str, List[Wheel]]:
+        """Return ``{normalized name: [Wheel, ...]}``, newest version first.
+
+        Built once per directory state: the stored index is reused as long
+        as every wheel file keeps its size and mtime, and only added or
+        changed files are read again.
+        """
+        with self._lock:
+            if self._index is None:
+                self._index = self._load_index()
+            return self._index
+
+    def _load_index(self) -> Dict[str, List[Wheel]]:
+        files: Dict[str, List[int]] = {}
+        for entry in os.scandir(self.directory):
+            if _WHEEL_RE.match(entry.name) and entry.is_file():
+                stat = entry.stat()
+                files[entry.name] = [stat.st_size, stat.st_mtime_ns]
+        path = self._index_path()
+        stored: Dict[str, List[int]] = {}
+        previous: Dict[str, Wheel] = {}
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if data["version"] == INDEX_VERSION:
+                stored = data["files"]
+                previous = {
+                    w[2]: _wheel_from_json(w) for wheels in data["wheels"].values() for w in wheels
+                }
+                if stored == files:
+                    return {
+                        name: [_wheel_from_json(w) for w in wheels]
+                        for name, wheels in data["wheels"].items()
+                    }
+        except (OSError, ValueError, KeyError, TypeError, IndexError):
+            stored, previous = {}, {}
+
+        index: Dict[str, List[Wheel]] = {}
+        for filename in sorted(files):
+            wheel = previous.get(filename)
+            if wheel is None or stored.get(filename) != files[filename]:
+                match = _WHEEL_RE.match(filename)
+                wheel = Wheel(
+                    normalize_name(match["name"]),
+                    match["version"],
+                    filename,
+                    _digest(self.directory / filename),
+                    (match["python"], match["abi"], match["platform"]),
+                    _requires_dist(self.directory / filename),
+                )
+            index.setdefault(wheel.name, []).append(wheel)
+        for wheels in index.values():
+            wheels.sort(key=lambda w: version_key(w.version), reverse=True)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".tmp-{os.getpid()}")
+        tmp.write_text(
+            json.dumps({"version": INDEX_VERSION, "files": files, "wheels": index}),
+            encoding="utf-8",
+        )
+        os.replace(tmp, path)
+        return index
+
+    def find(self, requirement: str, python_version: Optional[str] = None) -> Wheel:
+        """Return the newest compatible wheel for a requirement like ``"name>=1.2"``."""
+        name, clauses = parse_requirement(requirement)
+        python_version = python_version or f"{sys.version_info[0]}.{sys.version_info[1]}"
+        for wheel in self.index().get(normalize_name(name), []):
+            if satisfies(wheel.version, clauses) and compatible(wheel.tags, python_version):
+                return wheel
+        raise LookupError(f"No wheel for '{requirement}' in '{self.directory}'")
+
+    def resolve(self, packages: Sequence[str], python_version: Optional[str] = None) -> List[Wheel]:
+        """Return the wheels for ``packages`` and everything they require.
+
+        Dependencies come from each wheel's ``Requires-Dist`` metadata, with
+        environment markers evaluated for ``python_version`` on this machine.
+        Clauses on the same project are combined and the newest wheel meeting
+        all of them is used; there is no backtracking beyond that.
+        """
+        python_version = python_version or f"{sys.version_info[0]}.{sys.version_info[1]}"
+        environment = marker_environment(python_version)
+        wanted: Dict[str, List[str]] = {}
+        extras: Dict[str, Set[str]] = {}
+        chosen: Dict[str, Wheel] = {}
+        queue = deque(packages)
+        while queue:
+            name, clauses, requested, marker = split_requirement(queue.popleft())
+            if not _applies(marker, environment, set()):
+                continue
+            key = normalize_name(name)
+            entry = wanted.setdefault(key, [name])
+            entry.extend(c for c in clauses if c not in entry[1:])
+            added = requested - extras.setdefault(key, set())
+            extras[key] |= added
+            wheel = chosen.get(key)
+            if wheel is not None and not added and satisfies(wheel.version, entry[1:]):
+                continue
+            wheel = self.find(entry[0] + ",".join(entry[1:]), python_version)
+            chosen[key] = wheel
+            for line in wheel.requires:
+                dependency, _, dependency_marker = line.partition(";")
+                if _applies(dependency_marker.strip(), environment, extras[key]):
+                    queue.append(dependency)
+        return list(chosen.values())
+
+    # --- install ---------------------------------------------------------
+    def unpacked(self, wheel: Wheel) -> Path:
+        """Return the cache folder holding ``wheel`` unpacked, extracting it once."""
+        target = self.cache_dir / "wheels" / wheel.digest[:32]
+        if target.is_dir():
+            return target
+        tmp = target.with_name(f"{target.name}.tmp-{os.getpid()}-{threading.get_ident()}")
+        shutil.rmtree(tmp, ignore_errors=True)
+        try:
+            with zipfile.ZipFile(self.directory / wheel.filename) as archive:
+                archive.extractall(tmp)
+            try:
+                os.rename(tmp, target)
+            except OSError:
+                # unpacked concurrently by another worker or process
+                if not target.is_dir():
+                    raise
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        return target
+
+    def install(self, venv: Path, packages: Sequence[str]) -> List[Wheel]:
+        """Install ``packages`` into ``venv`` from this wheelhouse.
+
+        Usable as the ``installer`` of ``VirtualEnvironmentManager``.
+        Dependencies are installed too (see ``resolve``). All requirements
+        are looked up before anything is written, so a missing wheel fails
+        without touching the environment.
+        """
+        venv = Path(venv)
+        wheels = self.resolve(packages, _venv_version(venv))
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as pool:
+            list(pool.map(lambda wheel: self._install_wheel(venv, wheel), wheels))
+        return wheels
+
+    def _install_wheel(self, venv: Path, wheel: Wheel) -> None:
+        source = self.unpacked(wheel)
+        purelib = site_packages(venv)
+        for entry in os.scandir(source):
+            if entry.is_dir() and entry.name.endswith(".data"):
+                for scheme in os.scandir(entry.path):
+                    _install_scheme(Path(scheme.path), scheme.name, venv, purelib, wheel.name)
+            else:
+                _link(Path(entry.path), purelib / entry.name)
+        for dist_info in source.glob("*.dist-info"):
+            dist_info = purelib / dist_info.name
+            _replace_file(dist_info / "INSTALLER", b"lokal\n")
+            _write_launchers(dist_info / "entry_points.txt", venv)
+
+
+def _venv_version(venv: Path) -> str:
+    try:
+        for line in (venv / "pyvenv.cfg").read_text(encoding="utf-8").splitlines():
+            key, _, value = line.partition("=")
+            if key.strip() in ("version", "version_info"):
+                return value.strip()
+    except OSError:
+        pass
+    return f"{sys.version_info[0]}.{sys.version_info[1]}"
+
+
+def _link(src: Path, dst: Path) -> None:
+    """Recreate ``src`` at ``dst``, sharing file content with the cache."""
+    if src.is_dir():
+        dst.mkdir(parents=True, exist_ok=True)
+        for entry in os.scandir(src):
+            _link(Path(entry.path), dst / entry.name)
+        return
+    dst.unlink(missing_ok=True)
+    clone_file(src, dst)
+
+
+def _replace_file(path: Path, data: bytes, mode: Optional[int] = None) -> None:
+    # never write through a hardlink into the shared cache
+    path.unlink(missing_ok=True)
+    path.write_bytes(data)
+    if mode is not None:
+        path.chmod(mode)
+
+
+def _install_scheme(src: Path, scheme: str, venv: Path, purelib: Path, name: str) -> None:
+    if scheme in ("purelib", "platlib"):
+        _link(src, purelib)
+    elif scheme == "data":
+        _link(src, venv)
+    elif scheme == "headers":
+        _link(src, venv / "include" / "site" / name)
+    elif scheme == "scripts":
+        scripts = venv_python(venv).parent
+        python = str(venv_python(venv)).encode()
+        for entry in os.scandir(src):
+            data = Path(entry.path).read_bytes()
+            if data.startswith(b"#!python"):
+                data = b"#!" + python + data[len(b"#!python") :]
+            _replace_file(scripts / entry.name, data, 0o755)
+
+
+def _write_launchers(entry_points: Path, venv: Path) -> None:
+    """Create ``console_scripts``/``gui_scripts`` launchers in the venv."""
+    if not entry_points.is_file():
+        return
+    parser = configparser.ConfigParser(delimiters=("=",), interpolation=None)
+    parser.optionxform = str  # keep script names as written
+    parser.read(entry_points, encoding="utf-8")
+    scripts = venv_python(venv).parent
+    for section in ("console_scripts", "gui_scripts"):
+        if not parser.has_section(section):
+            continue
+        for script, target in parser.items(section):
+            module, _, attr = target.split("[")[0].strip().partition(":")
+            func = attr.strip() or "main"
+            data = _LAUNCHER.format(
+                python=venv_python(venv), module=module.strip(), attr=func.split(".")[0], func=func
+            )
+            _replace_file(scripts / script, data.encode(), 0o755)
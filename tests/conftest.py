@@ -1,4 +1,34 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.template_service import TemplateService  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache(tmp_path_factory, monkeypatch):
+    """Keep caches written by the code under test out of the user's home."""
+    monkeypatch.setenv("LOKAL_CACHE_DIR", str(tmp_path_factory.getbasetemp() / "lokal-cache"))
+
+
+@pytest.fixture
+def make_service(tmp_path):
+    """Return a factory for a ``TemplateService`` over ``tmp_path / "templates"``.
+
+    ``make_service(name, files, pattern, text, extra)`` writes ``files``
+    files named ``pattern.format(i)`` plus the paths in ``extra`` into
+    template ``name``, all with ``text``.
+    """
+
+    def make(name, files, pattern, text="", extra=()):
+        templates_dir = tmp_path / "templates"
+        for rel in [pattern.format(i) for i in range(files)] + list(extra):
+            path = templates_dir / name / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(text)
+        return TemplateService(templates_dir)
+
+    return make
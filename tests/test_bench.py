@@ -0,0 +1,63 @@
+"""Tests for the synthetic benchmark suite."""
+
+import json
+
+from click.testing import CliRunner
+
+from src.bench import file_sizes, make_synthetic_template, percentile, run_benchmarks
+from src.cli import cli
+from src.template_service import TemplateService
+
+
+def test_file_sizes_respect_bounds():
+    sizes = file_sizes(200, 100, 10_000, "log-uniform")
+    assert len(sizes) == 200
+    assert all(100 <= s <= 10_000 for s in sizes)
+    assert file_sizes(3, 1, 5, "fixed") == [5, 5, 5]
+    assert sizes == file_sizes(200, 100, 10_000, "log-uniform")
+
+
+def test_make_synthetic_template(tmp_path):
+    files, total = make_synthetic_template(tmp_path / "tpl", [10, 70_000, 0], depth=2)
+    written = [p for p in (tmp_path / "tpl").rglob("*") if p.is_file()]
+    assert files == 3
+    assert total == 70_010
+    assert sum(p.stat().st_size for p in written) == total
+    assert all(len(p.relative_to(tmp_path / "tpl").parts) == 3 for p in written)
+
+
+def test_percentile():
+    assert percentile([5, 1, 3, 2, 4], 50) == 3
+    assert percentile([float(i) for i in range(1, 101)], 95) == 95
+
+
+def test_run_benchmarks(tmp_path):
+    results = run_benchmarks(files=20, warmup=0, repeat=2, work_dir=tmp_path)
+    assert [r["operation"] for r in results] == ["list", "preview", "import-template", "generate"]
+    for record in results:
+        assert record["runs"] == 2
+        assert record["files"] == 20
+        assert record["p95_ms"] >= record["median_ms"] > 0
+    assert results[-1]["mb_per_s"] > 0
+
+
+def test_list_case_times_the_service_call(tmp_path, monkeypatch):
+    calls = []
+    original = TemplateService.count_entries
+    monkeypatch.setattr(
+        TemplateService,
+        "count_entries",
+        lambda self, name: calls.append(name) or original(self, name),
+    )
+    run_benchmarks(files=5, warmup=0, repeat=2, operations=["list"], work_dir=tmp_path)
+    assert calls == ["synthetic", "synthetic"]
+
+
+def test_bench_command_json():
+    result = CliRunner().invoke(
+        cli,
+        ["bench", "--files", "10", "--repeat", "1", "--operation", "preview", "--format", "json"],
+    )
+    assert result.exit_code == 0
+    records = json.loads(result.output)
+    assert records[0]["operation"] == "preview"
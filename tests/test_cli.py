@@ -1,9 +1,10 @@
 """Tests for the CLI module."""
 
+import json
 import pytest
 from pathlib import Path
 from click.testing import CliRunner
-from src.cli import cli
+from src.cli import PREVIEW_MAX_ENTRIES, cli
 import shutil
 import tempfile
 
@@ -175,6 +176,23 @@ def test_import_template_duplicate(runner, temp_templates):
     assert "already exists" in result.output.lower()
 
 
+def test_import_template_update(runner, temp_templates):
+    """Test re-importing a changed template with --update."""
+    temp_dir, templates_dir = temp_templates
+    import_src = temp_dir / "import_src"
+    import_src.mkdir()
+    (import_src / "main.py").write_text("print('hello')")
+    args = ["import-template", "--source", str(import_src), "--templates-dir", str(templates_dir)]
+    assert runner.invoke(cli, args).exit_code == 0
+
+    (import_src / "extra.py").write_text("# extra")
+    result = runner.invoke(cli, args + ["--update"])
+
+    assert result.exit_code == 0
+    assert "1 copied, 0 removed, 1 unchanged" in result.output
+    assert (templates_dir / "import_src" / "extra.py").exists()
+
+
 def test_preview_command_success(runner, temp_templates):
     """Test preview command."""
     temp_dir, templates_dir = temp_templates
@@ -198,3 +216,174 @@ def test_preview_nonexistent_template(runner, temp_templates):
 
     assert result.exit_code != 0
     assert "not found" in result.output.lower()
+
+
+def test_list_ndjson(runner, temp_templates):
+    """Test machine-readable template listing."""
+    temp_dir, templates_dir = temp_templates
+
+    result = runner.invoke(
+        cli, ["list", "--templates-dir", str(templates_dir), "--format", "ndjson"]
+    )
+
+    assert result.exit_code == 0
+    assert [json.loads(line) for line in result.output.splitlines()] == [
+        {"name": "sample", "files": 2}
+    ]
+
+
+def test_preview_json(runner, temp_templates):
+    """Test preview emits one record per tree entry."""
+    temp_dir, templates_dir = temp_templates
+
+    result = runner.invoke(
+        cli,
+        ["preview", "-t", "sample", "--templates-dir", str(templates_dir), "--format", "json"],
+    )
+
+    assert result.exit_code == 0
+    records = json.loads(result.output)
+    assert {"path": "README.md", "type": "file", "depth": 0} in records
+    assert len(records) == 2
+
+
+def test_generate_ndjson_streams_file_events(runner, temp_templates):
+    """Test generate reports per-file events and a final summary."""
+    temp_dir, templates_dir = temp_templates
+    output_dir = temp_dir / "streamed"
+
+    result = runner.invoke(
+        cli,
+        [
+            "generate",
+            "-t",
+            "sample",
+            "-o",
+            str(output_dir),
+            "--templates-dir",
+            str(templates_dir),
+            "--format",
+            "ndjson",
+        ],
+    )
+
+    assert result.exit_code == 0
+    events = [json.loads(line) for line in result.output.splitlines()]
+    assert sorted(e["path"] for e in events if e["event"] == "file") == [
+        "README.md",
+        "config.json",
+    ]
+    assert events[-1]["event"] == "done"
+    assert (output_dir / "config.json").exists()
+
+
+def test_preview_bounded(runner, temp_templates):
+    """Test preview stops at --max-entries and reports the rest."""
+    temp_dir, templates_dir = temp_templates
+    many = templates_dir / "many"
+    (many / "sub").mkdir(parents=True)
+    for i in range(20):
+        (many / f"file_{i:02d}.txt").write_text("x")
+    (many / "sub" / "nested.txt").write_text("x")
+
+    result = runner.invoke(
+        cli,
+        [
+            "preview",
+            "-t",
+            "many",
+            "--templates-dir",
+            str(templates_dir),
+            "--max-entries",
+            "5",
+            "--depth",
+            "1",
+        ],
+    )
+
+    assert result.exit_code == 0
+    assert "file_04.txt" in result.output
+    assert "file_05.txt" not in result.output
+    assert "+16 more entries" in result.output
+    assert "nested.txt" not in result.output
+
+    result = runner.invoke(
+        cli,
+        ["preview", "-t", "many", "--templates-dir", str(templates_dir), "--depth", "1"],
+    )
+    assert result.exit_code == 0
+    # within the default limit; the folder closed by --depth is marked
+    assert "file_19.txt" in result.output
+    assert "more entries" not in result.output
+    assert "📁 sub/ … (--depth)" in result.output
+
+    for i in range(20, 250):
+        (many / f"file_{i:03d}.txt").write_text("x")
+    result = runner.invoke(
+        cli,
+        ["preview", "-t", "many", "--templates-dir", str(templates_dir), "--format", "ndjson"],
+        env={"LOKAL_NO_DAEMON": "1"},
+    )
+    records = [json.loads(line) for line in result.output.splitlines()]
+    assert len(records) == PREVIEW_MAX_ENTRIES + 1
+    assert records[-1] == {"type": "more", "count": 252 - PREVIEW_MAX_ENTRIES, "exact": True}
+
+    result = runner.invoke(
+        cli,
+        [
+            "preview",
+            "-t",
+            "many",
+            "--templates-dir",
+            str(templates_dir),
+            "--format",
+            "ndjson",
+            "--max-entries",
+            "0",
+        ],
+        env={"LOKAL_NO_DAEMON": "1"},
+    )
+    records = [json.loads(line) for line in result.output.splitlines()]
+    assert len(records) == 252
+
+    result = runner.invoke(
+        cli,
+        ["preview", "-t", "many", "--templates-dir", str(templates_dir), "--path", "sub"],
+    )
+    assert result.exit_code == 0
+    assert "nested.txt" in result.output
+    assert "file_00.txt" not in result.output
+
+
+def test_generate_with_env_ndjson(runner, temp_templates, monkeypatch):
+    """Generate a project and its .venv in one combined stream."""
+    temp_dir, templates_dir = temp_templates
+    monkeypatch.setenv("LOKAL_NO_DAEMON", "1")
+    wheels = temp_dir / "wheels"
+    wheels.mkdir()
+    output_dir = temp_dir / "with_env"
+
+    result = runner.invoke(
+        cli,
+        [
+            "generate",
+            "-t",
+            "sample",
+            "-o",
+            str(output_dir),
+            "--templates-dir",
+            str(templates_dir),
+            "--with-env",
+            "--wheelhouse",
+            str(wheels),
+            "--format",
+            "ndjson",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    records = [json.loads(line) for line in result.output.splitlines()]
+    assert {r["event"] for r in records} >= {"file", "env", "done"}
+    assert records[-1]["env"] == str(output_dir / ".venv")
+    assert (output_dir / ".venv" / "pyvenv.cfg").is_file()
+    assert (output_dir / "README.md").is_file()
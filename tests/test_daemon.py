@@ -0,0 +1,153 @@
+"""Tests for the warm ``lokal serve`` daemon."""
+
+import socket
+import threading
+import time
+
+import pytest
+from click.testing import CliRunner
+
+from src import cli as cli_module
+from src import daemon
+from src.cli import cli
+
+
+@pytest.fixture
+def templates_dir(tmp_path):
+    templates = tmp_path / "templates"
+    (templates / "sample" / "sub").mkdir(parents=True)
+    (templates / "sample" / "README.md").write_text("# Sample")
+    (templates / "sample" / "sub" / "main.py").write_text("print('hi')")
+    return templates
+
+
+@pytest.fixture
+def running_daemon(tmp_path, monkeypatch):
+    """Start a daemon on a temporary socket and stop it afterwards."""
+    socket_path = tmp_path / "lokal.sock"
+    monkeypatch.setenv(daemon.SOCKET_ENV, str(socket_path))
+    monkeypatch.delenv(daemon.NO_DAEMON_ENV, raising=False)
+    server = daemon.TemplateDaemon(workers=2)
+    thread = threading.Thread(target=server.serve_forever, args=(socket_path,), daemon=True)
+    thread.start()
+    for _ in range(100):
+        if daemon.is_running(socket_path):
+            break
+        time.sleep(0.02)
+    yield server, socket_path
+    daemon.request("shutdown", path=socket_path)
+    thread.join(timeout=5)
+
+
+def test_request_without_daemon(tmp_path):
+    with pytest.raises(daemon.DaemonUnavailable):
+        daemon.request("ping", path=tmp_path / "missing.sock")
+    assert daemon.forward("ping", {}, path=tmp_path / "missing.sock") == (False, None)
+
+
+def test_list_and_preview(running_daemon, templates_dir):
+    _, socket_path = running_daemon
+    records = daemon.request("list", {"templates_dir": str(templates_dir)}, path=socket_path)
+    assert records == [{"name": "sample", "files": 2}]
+
+    structure = daemon.request(
+        "preview", {"templates_dir": str(templates_dir), "template": "sample"}, path=socket_path
+    )
+    assert structure == {"sample": {"README.md": None, "sub": {"main.py": None}}}
+
+
+def test_generate_streams_events(running_daemon, templates_dir, tmp_path):
+    _, socket_path = running_daemon
+    events = []
+    summary = daemon.request(
+        "generate",
+        {
+            "templates_dir": str(templates_dir),
+            "template": "sample",
+            "output": str(tmp_path / "out"),
+            "stream": True,
+        },
+        path=socket_path,
+        on_event=events.append,
+    )
+    assert summary["files"] == 2
+    assert {e["path"] for e in events if e["event"] == "file"} == {"README.md", "sub/main.py"}
+    assert (tmp_path / "out" / "sub" / "main.py").read_text() == "print('hi')"
+
+
+def test_remote_error_is_reported(running_daemon, templates_dir, tmp_path):
+    _, socket_path = running_daemon
+    (tmp_path / "out").mkdir()
+    with pytest.raises(daemon.DaemonError) as excinfo:
+        daemon.request(
+            "generate",
+            {
+                "templates_dir": str(templates_dir),
+                "template": "sample",
+                "output": str(tmp_path / "out"),
+            },
+            path=socket_path,
+        )
+    assert excinfo.value.error_type == "FileExistsError"
+
+
+def test_cli_forwards_to_daemon(running_daemon, templates_dir, monkeypatch):
+    server, _ = running_daemon
+    calls = []
+    original = server.list_templates
+    monkeypatch.setattr(server, "list_templates", lambda d: calls.append(d) or original(d))
+
+    result = CliRunner().invoke(cli, ["list", "--templates-dir", str(templates_dir)])
+    assert result.exit_code == 0
+    assert "sample" in result.output
+    assert calls == [str(templates_dir.resolve())]
+
+
+def test_preview_streams_entries(running_daemon, templates_dir):
+    _, socket_path = running_daemon
+    records = []
+    result = daemon.request(
+        "preview",
+        {"templates_dir": str(templates_dir), "template": "sample", "stream": True},
+        path=socket_path,
+        on_event=records.append,
+    )
+    assert result == {"entries": 3, "more": 0}
+    assert [r["path"] for r in records] == ["README.md", "sub", "sub/main.py"]
+
+
+def test_list_recounts_after_nested_change(running_daemon, templates_dir):
+    server, _ = running_daemon
+    assert server.list_templates(str(templates_dir)) == [{"name": "sample", "files": 2}]
+    # only sub/ changes; the template's top-level folder keeps its mtime
+    (templates_dir / "sample" / "sub" / "extra.py").write_text("")
+    assert server.list_templates(str(templates_dir)) == [{"name": "sample", "files": 3}]
+
+
+def test_unresponsive_daemon_falls_back(tmp_path):
+    socket_path = tmp_path / "stuck.sock"
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(str(socket_path))
+    listener.listen(1)
+    try:
+        start = time.perf_counter()
+        assert daemon.forward("ping", {}, path=socket_path, timeout=0.2) == (False, None)
+        assert time.perf_counter() - start < 2
+    finally:
+        listener.close()
+
+
+def test_cli_forwards_generate_before_loading_service(
+    running_daemon, templates_dir, tmp_path, monkeypatch
+):
+    def no_service(templates_dir):
+        raise AssertionError("TemplateService built in the CLI process")
+
+    monkeypatch.setattr(cli_module, "_service", no_service)
+    output = tmp_path / "forwarded"
+    result = CliRunner().invoke(
+        cli,
+        ["generate", "-t", "sample", "-o", str(output), "--templates-dir", str(templates_dir)],
+    )
+    assert result.exit_code == 0, result.output
+    assert (output / "sub" / "main.py").read_text() == "print('hi')"
@@ -1,6 +1,21 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
 from src.dependency_management import (
+    BASE_MARKER,
+    DEFAULT_SETS_FILE,
     VirtualEnvironmentManager,
     DependencyManager,
+    clone_file,
+    default_cache_dir,
+    venv_python,
 )
 
 
@@ -15,3 +30,189 @@ def test_dependency_resolution():
     result = dep.resolve(["core", "dev"])
     assert "requests" in result
     assert "pytest" in result
+
+
+def test_default_sets_come_from_the_shipped_file_with_a_lockfile():
+    dep = DependencyManager()
+    assert dep.sets_file == DEFAULT_SETS_FILE
+    assert dep.available_sets() == ["core", "gui", "dev"]
+    assert dep.lockfile == default_cache_dir() / "dependency_sets.lock"
+    dep.resolve(["dev"])
+    lock = json.loads(dep.lockfile.read_text())
+    assert lock["selections"]["dev"] == ["pytest"]
+
+
+def _fake_installer(calls):
+    def install(venv, packages):
+        calls.append(list(packages))
+        site = next(venv.glob("lib*/python*/site-packages"), None) or venv / "Lib" / "site-packages"
+        (site / "fake_pkg.py").write_text("VALUE = 42\n")
+
+    return install
+
+
+def _manager(tmp_path, calls):
+    return VirtualEnvironmentManager(
+        cache_dir=tmp_path / "cache", installer=_fake_installer(calls), with_pip=False
+    )
+
+
+def _current_version():
+    return f"{sys.version_info[0]}.{sys.version_info[1]}"
+
+
+def test_create_environment_clones_cached_base(tmp_path):
+    calls = []
+    manager = _manager(tmp_path, calls)
+    first = list(manager.create_environment(tmp_path / "a", _current_version(), ["pkg"]))
+    second = list(manager.create_environment(tmp_path / "b", _current_version(), ["pkg"]))
+
+    assert calls == [["pkg"]]
+    assert first[-1] == second[-1] == 100
+    assert first == sorted(first) and second == sorted(second)
+    for name in ("a", "b"):
+        env = tmp_path / name
+        out = subprocess.run(
+            [
+                str(venv_python(env)),
+                "-c",
+                "import sys, fake_pkg; print(sys.prefix, fake_pkg.VALUE)",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.split()
+        assert Path(out[0]) == env.resolve() and out[1] == "42"
+        assert str(env.resolve()) in (env / "pyvenv.cfg").read_text()
+        if os.name != "nt":
+            assert str(env.resolve()) in (env / "bin" / "activate").read_text()
+
+
+def test_clone_rewrites_only_text_scripts(tmp_path):
+    def installer(venv, packages):
+        scripts = venv_python(venv).parent
+        (scripts / "tool").write_bytes(b"#!" + str(venv).encode() + b"/bin/python\n")
+        (scripts / "native").write_bytes(b"\x7fELF\x00" + str(venv).encode() + b"\x00")
+
+    manager = VirtualEnvironmentManager(
+        cache_dir=tmp_path / "cache", installer=installer, with_pip=False
+    )
+    list(manager.create_environment(tmp_path / "env", _current_version(), ["pkg"]))
+
+    base = next(p.parent for p in (tmp_path / "cache").rglob(BASE_MARKER))
+    scripts = venv_python(tmp_path / "env").parent
+    assert str((tmp_path / "env").resolve()).encode() in (scripts / "tool").read_bytes()
+    assert (scripts / "native").read_bytes() == (venv_python(base).parent / "native").read_bytes()
+
+
+def test_concurrent_builds_use_separate_staging(tmp_path):
+    calls = []
+    barrier = threading.Barrier(2, timeout=30)
+    install = _fake_installer(calls)
+
+    def installer(venv, packages):
+        barrier.wait()
+        install(venv, packages)
+        calls.append(str(venv))
+
+    manager = VirtualEnvironmentManager(
+        cache_dir=tmp_path / "cache", installer=installer, with_pip=False
+    )
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        results = list(
+            pool.map(
+                lambda name: list(
+                    manager.create_environment(tmp_path / name, _current_version(), ["pkg"])
+                ),
+                ["a", "b"],
+            )
+        )
+
+    assert [steps[-1] for steps in results] == [100, 100]
+    staging = [call for call in calls if isinstance(call, str)]
+    assert len(set(staging)) == 2
+    for name in ("a", "b"):
+        site = next((tmp_path / name).glob("lib*/python*/site-packages"), None)
+        assert site is None or (site / "fake_pkg.py").is_file()
+    assert [p.name for p in (tmp_path / "cache").rglob("*.building-*")] == []
+
+
+def test_create_environment_refuses_existing_path(tmp_path):
+    (tmp_path / "env").mkdir()
+    manager = _manager(tmp_path, [])
+    with pytest.raises(FileExistsError):
+        list(manager.create_environment(tmp_path / "env", _current_version(), []))
+
+
+def test_closing_early_removes_partial_environment(tmp_path):
+    manager = _manager(tmp_path, [])
+    list(manager.create_environment(tmp_path / "a", _current_version(), []))
+    steps = manager.create_environment(tmp_path / "b", _current_version(), [])
+    next(steps)
+    next(steps)
+    steps.close()
+    assert not (tmp_path / "b").exists()
+    assert (tmp_path / "a").exists()
+
+
+def test_clone_file_shares_content(tmp_path):
+    src = tmp_path / "src.txt"
+    src.write_text("data")
+    assert clone_file(src, tmp_path / "dst.txt") in ("reflink", "hardlink", "copy")
+    assert (tmp_path / "dst.txt").read_text() == "data"
+
+
+def _sets_file(tmp_path, sets):
+    path = tmp_path / "sets.json"
+    path.write_text(json.dumps({"sets": sets}))
+    return path
+
+
+def test_resolver_merges_includes_and_pins(tmp_path):
+    path = _sets_file(
+        tmp_path,
+        {
+            "core": {"packages": ["requests>=2", "Click"]},
+            "gui": {"include": ["core"], "packages": ["tkinterdnd2==0.3.0"]},
+            "dev": {"include": ["core"], "packages": ["pytest>=7,<9", "requests<3"]},
+        },
+    )
+    dep = DependencyManager(path)
+    assert dep.available_sets() == ["core", "gui", "dev"]
+    assert dep.resolve(["gui", "dev"]) == [
+        "Click",
+        "pytest<9,>=7",
+        "requests<3,>=2",
+        "tkinterdnd2==0.3.0",
+    ]
+    assert dep.resolve(["dev", "gui"]) == dep.resolve(["gui", "dev"])
+
+
+def test_resolver_reports_cycles_and_conflicts(tmp_path):
+    cyclic = _sets_file(
+        tmp_path, {"a": {"include": ["b"]}, "b": {"include": ["c"]}, "c": {"include": ["a"]}}
+    )
+    with pytest.raises(ValueError, match="a -> b -> c -> a"):
+        DependencyManager(cyclic, lockfile=tmp_path / "none.lock").resolve(["a"])
+
+    conflict = _sets_file(
+        tmp_path, {"a": {"packages": ["x==1"]}, "b": {"include": ["a"], "packages": ["x==2"]}}
+    )
+    with pytest.raises(ValueError, match="Conflicting pins"):
+        DependencyManager(conflict).resolve(["b"])
+    with pytest.raises(ValueError, match="Unknown"):
+        DependencyManager(conflict).resolve(["missing"])
+
+
+def test_lockfile_skips_resolution(tmp_path, monkeypatch):
+    path = _sets_file(tmp_path, {"core": {"packages": ["requests"]}})
+    first = DependencyManager(path).resolve(["core"])
+    assert path.with_suffix(".lock").is_file()
+
+    second = DependencyManager(path)
+    monkeypatch.setattr(second, "_expand", lambda *args: pytest.fail("resolved again"))
+    assert second.resolve(["core"]) == first
+
+    # editing the set file invalidates the lock
+    path.write_text(json.dumps({"sets": {"core": {"packages": ["requests==2.31.0"]}}}))
+    assert DependencyManager(path).resolve(["core"]) == ["requests==2.31.0"]
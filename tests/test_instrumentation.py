@@ -0,0 +1,96 @@
+"""Tests for instrumentation hooks and the OpenMetrics collector."""
+
+import pytest
+from click.testing import CliRunner
+
+from src.cli import cli
+from src.instrumentation import GenerationHook, MetricsCollector
+from src.template_service import TemplateService
+
+
+class RecordingHook(GenerationHook):
+    def __init__(self):
+        self.calls = []
+
+    def on_phase_start(self, operation, phase, **info):
+        self.calls.append(("start", operation, phase))
+
+    def on_phase_end(self, operation, phase, seconds, **info):
+        self.calls.append(("end", operation, phase))
+
+    def on_file_done(self, operation, path, nbytes, cached=False):
+        self.calls.append(("file", operation, path, nbytes))
+
+    def on_error(self, operation, error):
+        self.calls.append(("error", operation, type(error).__name__))
+
+
+@pytest.fixture
+def templates_dir(tmp_path):
+    templates = tmp_path / "templates"
+    (templates / "foo" / "sub").mkdir(parents=True)
+    (templates / "foo" / "sub" / "a.txt").write_text("abc")
+    (templates / "foo" / "b.txt").write_text("de")
+    return templates
+
+
+def test_generate_calls_hooks(templates_dir, tmp_path):
+    hook = RecordingHook()
+    service = TemplateService(templates_dir, hooks=[hook])
+    list(service.generate_project("foo", tmp_path / "out"))
+
+    assert hook.calls[0] == ("start", "generate", "total")
+    assert hook.calls[-1] == ("end", "generate", "total")
+    files = sorted(c[2:] for c in hook.calls if c[0] == "file")
+    assert files == [("b.txt", 2), ("sub/a.txt", 3)]
+    assert ("end", "generate", "verify") in hook.calls
+
+
+def test_import_and_error_hooks(templates_dir, tmp_path):
+    hook = RecordingHook()
+    service = TemplateService(tmp_path / "imported", hooks=[hook])
+    service.import_template(templates_dir / "foo")
+    assert ("file", "import", "sub/a.txt", 3) in hook.calls
+
+    with pytest.raises(FileExistsError):
+        service.import_template(templates_dir / "foo")
+    assert hook.calls[-1] == ("error", "import", "FileExistsError")
+
+
+def test_metrics_collector_renders_openmetrics(templates_dir, tmp_path):
+    collector = MetricsCollector()
+    service = TemplateService(templates_dir, hooks=[collector])
+    list(service.generate_project("foo", tmp_path / "out"))
+    collector.on_file_done("import", "x", 0, cached=True)
+
+    assert collector.counter("files", "generate") == 2
+    assert collector.counter("bytes", "generate") == 5
+    assert collector.counter("cache_hits", "import") == 1
+    text = collector.render()
+    assert 'lokal_files_total{operation="generate"} 2' in text
+    assert 'lokal_operation_duration_seconds_count{operation="generate"} 1' in text
+    assert (
+        'lokal_phase_duration_seconds_bucket{operation="generate",phase="copy",le="+Inf"}' in text
+    )
+    assert text.endswith("# EOF\n")
+    assert "# TYPE lokal_files_total counter" in collector.render(openmetrics=False)
+
+
+def test_cli_metrics_file(templates_dir, tmp_path):
+    metrics = tmp_path / "lokal.prom"
+    result = CliRunner().invoke(
+        cli,
+        [
+            "--metrics-file",
+            str(metrics),
+            "generate",
+            "-t",
+            "foo",
+            "-o",
+            str(tmp_path / "out"),
+            "--templates-dir",
+            str(templates_dir),
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert 'lokal_bytes_total{operation="generate"} 5' in metrics.read_text()
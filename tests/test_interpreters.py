@@ -0,0 +1,60 @@
+import os
+import sys
+
+from src.interpreters import candidate_paths, discover
+
+
+def _exe(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("#!/bin/sh\n")
+    path.chmod(0o755)
+    return path
+
+
+def test_candidate_paths_searches_path_pyenv_and_asdf(tmp_path):
+    bin_dir = tmp_path / "bin"
+    _exe(bin_dir / "python3.12")
+    _exe(bin_dir / "python3-config")
+    os.symlink(bin_dir / "python3.12", bin_dir / "python3")
+    _exe(tmp_path / "pyenv" / "shims" / "python3.10")
+    _exe(tmp_path / "pyenv" / "versions" / "3.10.4" / "bin" / "python3.10")
+    _exe(tmp_path / "asdf" / "installs" / "python" / "3.9.1" / "bin" / "python")
+    env = {
+        "PATH": os.pathsep.join([str(bin_dir), str(tmp_path / "pyenv" / "shims")]),
+        "PYENV_ROOT": str(tmp_path / "pyenv"),
+        "ASDF_DATA_DIR": str(tmp_path / "asdf"),
+    }
+    found = [p for p in candidate_paths(env) if p.startswith(str(tmp_path))]
+    assert found == [
+        str(bin_dir / "python3.12"),
+        str(tmp_path / "pyenv" / "versions" / "3.10.4" / "bin" / "python3.10"),
+        str(tmp_path / "asdf" / "installs" / "python" / "3.9.1" / "bin" / "python"),
+    ]
+
+
+def test_discover_probes_once_and_caches_by_mtime(tmp_path):
+    versions = {"a": "3.12.1", "b": "3.12.3", "c": "3.9.0", "d": None, "e": "2.7.18"}
+    paths = {name: str(_exe(tmp_path / name)) for name in versions}
+    probed = []
+    current = f"{sys.version_info[0]}.{sys.version_info[1]}"
+
+    def prober(path):
+        probed.append(path)
+        return versions.get(os.path.basename(path), current + ".0")
+
+    cache = tmp_path / "cache.json"
+    found = discover(paths.values(), cache, prober=prober)
+    by_short = {i.short_version: i for i in found}
+    assert by_short["3.12"].path == paths["b"]
+    assert by_short["3.9"].path == paths["c"]
+    assert "2.7" not in by_short and current in by_short
+    first = len(probed)
+
+    assert discover(paths.values(), cache, prober=prober) == found
+    assert len(probed) == first
+
+    os.utime(paths["c"], ns=(0, 0))
+    versions["c"] = "3.9.7"
+    again = {i.short_version: i for i in discover(paths.values(), cache, prober=prober)}
+    assert probed[first:] == [paths["c"]]
+    assert again["3.9"].version == "3.9.7"
@@ -0,0 +1,221 @@
+import threading
+
+from src.jobs import (
+    CANCELLED,
+    DONE,
+    FAILED,
+    PENDING,
+    RUNNING,
+    GenerationJob,
+    ImportJob,
+    Job,
+    JobQueue,
+    VenvJob,
+    describe_progress,
+    format_duration,
+)
+from src.template_service import TemplateService
+
+
+def test_job_reports_progress_and_finishes(tmp_path, make_service):
+    service = make_service("big", 20, "sub/f{}.txt", "x" * 10)
+    job = GenerationJob(service, "big", tmp_path / "out", clock=iter(range(100)).__next__)
+    job.run()
+
+    assert job.state == DONE
+    updates = []
+    while not job.updates.empty():
+        updates.append(job.updates.get())
+    assert updates[-1]["state"] == DONE
+    assert updates[-1]["done"] == updates[-1]["total"] == 21
+    assert updates[-1]["bytes"] == 200
+    assert all(u["state"] == RUNNING for u in updates[:-1])
+    assert (tmp_path / "out" / "sub" / "f0.txt").exists()
+
+
+def test_drain_returns_latest_snapshot(tmp_path, make_service):
+    service = make_service("big", 20, "sub/f{}.txt", "x" * 10)
+    job = GenerationJob(service, "big", tmp_path / "out")
+    job.run()
+    latest = job.drain()
+    assert latest["state"] == DONE
+    assert job.drain() is None
+
+
+def test_cancel_rolls_back_partial_output(tmp_path, make_service):
+    service = make_service("big", 200, "sub/f{}.txt", "x" * 10)
+    job = GenerationJob(service, "big", tmp_path / "out")
+    paused = threading.Event()
+    release = threading.Event()
+    original = service.generate_project
+
+    def slow_generate(*args, **kwargs):
+        for i, event in enumerate(original(*args, **kwargs)):
+            if i == 5:
+                paused.set()
+                release.wait(5)
+            yield event
+
+    service.generate_project = slow_generate
+    job.start()
+    assert paused.wait(5)
+    job.cancel()
+    release.set()
+    job.join(5)
+
+    assert job.state == CANCELLED
+    assert job.drain()["state"] == CANCELLED
+    assert not (tmp_path / "out").exists()
+
+
+def test_failure_keeps_existing_destination(tmp_path, make_service):
+    dest = tmp_path / "out"
+    dest.mkdir()
+    (dest / "keep.txt").write_text("mine")
+    service = make_service("big", 20, "sub/f{}.txt", "x" * 10)
+    job = GenerationJob(service, "big", dest)
+    job.run()
+
+    snapshot = job.drain()
+    assert snapshot["state"] == FAILED
+    assert "already exists" in snapshot["error"]
+    assert (dest / "keep.txt").read_text() == "mine"
+
+
+def test_replace_removes_previous_output(tmp_path, make_service):
+    dest = tmp_path / "out"
+    dest.mkdir()
+    (dest / "stale.txt").write_text("old")
+    service = make_service("big", 20, "sub/f{}.txt", "x" * 10)
+    job = GenerationJob(service, "big", dest, replace=True)
+    job.run()
+
+    assert job.state == DONE
+    assert not (dest / "stale.txt").exists()
+
+
+def test_describe_progress():
+    snapshot = {"state": RUNNING, "done": 500, "total": 5000, "bytes": 5e6, "elapsed": 2.0}
+    assert describe_progress(snapshot) == "500/5,000 entries · 250/s · 2.5 MB/s · ETA 0:18"
+    assert describe_progress(dict(snapshot, done=0)) == "0/5,000 entries"
+    assert format_duration(3725) == "1:02:05"
+
+
+class _BlockingJob(Job):
+    def __init__(self, gate, started):
+        super().__init__("blocking")
+        self.gate = gate
+        self.started = started
+
+    def _execute(self, snapshot):
+        self.started.release()
+        snapshot["total"] = 1
+        self.gate.wait(5)
+        snapshot["done"] = 1
+
+
+def test_job_queue_bounds_parallelism():
+    gate, started = threading.Event(), threading.Semaphore(0)
+    queue = JobQueue(max_workers=2)
+    jobs = [queue.submit(_BlockingJob(gate, started)) for _ in range(4)]
+    assert started.acquire(timeout=5) and started.acquire(timeout=5)
+    assert [job.state for job in jobs] == [RUNNING, RUNNING, PENDING, PENDING]
+
+    queue.set_parallelism(3)
+    assert started.acquire(timeout=5)
+    assert jobs[2].state == RUNNING and jobs[3].state == PENDING
+
+    gate.set()
+    for job in jobs:
+        assert job.join(5)
+    assert [job.state for job in jobs] == [DONE] * 4
+    assert queue.active() == []
+    queue.clear_finished()
+    assert queue.jobs == []
+
+
+def test_job_queue_cancels_pending_job_without_running_it():
+    gate, started = threading.Event(), threading.Semaphore(0)
+    queue = JobQueue(max_workers=1)
+    running = queue.submit(_BlockingJob(gate, started))
+    waiting = queue.submit(_BlockingJob(gate, started))
+    assert started.acquire(timeout=5)
+
+    queue.cancel(waiting)
+    assert waiting.state == CANCELLED
+    assert waiting.latest["state"] == CANCELLED
+    gate.set()
+    assert running.join(5)
+    assert running.state == DONE
+    assert not started.acquire(timeout=0.1)
+
+
+def test_venv_job_reports_percentages():
+    job = VenvJob(lambda: iter([20, 60, 100]))
+    job.run()
+    assert job.state == DONE
+    assert job.latest["done"] == 100
+    assert job.describe(job.latest).startswith("100%")
+
+
+def test_failed_job_reports_error():
+    def broken():
+        yield 10
+        raise RuntimeError("pip exploded")
+
+    job = VenvJob(broken)
+    job.run()
+    assert job.state == FAILED
+    assert job.describe(job.latest) == "pip exploded"
+
+
+def _source(tmp_path, name="upstream", files=10):
+    src = tmp_path / name
+    (src / "sub").mkdir(parents=True)
+    for i in range(files):
+        (src / "sub" / f"f{i}.txt").write_text("abc")
+    return src
+
+
+def test_import_jobs_run_concurrently_with_progress(tmp_path):
+    templates_dir = tmp_path / "templates"
+    queue = JobQueue(max_workers=3)
+    jobs = [
+        queue.submit(ImportJob(templates_dir, _source(tmp_path, f"t{i}", files=5)))
+        for i in range(3)
+    ]
+    for job in jobs:
+        assert job.join(5)
+
+    assert [job.state for job in jobs] == [DONE] * 3
+    assert jobs[0].latest["done"] == jobs[0].latest["total"] == 5
+    assert jobs[0].latest["bytes"] == 15
+    assert TemplateService(templates_dir).list_templates() == ["t0", "t1", "t2"]
+
+
+def test_cancelled_import_removes_partial_copy(tmp_path):
+    templates_dir = tmp_path / "templates"
+    job = ImportJob(templates_dir, _source(tmp_path, files=50))
+    original_post = job.post
+
+    def cancel_after_first_file(state, snapshot):
+        original_post(state, snapshot)
+        if snapshot["done"] == 1:
+            job.cancel()
+
+    job.post = cancel_after_first_file
+    job.run()
+
+    assert job.state == CANCELLED
+    assert not (templates_dir / "upstream").exists()
+
+
+def test_failed_import_keeps_existing_template(tmp_path):
+    templates_dir = tmp_path / "templates"
+    (templates_dir / "upstream").mkdir(parents=True)
+    job = ImportJob(templates_dir, _source(tmp_path))
+    job.run()
+
+    assert job.state == FAILED
+    assert "already exists" in job.latest["error"]
+    assert (templates_dir / "upstream").is_dir()
@@ -0,0 +1,159 @@
+import shutil
+import threading
+
+import pytest
+
+from src import project_setup
+from src.project_setup import generate_with_env, template_dependencies
+from src.template_service import TemplateService
+
+
+class _FakeManager:
+    """Creates the env folder and reports progress; optionally fails midway."""
+
+    def __init__(self, fail_at=None, gate=None):
+        self.fail_at = fail_at
+        self.gate = gate
+        self.closed = threading.Event()
+
+    def create_environment(self, path, python_version, dependencies):
+        path.mkdir()
+        (path / "deps.txt").write_text(",".join(dependencies))
+        try:
+            for percent in (25, 50, 75, 100):
+                if self.gate is not None:
+                    self.gate.wait(5)
+                if percent == self.fail_at:
+                    raise RuntimeError("pip exploded")
+                yield percent
+        except GeneratorExit:
+            shutil.rmtree(path, ignore_errors=True)
+            self.closed.set()
+            raise
+
+
+def test_combined_stream_contains_both_halves(tmp_path, make_service):
+    service = make_service("app", 30, "src/m{}.py", "x = 1\n")
+    dest = tmp_path / "project"
+    events = list(generate_with_env(service, "app", dest, _FakeManager(), "3.11", ["requests"]))
+
+    kinds = [event["event"] for event in events]
+    assert kinds.count("file") == 30
+    assert [e["percent"] for e in events if e["event"] == "env"] == [25, 50, 75, 100]
+    assert kinds[-1] == "done"
+    assert events[-1]["files"] == 30 and events[-1]["env"] == str(dest / ".venv")
+    assert (dest / ".venv" / "deps.txt").read_text() == "requests"
+
+
+def test_env_failure_rolls_back_project(tmp_path, make_service):
+    service = make_service("app", 30, "src/m{}.py", "x = 1\n")
+    dest = tmp_path / "project"
+    with pytest.raises(RuntimeError, match="pip exploded"):
+        list(generate_with_env(service, "app", dest, _FakeManager(50), "3.11", []))
+    assert not dest.exists()
+
+
+def test_generation_failure_stops_env_and_rolls_back(tmp_path, make_service):
+    service = make_service("app", 30, "src/m{}.py", "x = 1\n")
+    original = service.generate_project
+
+    gate = threading.Event()
+
+    def broken(*args, **kwargs):
+        for i, event in enumerate(original(*args, **kwargs)):
+            if i == 5:
+                gate.set()
+                raise OSError("disk full")
+            yield event
+
+    service.generate_project = broken
+    manager = _FakeManager(gate=gate)
+    dest = tmp_path / "project"
+    stream = generate_with_env(service, "app", dest, manager, "3.11", [])
+    with pytest.raises(OSError, match="disk full"):
+        list(stream)
+    assert not dest.exists()
+
+
+def test_closing_stream_early_rolls_back(tmp_path, make_service):
+    service = make_service("app", 30, "src/m{}.py", "x = 1\n")
+    dest = tmp_path / "project"
+    stream = generate_with_env(service, "app", dest, _FakeManager(), "3.11", [])
+    next(stream)
+    stream.close()
+    assert not dest.exists()
+
+
+def test_template_dependencies_from_registry(make_service):
+    service = make_service("app", 30, "src/m{}.py", "x = 1\n")
+    assert template_dependencies(service, "app") == []
+    # host packages only; the MicroPython device libraries are not pip-installable
+    assert template_dependencies(service, "taupunkt") == ["numpy", "pytest"]
+    assert template_dependencies(service, "taupunkt_advanced") == ["numpy", "pytest"]
+    assert template_dependencies(service, "esp32_sht41") == []
+
+
+def test_default_dependencies_for_registry_template(tmp_path):
+    service = TemplateService(tmp_path / "templates")
+    dest = tmp_path / "pico"
+    packages = template_dependencies(service, "taupunkt")
+    events = list(generate_with_env(service, "taupunkt", dest, _FakeManager(), "3.11", packages))
+
+    assert events[-1]["event"] == "done"
+    assert (dest / "src" / "utils" / "dew_point.py").is_file()
+    assert (dest / ".venv" / "deps.txt").read_text() == "numpy,pytest"
+
+
+def test_env_starts_before_first_file(tmp_path, make_service):
+    service = make_service("app", 30, "src/m{}.py", "x = 1\n")
+    original = service.generate_project
+    started = threading.Event()
+
+    class _Manager(_FakeManager):
+        def create_environment(self, path, python_version, dependencies):
+            started.set()
+            yield from super().create_environment(path, python_version, dependencies)
+
+    def slow_scan(*args, **kwargs):
+        # the environment must be under way before the first batch is scanned
+        assert started.wait(5)
+        yield from original(*args, **kwargs)
+
+    service.generate_project = slow_scan
+    events = list(generate_with_env(service, "app", tmp_path / "project", _Manager(), "3.11", []))
+    assert events[-1]["event"] == "done"
+
+
+def test_env_step_outlasting_stop_cleans_up_after_itself(tmp_path, make_service, monkeypatch):
+    monkeypatch.setattr(project_setup, "_STOP_TIMEOUT", 0.1)
+    service = make_service("app", 30, "src/m{}.py", "x = 1\n")
+    original = service.generate_project
+    installing, release = threading.Event(), threading.Event()
+
+    class _SlowManager(_FakeManager):
+        def create_environment(self, path, python_version, dependencies):
+            path.mkdir()
+            try:
+                installing.set()
+                # a pip install that ignores the stop request and keeps writing
+                release.wait(5)
+                (path / "lib").mkdir()
+                (path / "lib" / "pkg.py").write_text("")
+                yield 100
+            except GeneratorExit:
+                shutil.rmtree(path, ignore_errors=True)
+                raise
+
+    def broken(*args, **kwargs):
+        assert installing.wait(5)
+        yield from original(*args, **kwargs)
+        raise OSError("disk full")
+
+    service.generate_project = broken
+    dest = tmp_path / "project"
+    with pytest.raises(OSError, match="disk full"):
+        list(generate_with_env(service, "app", dest, _SlowManager(), "3.11", []))
+    worker = next(t for t in threading.enumerate() if t.name == "env-setup")
+    release.set()
+    worker.join(5)
+    assert not dest.exists()
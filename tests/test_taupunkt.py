@@ -1,4 +1,12 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
 from src.taupunkt_template import TaupunktTemplate, TaupunktAdvancedTemplate
+from src.template_service import TemplateService
 
 
 def test_taupunkt_base_metadata():
@@ -31,3 +39,79 @@ def test_taupunkt_advanced_features():
     # Prüft die Cloud-Features in den Metadaten
     assert "MQTT connectivity" in meta["features"]
     assert "Cloud data sync" in meta["features"]
+
+
+def _leaves(structure, prefix=""):
+    for name, sub in structure.items():
+        if isinstance(sub, dict):
+            yield from _leaves(sub, f"{prefix}{name}/")
+        else:
+            yield prefix + name
+
+
+@pytest.mark.parametrize("template", [TaupunktTemplate(), TaupunktAdvancedTemplate()])
+def test_taupunkt_file_contents_are_part_of_structure(template):
+    contents = template.get_file_contents()
+    assert "src/utils/dew_point.py" in contents
+    assert set(contents) <= set(_leaves(template.get_structure()))
+
+
+def _generate(tmp_path, name="taupunkt"):
+    dest = tmp_path / name
+    events = list(TemplateService(tmp_path / "templates").generate_project(name, dest))
+    assert events[-1]["bytes"] > 0
+    return dest
+
+
+def _run_generated_tests(project, *args):
+    # the generator's own ``src`` package is importable, as with an installed ``lokal``
+    env = dict(os.environ, PYTHONPATH=str(Path(__file__).resolve().parents[1]))
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", "tests", *args],
+        cwd=project,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+
+
+def test_generated_dew_point_module(tmp_path):
+    """Das generierte Projekt enthält eine echte Taupunkt-Implementierung samt Tests."""
+    project = _generate(tmp_path)
+    assert "def dew_point(" in (project / "src" / "utils" / "dew_point.py").read_text()
+    assert (project / "benchmarks" / "bench_dew_point.py").stat().st_size > 0
+    _run_generated_tests(project, "tests/test_dew_point.py", "-k", "not throughput")
+
+
+def test_generated_fixed_point_and_calibration(tmp_path):
+    """Festkomma-Variante und Kalibrierung laufen als Host-Tests unter CPython."""
+    project = _generate(tmp_path)
+    assert "def dew_point_fixed(" in (project / "src" / "utils" / "dew_point.py").read_text()
+    assert (project / "src" / "utils" / "calibration.py").stat().st_size > 0
+    assert (project / "config" / "sensor_offsets.json").stat().st_size > 0
+    _run_generated_tests(project, "tests/test_fixed_point.py")
+
+
+def test_generated_display_layer(tmp_path):
+    """Framebuffer mit Dirty-Regions; die Tests zählen SPI-Bytes über einen Fake-Bus."""
+    project = _generate(tmp_path)
+    display = project / "src" / "display"
+    for name in ("lcd_st7789.py", "graphics.py", "ui.py", "fake_spi.py"):
+        assert (display / name).stat().st_size > 0
+    _run_generated_tests(project, "tests/test_display.py")
+
+
+def test_generated_ring_log(tmp_path):
+    """Taupunkt Advanced bringt den binären Ringpuffer-Logger samt Host-Tests mit."""
+    project = _generate(tmp_path, "taupunkt_advanced")
+    assert "class RingLog" in (project / "src" / "storage" / "database.py").read_text()
+    _run_generated_tests(project, "tests/test_ring_log.py")
+
+
+def test_generated_log_analysis_tool(tmp_path):
+    """Host-Werkzeug für die Langzeitauswertung: mmap, Streaming-Aggregate, LTTB."""
+    project = _generate(tmp_path, "taupunkt_advanced")
+    assert "def analyze(" in (project / "tools" / "analyze_log.py").read_text()
+    assert "history-chart" in (project / "web" / "static" / "chart.js").read_text()
+    _run_generated_tests(project, "tests/test_analyze_log.py")
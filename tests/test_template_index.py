@@ -0,0 +1,126 @@
+"""Tests for the cached template name index and shell completion."""
+
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from src.cli import cli
+from src.template_index import TemplateIndex
+
+
+def _counting_loader(calls):
+    def load():
+        calls.append(1)
+        return ["taupunkt", "taupunkt_advanced"]
+
+    return load
+
+
+def test_names_cover_directories_and_registry(tmp_path):
+    (tmp_path / "alpha").mkdir()
+    (tmp_path / "beta").mkdir()
+    index = TemplateIndex(tmp_path, registry_loader=lambda: ["taupunkt"])
+    assert index.names() == ["alpha", "beta", "taupunkt"]
+    assert index.complete("ta") == ["taupunkt"]
+    assert (tmp_path / ".lokal" / "index.json").is_file()
+
+
+def test_cached_index_skips_registry_and_refreshes_by_mtime(tmp_path):
+    (tmp_path / "alpha").mkdir()
+    calls = []
+    TemplateIndex(tmp_path, registry_loader=_counting_loader(calls)).names()
+    assert TemplateIndex(tmp_path, registry_loader=_counting_loader(calls)).names()
+    assert len(calls) == 1
+
+    (tmp_path / "gamma").mkdir()
+    stat = tmp_path.stat()
+    os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    names = TemplateIndex(tmp_path, registry_loader=_counting_loader(calls)).names()
+    assert "gamma" in names
+    assert len(calls) == 1
+
+
+def test_completion_is_fast_with_many_templates(tmp_path):
+    for i in range(3000):
+        (tmp_path / f"tpl_{i:04d}").mkdir()
+    TemplateIndex(tmp_path, registry_loader=lambda: []).names()
+
+    start = time.perf_counter()
+    matches = TemplateIndex(tmp_path, registry_loader=lambda: []).complete("tpl_12")
+    elapsed = time.perf_counter() - start
+    assert len(matches) == 100
+    assert elapsed < 0.03
+
+
+def test_shell_complete_template_option(tmp_path, monkeypatch):
+    (tmp_path / "sample").mkdir()
+    monkeypatch.setenv("_LOKAL_COMPLETE", "bash_complete")
+    monkeypatch.setenv("COMP_WORDS", f"lokal preview --templates-dir {tmp_path} --template sa")
+    monkeypatch.setenv("COMP_CWORD", "5")
+    result = CliRunner().invoke(cli, [], prog_name="lokal")
+    assert "plain,sample" in result.output
+
+
+def _best_of(runs, args, env):
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(args, env=env, capture_output=True, text=True, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def test_shell_completion_subprocess_is_import_light(tmp_path):
+    """The real ``_LOKAL_COMPLETE`` round trip costs little more than importing click."""
+    (tmp_path / "sample").mkdir()
+    env = dict(
+        os.environ,
+        PYTHONPATH=str(Path(__file__).resolve().parents[1]),
+        _LOKAL_COMPLETE="bash_complete",
+        COMP_WORDS=f"lokal preview --templates-dir {tmp_path} --template sa",
+        COMP_CWORD="5",
+    )
+    report = (
+        "import atexit, sys\n"
+        "atexit.register(lambda: sys.stderr.write(' '.join(sorted(sys.modules))))\n"
+        "from src.cli import cli\n"
+        "cli(prog_name='lokal')\n"
+    )
+    # the first run builds the name index; later runs only read it
+    _best_of(1, [sys.executable, "-c", report], env)
+    _, result = _best_of(1, [sys.executable, "-c", report], env)
+    assert "plain,sample" in result.stdout
+    loaded = set(result.stderr.split())
+    heavy = {"tkinter", "src.template_service", "src.daemon", "src.template_registry"}
+    assert not heavy & loaded
+
+    completion, _ = _best_of(
+        5, [sys.executable, "-c", "from src.cli import cli; cli(prog_name='lokal')"], env
+    )
+    baseline, _ = _best_of(5, [sys.executable, "-c", "import click, json"], env)
+    assert completion - baseline < 0.05
+
+
+def test_completion_command_prints_script():
+    result = CliRunner().invoke(cli, ["completion", "bash"])
+    assert result.exit_code == 0
+    assert "_LOKAL_COMPLETE" in result.output
+
+
+def test_directories_and_unvalidated_cache(tmp_path):
+    (tmp_path / "alpha").mkdir()
+    index = TemplateIndex(tmp_path, registry_loader=lambda: ["taupunkt"])
+    assert index.cached_directories() is None
+    assert index.directories() == ["alpha"]
+
+    stat = tmp_path.stat()
+    (tmp_path / "beta").mkdir()
+    os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    fresh = TemplateIndex(tmp_path, registry_loader=lambda: ["taupunkt"])
+    # the stored names are returned as-is, the validated lookup rescans
+    assert fresh.cached_directories() == ["alpha"]
+    assert fresh.directories() == ["alpha", "beta"]
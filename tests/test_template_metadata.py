@@ -0,0 +1,193 @@
+import os
+
+import pytest
+
+from src import template_metadata
+from src.template_metadata import (
+    FileInfoCursor,
+    classify_files,
+    load_metadata,
+    metadata_path,
+    sniff,
+)
+from src.template_service import TemplateService
+
+
+def test_sniff_kinds(tmp_path):
+    samples = {
+        "plain.txt": b"hello\n",
+        "umlaut.txt": "Taupunkt in °C\n".encode("utf-8"),
+        "legacy.txt": "Grüße\n".encode("latin-1"),
+        "bom.txt": "text".encode("utf-16"),
+        "image.bin": b"\x89PNG\r\n\x1a\n\0\0\0\rIHDR",
+        "empty.txt": b"",
+    }
+    for name, data in samples.items():
+        (tmp_path / name).write_bytes(data)
+
+    assert sniff(tmp_path / "plain.txt") == ("text", "ascii")
+    assert sniff(tmp_path / "umlaut.txt") == ("text", "utf-8")
+    assert sniff(tmp_path / "legacy.txt") == ("text", "latin-1")
+    assert sniff(tmp_path / "bom.txt") == ("text", "utf-16")
+    assert sniff(tmp_path / "image.bin") == ("binary", None)
+    assert sniff(tmp_path / "empty.txt") == ("text", "ascii")
+
+
+def test_sniff_reads_only_the_sample(tmp_path):
+    # a multi-byte character cut at the sample boundary is still utf-8 text
+    (tmp_path / "cut.txt").write_bytes(b"a" * 4095 + "ü".encode("utf-8") + b"\0")
+    assert sniff(tmp_path / "cut.txt", sample_size=4096) == ("text", "utf-8")
+
+
+def test_classify_files_in_parallel(tmp_path):
+    for i in range(100):
+        (tmp_path / f"f{i}.txt").write_text("x")
+    kinds = classify_files(tmp_path, [f"f{i}.txt" for i in range(100)])
+    assert len(kinds) == 100
+    assert set(kinds.values()) == {("text", "ascii")}
+
+
+def test_import_writes_sidecar(tmp_path):
+    src = tmp_path / "upstream"
+    (src / "assets").mkdir(parents=True)
+    (src / "main.py").write_text("print('hi')\n")
+    (src / "assets" / "logo.bin").write_bytes(b"\0\1\2")
+    os.symlink("main.py", src / "alias.py")
+
+    service = TemplateService(tmp_path / "templates")
+    service.import_template(src)
+
+    sidecar = load_metadata(metadata_path(tmp_path / "templates", "upstream"))
+    copy = tmp_path / "templates" / "upstream" / "main.py"
+    assert sidecar["files"]["main.py"] == {
+        "size": 12,
+        "kind": "text",
+        "encoding": "ascii",
+        "mtime": copy.stat().st_mtime_ns,
+    }
+    assert sidecar["files"]["assets/logo.bin"]["kind"] == "binary"
+    assert sidecar["symlinks"] == {"alias.py": "main.py"}
+    assert sidecar["dirs"] == 1
+    assert sidecar["bytes"] == 27
+    assert service.count_entries("upstream") == (3, 1)
+    assert service.list_templates() == ["upstream"]
+
+
+def test_in_place_edits_drop_the_file_record(tmp_path):
+    src = tmp_path / "upstream"
+    src.mkdir()
+    (src / "a.txt").write_text("ascii")
+    (src / "b.txt").write_text("keep")
+    service = TemplateService(tmp_path / "templates")
+    service.import_template(src)
+
+    # rewriting a file leaves every folder mtime alone
+    edited = tmp_path / "templates" / "upstream" / "a.txt"
+    edited.write_bytes(b"\0binary now")
+    assert service.template_metadata("upstream") is not None
+    with service.file_info("upstream") as cursor:
+        assert cursor.get("a.txt") is None
+        assert cursor.get("b.txt")["kind"] == "text"
+
+    events = list(service.generate_project("upstream", tmp_path / "out"))
+    sizes = {e["path"]: e["bytes"] for e in events if e["event"] == "file"}
+    assert sizes == {"a.txt": 11, "b.txt": 4}
+
+
+def test_import_rejects_symlink_loop(tmp_path):
+    src = tmp_path / "upstream"
+    (src / "sub").mkdir(parents=True)
+    os.symlink("..", src / "sub" / "back")
+
+    service = TemplateService(tmp_path / "templates")
+    with pytest.raises(ValueError, match="symlink loops: sub/back"):
+        service.import_template(src)
+    assert not (tmp_path / "templates" / "upstream").exists()
+
+
+def test_generate_uses_sidecar(tmp_path):
+    src = tmp_path / "upstream"
+    src.mkdir()
+    (src / "data.bin").write_bytes(b"\0" * 10)
+    service = TemplateService(tmp_path / "templates")
+    service.import_template(src)
+
+    events = list(service.generate_project("upstream", tmp_path / "out"))
+    assert events[-1]["bytes"] == 10
+
+    metadata = service.template_metadata("upstream")
+    assert metadata["files"]["data.bin"]["kind"] == "binary"
+    # a template folder replaced by hand invalidates its sidecar
+    template = tmp_path / "templates" / "upstream"
+    (template / "data.bin").unlink()
+    template.rmdir()
+    (tmp_path / "other").mkdir()
+    template.mkdir()
+    assert service.template_metadata("upstream") is None
+
+
+def test_sync_classifies_only_copied_files(tmp_path, monkeypatch):
+    src = tmp_path / "upstream"
+    src.mkdir()
+    for i in range(5):
+        (src / f"f{i}.txt").write_text("x")
+    service = TemplateService(tmp_path / "templates")
+    service.import_template(src)
+
+    sniffed = []
+    real_sniff = template_metadata.sniff
+    monkeypatch.setattr(
+        template_metadata, "sniff", lambda path: sniffed.append(path.name) or real_sniff(path)
+    )
+    (src / "new.bin").write_bytes(b"\0")
+    service.import_template(src, update=True)
+
+    assert sniffed == ["new.bin"]
+    metadata = service.template_metadata("upstream")
+    assert metadata["files"]["new.bin"]["kind"] == "binary"
+    assert len(metadata["files"]) == 6
+
+
+def test_hand_edits_invalidate_sidecar(tmp_path):
+    src = tmp_path / "upstream"
+    (src / "pkg").mkdir(parents=True)
+    (src / "a.txt").write_text("a")
+    (src / "pkg" / "b.txt").write_text("b")
+    service = TemplateService(tmp_path / "templates")
+    service.import_template(src)
+    assert service.count_entries("upstream") == (2, 1)
+
+    template = tmp_path / "templates" / "upstream"
+    (template / "pkg" / "c.txt").write_text("c")
+    (template / "pkg" / "d.bin").write_bytes(b"\0")
+    assert service.template_metadata("upstream") is None
+    assert service.count_entries("upstream") == (4, 1)
+    assert service.list_templates() == ["upstream"]
+
+
+def test_sidecar_streams_in_walk_order_and_generate_keeps_links(tmp_path):
+    src = tmp_path / "upstream"
+    (src / "a").mkdir(parents=True)
+    (src / "a" / "x.txt").write_text("x")
+    (src / "a-b.txt").write_text("ab")
+    (src / "z.txt").write_text("z")
+    service = TemplateService(tmp_path / "templates")
+    service.import_template(src)
+    template = tmp_path / "templates" / "upstream"
+
+    walked = [rel for rel, is_dir in service.walk_template("upstream") if not is_dir]
+    assert [*service.template_metadata("upstream")["files"]] == walked
+    with service.file_info("upstream") as cursor:
+        assert [cursor.get(rel)["size"] for rel in walked] == [1, 2, 1]
+        assert cursor.get("a/x.txt") is None  # lookups only move forward
+
+    # a file replaced by a link by hand stays a link when generating
+    (template / "z.txt").unlink()
+    os.symlink("a-b.txt", template / "z.txt")
+    assert service.template_metadata("upstream") is None
+    service.import_template(src, update=True)
+    assert service.template_metadata("upstream")["files"]["z.txt"]["size"] == 1
+
+    list(service.generate_project("upstream", tmp_path / "out"))
+    assert os.readlink(tmp_path / "out" / "z.txt") == "a-b.txt"
+    assert FileInfoCursor().get("z.txt") is None
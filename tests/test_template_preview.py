@@ -0,0 +1,34 @@
+from src.template_preview import list_folder, search_template
+
+
+def test_list_folder_returns_direct_children_only(make_service):
+    service = make_service("demo", 30, "src/module_{}.py", extra=("README.md", "src/pkg/main.py"))
+    assert list_folder(service, "demo") == [("README.md", False), ("src", True)]
+    children = list_folder(service, "demo", "src")
+    assert ("src/pkg", True) in children
+    assert ("src/pkg/main.py", False) not in children
+    assert len(children) == 31
+
+
+def test_search_template_matches_names_and_limits(make_service):
+    service = make_service("demo", 30, "src/module_{}.py", extra=("README.md", "src/pkg/main.py"))
+    assert search_template(service, "demo", "MAIN") == ([("src/pkg/main.py", False)], False)
+    matches, truncated = search_template(service, "demo", "module", limit=10)
+    assert len(matches) == 10
+    assert truncated
+    # folder names do not match on their parents' names
+    assert search_template(service, "demo", "pkg")[0] == [("src/pkg", True)]
+
+
+def test_search_template_stops_when_cancelled(make_service):
+    service = make_service("demo", 30, "src/module_{}.py", extra=("README.md", "src/pkg/main.py"))
+    checks = []
+
+    def cancelled():
+        checks.append(None)
+        return len(checks) > 3
+
+    # README.md, src and the first module are walked before the cancellation
+    matches, truncated = search_template(service, "demo", "module", cancelled=cancelled)
+    assert matches == [("src/module_0.py", False)] and not truncated
+    assert len(checks) == 4
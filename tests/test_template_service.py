@@ -1,6 +1,6 @@
 import pytest
 
-from src.template_service import TemplateService
+from src.template_service import TemplateService, TemplateWalk
 
 
 def test_structure(tmp_path):
@@ -34,9 +34,132 @@ def test_import(tmp_path):
         service.import_template(tmp_path / "not_a_dir.txt")
 
 
+def test_sync_template_copies_only_changes(tmp_path):
+    import os
+
+    from src.instrumentation import MetricsCollector
+
+    src = tmp_path / "upstream"
+    (src / "pkg").mkdir(parents=True)
+    (src / "old").mkdir()
+    (src / "keep.txt").write_text("same")
+    (src / "pkg" / "edit.txt").write_text("v1")
+    (src / "touch.txt").write_text("touched")
+    (src / "old" / "gone.txt").write_text("bye")
+
+    metrics = MetricsCollector()
+    service = TemplateService(tmp_path / "templates", hooks=[metrics])
+    first = service.sync_template(src)
+    assert first["copied"] == 4
+    dest = tmp_path / "templates" / "upstream"
+    assert (dest / "pkg" / "edit.txt").read_text() == "v1"
+
+    (src / "pkg" / "edit.txt").write_text("v2")
+    stat = (src / "touch.txt").stat()
+    os.utime(src / "touch.txt", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    (src / "old" / "gone.txt").unlink()
+    (src / "old").rmdir()
+    (src / "new.txt").write_text("hello")
+
+    summary = service.sync_template(src)
+    assert summary == {"copied": 2, "deleted": 1, "unchanged": 2, "bytes": 7}
+    assert (dest / "pkg" / "edit.txt").read_text() == "v2"
+    assert (dest / "new.txt").read_text() == "hello"
+    assert not (dest / "old").exists()
+    assert metrics.counter("cache_hits", "import") == 2
+
+    again = service.sync_template(src)
+    assert again == {"copied": 0, "deleted": 0, "unchanged": 4, "bytes": 0}
+    assert service.list_templates() == ["upstream"]
+
+
+def test_update_without_manifest_uses_destination(tmp_path):
+    src = tmp_path / "upstream"
+    src.mkdir()
+    (src / "a.txt").write_text("a")
+    templates_dir = tmp_path / "templates"
+    (templates_dir / "upstream").mkdir(parents=True)
+    (templates_dir / "upstream" / "stale.txt").write_text("x")
+
+    service = TemplateService(templates_dir)
+    summary = service.sync_template(src)
+    assert summary["copied"] == 1
+    assert summary["deleted"] == 1
+    assert not (templates_dir / "upstream" / "stale.txt").exists()
+
+
 def test_list_templates_sorted(tmp_path):
     templates_dir = tmp_path / "templates"
     (templates_dir / "b").mkdir(parents=True)
     (templates_dir / "a").mkdir(parents=True)
     service = TemplateService(templates_dir)
     assert service.list_templates() == ["a", "b"]
+
+
+def test_generate_project(tmp_path):
+    templates_dir = tmp_path / "templates"
+    (templates_dir / "foo" / "sub").mkdir(parents=True)
+    (templates_dir / "foo" / "sub" / "file.txt").write_text("data")
+    service = TemplateService(templates_dir)
+
+    events = list(service.generate_project("foo", tmp_path / "out"))
+    assert events[-1]["event"] == "done"
+    assert events[-1]["files"] == 1
+    assert (tmp_path / "out" / "sub" / "file.txt").read_text() == "data"
+
+    with pytest.raises(FileExistsError):
+        list(service.generate_project("foo", tmp_path / "out"))
+
+
+def test_registry_template_fallback(tmp_path):
+    service = TemplateService(tmp_path / "templates")
+    assert service.has_template("taupunkt")
+    assert "src" in service.get_template_structure("taupunkt")["taupunkt"]
+
+    list(service.generate_project("taupunkt", tmp_path / "pico"))
+    assert (tmp_path / "pico" / "src" / "utils" / "dew_point.py").is_file()
+
+
+def test_walk_template_limits(tmp_path):
+    templates_dir = tmp_path / "templates"
+    deep = templates_dir / "foo" / "a" / "b" / "c"
+    deep.mkdir(parents=True)
+    (deep / "leaf.txt").write_text("x")
+    for i in range(5):
+        (templates_dir / "foo" / f"f{i}.txt").write_text("x")
+    service = TemplateService(templates_dir)
+
+    assert [rel for rel, _ in service.walk_template("foo", max_depth=2)] == [
+        "a",
+        "a/b",
+        "f0.txt",
+        "f1.txt",
+        "f2.txt",
+        "f3.txt",
+        "f4.txt",
+    ]
+    assert [rel for rel, _ in service.walk_template("foo", subpath="a/b")] == [
+        "a/b/c",
+        "a/b/c/leaf.txt",
+    ]
+
+    walk = service.walk_template("foo")
+    assert [next(walk)[0] for _ in range(2)] == ["a", "a/b"]
+    assert walk.remaining() == 7
+
+    walk = service.walk_template("foo", max_depth=1)
+    assert next(walk) == ("a", True) and walk.last_cut
+    assert next(walk) == ("f0.txt", False) and not walk.last_cut
+    assert walk.remaining(limit=2) == 2
+
+    with pytest.raises(ValueError):
+        service.walk_template("foo", subpath="../other")
+
+
+def test_walk_template_deep_tree_is_iterative(tmp_path):
+    structure: dict = {}
+    node = structure
+    for i in range(1500):
+        node = node.setdefault(f"d{i}", {})
+    walk = TemplateWalk(structure)
+    assert sum(1 for _ in walk) == 1500
@@ -0,0 +1,118 @@
+"""Tests for phase-span tracing and ``--profile``."""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from click.testing import CliRunner
+
+from src import tracing
+from src.cli import cli
+from src.instrumentation import TOTAL_PHASE, GenerationHook
+from src.template_service import TemplateService
+
+
+def test_span_is_noop_without_tracer():
+    assert tracing.get_tracer() is None
+    with tracing.span("scan") as args:
+        args["entries"] = 1
+
+
+def test_tracer_records_threads():
+    tracer = tracing.Tracer()
+
+    def work():
+        with tracer.span("inner"):
+            pass
+
+    with tracer.span("outer", files=2):
+        worker = threading.Thread(target=work, name="worker-1")
+        worker.start()
+        worker.join()
+    events = tracer.events()
+    spans = {e["name"]: e for e in events if e["ph"] == "X"}
+    assert spans["outer"]["args"] == {"files": 2}
+    assert spans["inner"]["tid"] != spans["outer"]["tid"]
+    thread_names = {e["args"]["name"] for e in events if e["ph"] == "M"}
+    assert "worker-1" in thread_names
+
+
+def test_generate_records_phases(tmp_path):
+    templates_dir = tmp_path / "templates"
+    (templates_dir / "foo" / "sub").mkdir(parents=True)
+    (templates_dir / "foo" / "sub" / "a.txt").write_text("a")
+    (templates_dir / "foo" / "b.txt").write_text("bb")
+
+    tracer = tracing.Tracer()
+    previous = tracing.set_tracer(tracer)
+    try:
+        list(TemplateService(templates_dir).generate_project("foo", tmp_path / "out"))
+    finally:
+        tracing.set_tracer(previous)
+
+    names = {e["name"] for e in tracer.events()}
+    assert {"scan", "plan", "mkdir", "copy", "verify", "copy_file"} <= names
+    samples = [e for e in tracer.events() if e["name"] == "copy_file"]
+    assert sorted(e["args"]["path"] for e in samples) == ["b.txt", "sub/a.txt"]
+
+
+def test_phase_spans_exclude_consumer_time(tmp_path):
+    templates_dir = tmp_path / "templates"
+    (templates_dir / "foo").mkdir(parents=True)
+    for i in range(4):
+        (templates_dir / "foo" / f"{i}.txt").write_text("x")
+
+    class Durations(GenerationHook):
+        def __init__(self):
+            self.seconds = {}
+
+        def on_phase_end(self, operation, phase, seconds, **info):
+            self.seconds[phase] = self.seconds.get(phase, 0.0) + seconds
+
+    hook = Durations()
+    service = TemplateService(templates_dir, hooks=[hook])
+    tracer = tracing.Tracer()
+    previous = tracing.set_tracer(tracer)
+    try:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            for _ in service.generate_project("foo", tmp_path / "out", executor=executor):
+                time.sleep(0.05)
+    finally:
+        tracing.set_tracer(previous)
+
+    # five events were consumed at 50 ms each
+    assert hook.seconds[TOTAL_PHASE] < 0.1
+    assert hook.seconds["copy"] < 0.1
+    spans = [e for e in tracer.events() if e["name"] in ("generate", "copy")]
+    assert len(spans) > 2
+    assert sum(e["dur"] for e in spans) < 100_000
+
+
+def test_cli_profile_writes_chrome_trace(tmp_path):
+    templates_dir = tmp_path / "templates"
+    (templates_dir / "foo").mkdir(parents=True)
+    (templates_dir / "foo" / "a.txt").write_text("a")
+    trace = tmp_path / "trace.json"
+
+    result = CliRunner().invoke(
+        cli,
+        [
+            "--profile",
+            str(trace),
+            "--pstats",
+            "generate",
+            "-t",
+            "foo",
+            "-o",
+            str(tmp_path / "out"),
+            "--templates-dir",
+            str(templates_dir),
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    events = json.loads(trace.read_text())["traceEvents"]
+    assert {"generate", "scan", "copy", "verify"} <= {e["name"] for e in events}
+    assert (tmp_path / "trace.json.pstats").is_file()
+    assert tracing.get_tracer() is None
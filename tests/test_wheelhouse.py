@@ -0,0 +1,180 @@
+import os
+import subprocess
+import sys
+import zipfile
+
+import pytest
+
+import src.wheelhouse as wheelhouse_module
+from src.dependency_management import VirtualEnvironmentManager, venv_python
+from src.wheelhouse import (
+    Wheelhouse,
+    compatible,
+    evaluate_marker,
+    marker_environment,
+    normalize_name,
+    satisfies,
+    version_key,
+)
+
+
+def _wheel(directory, name, version, files, tag="py3-none-any", entry_points=None, requires=()):
+    dist = f"{name}-{version}"
+    path = directory / f"{dist}-{tag}.whl"
+    metadata = f"Name: {name}\nVersion: {version}\n"
+    metadata += "".join(f"Requires-Dist: {line}\n" for line in requires)
+    with zipfile.ZipFile(path, "w") as archive:
+        for rel, text in files.items():
+            archive.writestr(rel, text)
+        archive.writestr(f"{dist}.dist-info/METADATA", metadata)
+        if entry_points:
+            archive.writestr(f"{dist}.dist-info/entry_points.txt", entry_points)
+    return path
+
+
+def _venv(tmp_path, name="env"):
+    venv = tmp_path / name
+    version = f"{sys.version_info[0]}.{sys.version_info[1]}"
+    (venv / "lib" / f"python{version}" / "site-packages").mkdir(parents=True)
+    (venv / "bin").mkdir()
+    (venv / "pyvenv.cfg").write_text(f"version = {version}.0\n")
+    return venv
+
+
+@pytest.fixture
+def house(tmp_path):
+    wheels = tmp_path / "wheels"
+    wheels.mkdir()
+    _wheel(wheels, "demo_pkg", "1.0", {"demo_pkg/__init__.py": "VERSION = '1.0'\n"})
+    _wheel(
+        wheels,
+        "demo_pkg",
+        "1.10",
+        {
+            "demo_pkg/__init__.py": "VERSION = '1.10'\ndef main():\n    print('hi')\n",
+            "demo_pkg-1.10.data/scripts/demo-tool": "#!python\nprint('tool')\n",
+        },
+        entry_points="[console_scripts]\ndemo = demo_pkg:main\n",
+    )
+    _wheel(wheels, "native", "2.0", {"native.py": ""}, tag="cp27-cp27m-win32")
+    return Wheelhouse(wheels, cache_dir=tmp_path / "cache")
+
+
+def test_version_and_tag_helpers():
+    assert version_key("1.10") > version_key("1.9") > version_key("1.9rc1")
+    assert version_key("1.0.post1") > version_key("1.0")
+    assert normalize_name("Demo_Pkg.x") == "demo-pkg-x"
+    assert compatible(("py3", "none", "any"), "3.11")
+    assert not compatible(("cp27", "cp27m", "win32"), "3.11")
+    assert satisfies("1.10", [">=1.2", "<2"]) and not satisfies("2.0", [">=1.2", "<2"])
+    assert satisfies("1.4.2", ["==1.4.*"]) and not satisfies("1.5", ["==1.4.*"])
+    assert satisfies("1.4.5", ["~=1.4.2"]) and not satisfies("1.5.0", ["~=1.4.2"])
+
+
+def test_index_picks_newest_compatible_wheel(house):
+    assert house.find("Demo-Pkg").version == "1.10"
+    assert house.find("demo_pkg==1.0").version == "1.0"
+    assert house.find("demo-pkg<1.5").version == "1.0"
+    with pytest.raises(LookupError):
+        house.find("native")
+    with pytest.raises(LookupError):
+        house.find("missing")
+
+
+def test_index_is_built_once(house, monkeypatch):
+    house.index()
+    calls = []
+    monkeypatch.setattr(wheelhouse_module, "_digest", lambda path: calls.append(path) or "x")
+    again = Wheelhouse(house.directory, cache_dir=house.cache_dir)
+    assert again.find("demo-pkg").version == "1.10"
+    assert calls == []
+
+
+def test_index_notices_replaced_wheel(house):
+    old = house.find("demo-pkg==1.0")
+    path = house.directory / old.filename
+    stat = path.stat()
+    _wheel(house.directory, "demo_pkg", "1.0", {"demo_pkg/__init__.py": "VERSION = 'new'\n"})
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    directory = house.directory.stat()
+    os.utime(house.directory, ns=(directory.st_atime_ns, directory.st_mtime_ns))
+
+    again = Wheelhouse(house.directory, cache_dir=house.cache_dir)
+    assert again.find("demo-pkg==1.0").digest != old.digest
+    assert again.find("demo-pkg").digest == house.find("demo-pkg").digest
+
+
+def test_markers():
+    env = marker_environment("3.11")
+    assert evaluate_marker('python_version >= "3.8" and os_name == "posix"', env) == (
+        os.name == "posix"
+    )
+    assert evaluate_marker('python_version < "3.10" or (extra == "x")', dict(env, extra="x"))
+    assert not evaluate_marker("python_full_version < '3.11.0'", env)
+    assert evaluate_marker("'linux' in sys_platform or sys_platform not in 'linux'", env)
+
+
+def test_install_resolves_requires_dist(house, tmp_path):
+    wheels = house.directory
+    _wheel(
+        wheels,
+        "app",
+        "1.0",
+        {"app.py": ""},
+        requires=[
+            "Demo-Pkg (<1.5)",
+            "helper>=2; python_version >= '3'",
+            "legacy; python_version < '3'",
+            "extra-only; extra == 'fancy'",
+        ],
+    )
+    _wheel(wheels, "helper", "2.0", {"helper.py": ""}, requires=["demo_pkg>=1.0"])
+    _wheel(wheels, "extra_only", "1.0", {"extra_only.py": ""})
+
+    venv = _venv(tmp_path)
+    installed = house.install(venv, ["app"])
+    assert sorted((w.name, w.version) for w in installed) == [
+        ("app", "1.0"),
+        ("demo-pkg", "1.0"),
+        ("helper", "2.0"),
+    ]
+    assert (wheelhouse_module.site_packages(venv) / "helper.py").is_file()
+    assert {w.name for w in house.resolve(["app[fancy]"])} >= {"extra-only"}
+
+
+def test_install_shares_unpacked_files(house, tmp_path):
+    first, second = _venv(tmp_path, "a"), _venv(tmp_path, "b")
+    house.install(first, ["demo-pkg"])
+    house.install(second, ["demo-pkg"])
+
+    site = wheelhouse_module.site_packages
+    module_a = site(first) / "demo_pkg" / "__init__.py"
+    module_b = site(second) / "demo_pkg" / "__init__.py"
+    assert "1.10" in module_a.read_text()
+    assert os.path.samestat(module_a.stat(), module_b.stat()) or module_a.stat().st_nlink == 1
+    assert len(os.listdir(house.cache_dir / "wheels")) == 1
+    assert (site(first) / "demo_pkg-1.10.dist-info" / "INSTALLER").read_text() == "lokal\n"
+    assert (first / "bin" / "demo-tool").read_text().startswith(f"#!{venv_python(first)}")
+    assert "from demo_pkg import main" in (first / "bin" / "demo").read_text()
+
+
+def test_install_fails_before_writing_on_missing_wheel(house, tmp_path):
+    venv = _venv(tmp_path)
+    with pytest.raises(LookupError):
+        house.install(venv, ["demo-pkg", "missing"])
+    assert not (wheelhouse_module.site_packages(venv) / "demo_pkg").exists()
+
+
+def test_wheelhouse_as_environment_installer(house, tmp_path):
+    manager = VirtualEnvironmentManager(
+        cache_dir=tmp_path / "cache", installer=house.install, with_pip=False
+    )
+    version = f"{sys.version_info[0]}.{sys.version_info[1]}"
+    list(manager.create_environment(tmp_path / "env", version, ["demo-pkg==1.0"]))
+    out = subprocess.run(
+        [str(venv_python(tmp_path / "env")), "-c", "import demo_pkg; print(demo_pkg.VERSION)"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert out.stdout.strip() == "1.0"